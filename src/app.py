@@ -1,20 +1,39 @@
 # src/app.py
 import os
-import re
 import json
-import urllib.request
-import urllib.parse
-from openai import OpenAI
+import hashlib
+import time
 import streamlit as st
-from PIL import Image
-from io import BytesIO
-from docx import Document
-from docx.shared import Inches, Pt, RGBColor
-from docx.oxml.ns import qn
-from docx.oxml import OxmlElement
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from transformers import BlipProcessor, BlipForConditionalGeneration
 import base64
+from captioning import CAPTION_SERVICE_ENABLED, caption_image_bytes, registry
+from caption_service import get_caption_service
+from inference_budget import admission
+from image_preprocess import PREPROCESS_MEASURE_BASELINE, describe_docx_images, describe_stats, prepare_docx_images
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pipeline import describe_timings, run_pipeline
+from naver_client import get_naver_client
+from retrieval import describe_retrieval, format_references, retrieve_references, split_keywords
+from references import describe_references, process_references
+from token_budget import describe_budget, fit_prompt
+from llm_usage import describe_usage, usage_tracker
+from llm_cache import cached_llm_call, get_llm_cache, llm_cache_key
+from md_render import referenced_image_names, render_docx
+from export_bundle import bundle_key, describe_bundle, write_bundle
+from image_store import SessionImageStore, describe_memory_report, memory_report
+from jobs import FAILED, FINISHED, get_job_queue
+
+# 진행 중인 게시글 생성 작업을 다시 확인하는 간격 (초)
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "0.25"))
+# 동시에 요청할 번역 수 (TRANSLATION_CONCURRENCY 환경 변수로 변경 가능)
+TRANSLATION_CONCURRENCY = int(os.getenv("TRANSLATION_CONCURRENCY", "4"))
+# 사이드바에 프로세스 메모리 사용량(관리자용)을 표시할지 여부
+ADMIN_VIEW = os.getenv("ADMIN_VIEW", "0") == "1"
+# 배경 이미지: src/static/의 파일 이름 (.streamlit/config.toml의 enableStaticServing으로 제공), 없으면 예전 위치 사용
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+BACKGROUND_IMAGE = os.getenv("BACKGROUND_IMAGE", "main_image.png")
+LEGACY_BACKGROUND_IMAGE = 'data/main_image.png'
+_background_image_url = None
+_custom_css = None
 
 # Streamlit 페이지 기본 설정
 st.set_page_config(
@@ -24,26 +43,40 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
-def add_custom_css():
-    # 배경 이미지 로드 및 base64 인코딩
-    try:
-        with open('data/main_image.png', 'rb') as image_file:
-            encoded_string = base64.b64encode(image_file.read()).decode()
-    except FileNotFoundError:
-        encoded_string = ''  # 배경 이미지가 없을 경우 빈 문자열로 설정
-
-    st.markdown(
-        f"""
-        <style>
-        /* 전체 배경 이미지 설정 */
+def background_image_url():
+    """
+    배경 이미지 URL을 프로세스마다 한 번만 결정합니다.
+    src/static/에 이미지가 있으면 Streamlit 정적 파일 URL(브라우저가 한 번 받아 캐시)을 사용합니다.
+    예전 위치(data/main_image.png)에만 있으면 base64 data URI로 인라인하며 (README의 설정 단계로 src/static/에 복사하면 정적 파일로 제공),
+    이미지가 없으면 빈 문자열. 요청을 처리하는 동안 소스 폴더에는 쓰지 않습니다.
+    """
+    global _background_image_url
+    if _background_image_url is None:
+        if os.path.isfile(os.path.join(STATIC_DIR, BACKGROUND_IMAGE)):
+            _background_image_url = f"app/static/{BACKGROUND_IMAGE}"
+        elif os.path.isfile(LEGACY_BACKGROUND_IMAGE):
+            with open(LEGACY_BACKGROUND_IMAGE, 'rb') as image_file:
+                _background_image_url = f"data:image/png;base64,{base64.b64encode(image_file.read()).decode()}"
+        else:
+            _background_image_url = ''
+    return _background_image_url
+
+def build_custom_css(background_url):
+    # 페이지 CSS (배경 이미지가 없으면 배경 규칙 생략)
+    background_rule = ''
+    if background_url:
+        background_rule = f"""/* 전체 배경 이미지 설정 */
         body {{
-            background-image: url(data:image/png;base64,{encoded_string});
+            background-image: url({background_url});
             background-size: cover;
             background-repeat: no-repeat;
             background-attachment: fixed;
             background-position: center;
         }}
-
+"""
+    return f"""
+        <style>
+        {background_rule}
         /* 메인 컨테이너 배경 투명하게 */
         .main .block-container {{
             background-color: rgba(255, 255, 255, 0.8);
@@ -100,9 +133,14 @@ def add_custom_css():
             }}
         }}
         </style>
-        """,
-        unsafe_allow_html=True,
-    )
+        """
+
+def add_custom_css():
+    # CSS 문자열은 프로세스마다 한 번만 만들고, 다시 실행될 때마다 보내는 크기는 배경 이미지 URL만큼만 늘어남
+    global _custom_css
+    if _custom_css is None:
+        _custom_css = build_custom_css(background_image_url())
+    st.markdown(_custom_css, unsafe_allow_html=True)
 
 def get_api_keys():
     # secrets.toml 파일에서 정보 가져오기 또는 환경 변수에서 가져오기
@@ -117,34 +155,41 @@ def get_api_keys():
     return api_key, client_id, client_secret
 
 def create_openai_client(api_key):
-    # OpenAI 클라이언트 초기화
+    # OpenAI 클라이언트 초기화 (openai 패키지는 게시글 생성 시에만 로드)
+    from openai import OpenAI
+
     client = OpenAI(api_key=api_key)
     return client
 
 def analyze_uploaded_images(uploaded_images, progress_messages):
-    # BLIP 프로세서 및 모델 초기화
-    processor = BlipProcessor.from_pretrained("Salesforce/blip-image-captioning-base")
-    model = BlipForConditionalGeneration.from_pretrained("Salesforce/blip-image-captioning-base")
-    
+    # uploaded_images는 (파일명, 이미지 바이트) 목록 (업로드마다 한 번만 읽고 캡션 생성과 Word용 변환에 같은 바이트 사용)
     image_filenames = []   # 이미지 파일명만 저장
-    image_bytes_dict = {}  # 이미지 파일명과 바이트 데이터를 저장
-    
-    for uploaded_file in uploaded_images:
-        image = Image.open(uploaded_file)
-        if image.mode != 'RGBA':
-            image = image.convert('RGBA')
-        inputs = processor(images=image, return_tensors="pt")
-        out = model.generate(**inputs, max_new_tokens=50)
-        caption = processor.decode(out[0], skip_special_tokens=True)
-        image_filenames.append(uploaded_file.name)
-        
-        # 이미지 바이트 읽기
-        uploaded_file.seek(0)  # 파일 포인터를 처음으로 이동
-        image_bytes = uploaded_file.read()
-        image_bytes_dict[uploaded_file.name] = image_bytes
-        
-        progress_messages.append(f"파일: {uploaded_file.name}, 이미지 설명: {caption}")
-    
+    image_bytes_dict = dict(uploaded_images)  # 이미지 파일명과 바이트 데이터를 저장
+
+    # 업로드 순서대로 캡션 생성 (캐시에 있는 이미지는 디코딩/추론 생략, 나머지는 축소 디코딩 후 배치 처리)
+    preprocess_stats = []
+    results = caption_image_bytes(list(image_bytes_dict.items()), preprocess_stats=preprocess_stats)
+    if registry.is_loaded():
+        progress_messages.append(f"BLIP 모델 준비 완료 ({registry.describe()})")
+    if CAPTION_SERVICE_ENABLED:
+        progress_messages.append(f"캡션 서비스: {get_caption_service().describe()}")
+
+    for result in results:
+        if not result.ok:
+            progress_messages.append(f"파일: {result.filename}, 이미지 분석 실패: {result.error}")
+            del image_bytes_dict[result.filename]
+            continue
+        image_filenames.append(result.filename)
+        progress_messages.append(f"파일: {result.filename}, 이미지 설명: {result.caption}")
+
+    for stats in preprocess_stats:
+        progress_messages.append(f"전처리: {describe_stats(stats)}")
+    if preprocess_stats and not PREPROCESS_MEASURE_BASELINE:
+        progress_messages.append("전처리 절약 시간: 측정하지 않음 (PREPROCESS_MEASURE_BASELINE=1이면 원본 디코딩 시간과 비교해 이미지별로 표시)")
+
+    hits = sum(1 for result in results if result.cached)
+    progress_messages.append(f"캡션 캐시 적중: {hits}/{len(results)} (적중률 {hits / len(results):.0%})")
+
     return image_filenames, image_bytes_dict
 
 
@@ -171,49 +216,43 @@ def load_third_sys_prompt():
         st.error(str(e))
         st.stop()
 
-def generate_keywords(client, first_sys_prompt_content, user_question, language):
-    completion = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {
-                "role": "system",
-                "content": f"{first_sys_prompt_content}\n사용 언어: {language}"
-            },
-            {
-                "role": "user",
-                "content": user_question
-            }
-        ]
-    )
+def generate_keywords(client, first_sys_prompt_content, user_question, language, use_cache=True, metrics=None):
+    # 같은 모델/프롬프트/질문/언어의 키워드는 LLM 응답 캐시에서 재사용 (use_cache=False면 새로 생성해 캐시 갱신)
+    # 고정된 시스템 프롬프트를 맨 앞에 두고 언어는 뒤 메시지로 분리해 OpenAI 프롬프트 캐시가 적용되게 함
+    # metrics 사전을 넘기면 API를 호출한 경우 토큰 사용량(usage)을 기록
+    model = "gpt-4o-mini"
+
+    def create():
+        completion = client.chat.completions.create(
+            model=model,
+            messages=[
+                {
+                    "role": "system",
+                    "content": first_sys_prompt_content
+                },
+                {
+                    "role": "system",
+                    "content": f"사용 언어: {language}"
+                },
+                {
+                    "role": "user",
+                    "content": user_question
+                }
+            ]
+        )
+        usage = usage_tracker.record("키워드", completion.usage)
+        if metrics is not None:
+            metrics['usage'] = usage
+        return completion.choices[0].message.content.strip()
 
-    keyword = completion.choices[0].message.content.strip()
+    key = llm_cache_key(model, first_sys_prompt_content, user_question, language)
+    keyword, _ = cached_llm_call(key, create, use_cache=use_cache)
     return keyword
 
-def search_naver_blog(client_id, client_secret, keyword):
-    encText = urllib.parse.quote(keyword)
-    display = 10
-    start = 1
-    sort = "sim"
-    
-    url = f"https://openapi.naver.com/v1/search/blog?query={encText}&display={display}&start={start}&sort={sort}"
-    
-    request = urllib.request.Request(url)
-    request.add_header("X-Naver-Client-Id", client_id)
-    request.add_header("X-Naver-Client-Secret", client_secret)
-    
-    try:
-        response = urllib.request.urlopen(request)
-        response_body = response.read()
-        result = json.loads(response_body.decode('utf-8'))
-
-        if "items" in result and len(result["items"]) > 0:
-            description_all = ' '.join([item["description"] for item in result["items"]])
-            clean_description = re.sub(r'<\/?b>', '', description_all)
-        else:
-            clean_description = "참고 자료가 없습니다."
-    except Exception as e:
-        clean_description = "참고 자료가 없습니다."
-    return clean_description
+def search_naver_blog(client_id, client_secret, keyword, stats=None):
+    # 키워드 생성 결과를 여러 검색어로 나눠 여러 페이지를 동시에 검색하고, 링크 기준으로 합친 BlogItem 목록 반환
+    client = get_naver_client(client_id, client_secret)
+    return retrieve_references(client, split_keywords(keyword), stats=stats)
 
 def choose_tone(tone_choice):
     # 톤 선택 사전
@@ -226,10 +265,9 @@ def choose_tone(tone_choice):
     # 선택한 톤 반환, 기본은 'casual'
     return tones.get(str(tone_choice), "casual")
 
-def generate_final_post(client, second_sys_prompt_content, chosen_format_content, user_question, clean_description, image_filenames, example_text, tone, language):
+def build_final_post_messages(second_sys_prompt_content, chosen_format_content, user_question, clean_description, image_filenames, example_text, tone, language, budget_report=None):
     # 톤 프롬프트에 추가 (tone이 있으면 해당하는 프롬프트 추가)
     tone_instruction = f"Please write in a {tone} tone." if tone else ""
-    example_text_content = f"Here is an example of the user's previous writing style: {example_text}" if example_text else "The user has not provided an example text."
 
     # 이미지 삽입에 대한 지시 추가
     image_instructions = "Please include the images in the generated text at appropriate positions using the format {image_filename}."
@@ -237,217 +275,288 @@ def generate_final_post(client, second_sys_prompt_content, chosen_format_content
     # 이미지 파일명을 {ham1.jpeg} 형태로 포맷
     image_placeholders = ' '.join([f'{{{fn}}}' for fn in image_filenames])
 
+    # 구성 요소별/전체 토큰 예산 적용 (예시 텍스트, 참고자료 등 긴 입력은 잘라냄), budget_report 사전에 토큰 수 기록
+    parts = fit_prompt({
+        "system": second_sys_prompt_content,
+        "format": chosen_format_content,
+        "instructions": f"{tone_instruction}\n\n{image_instructions}\n사용 언어: {language}",
+        "question": user_question,
+        "references": clean_description,
+        "images": image_placeholders,
+        "example_text": example_text,
+    }, report=budget_report)
+    example_text_content = f"Here is an example of the user's previous writing style: {parts['example_text']}" if parts['example_text'] else "The user has not provided an example text."
+
+    # 고정된 내용(시스템 프롬프트, 이미지 지시, 글 형식)을 맨 앞에 두고 요청마다 달라지는 톤/언어는 뒤 메시지로 분리
+    # → 같은 글 형식의 요청끼리 앞부분이 같아 OpenAI 프롬프트 캐시가 적용됨
+    return [
+        {
+            "role": "system",
+            "content": f"{parts['system']}\n\n{image_instructions}\n\n글 형식: {parts['format']}"
+        },
+        {
+            "role": "system",
+            "content": f"{tone_instruction}\n사용 언어: {language}".strip()
+        },
+        {
+            "role": "user",
+            "content": f"사용자의 질문: {parts['question']}\n참고자료: {parts['references']}\n입력된 사진: {parts['images']}\n{example_text_content}"
+        }
+    ]
+
+def generate_final_post(client, second_sys_prompt_content, chosen_format_content, user_question, clean_description, image_filenames, example_text, tone, language, metrics=None):
+    # metrics 사전을 넘기면 프롬프트 토큰 구성(prompt_budget)과 토큰 사용량(usage, 캐시된 프롬프트 토큰 포함)을 기록
+    budget_report = {}
     final_completion = client.chat.completions.create(
         model="gpt-4o-mini",
-        messages=[
-            {
-                "role": "system",
-                "content": f"{second_sys_prompt_content}\n\n{tone_instruction}\n\n{image_instructions}\n\n글 형식: {chosen_format_content}\n사용 언어: {language}"
-            },
-            {
-                "role": "user",
-                "content": f"사용자의 질문: {user_question}\n참고자료: {clean_description}\n입력된 사진: {image_placeholders}\n{example_text_content}"
-            }
-        ]
+        messages=build_final_post_messages(second_sys_prompt_content, chosen_format_content, user_question, clean_description, image_filenames, example_text, tone, language, budget_report)
     )
+    usage = usage_tracker.record("게시글", final_completion.usage)
+    if metrics is not None:
+        metrics['prompt_budget'] = budget_report
+        metrics['usage'] = usage
 
     final_post = final_completion.choices[0].message.content.strip()
     return final_post
 
-def translate_post(client, final_post, target_language):
+def stream_final_post(client, second_sys_prompt_content, chosen_format_content, user_question, clean_description, image_filenames, example_text, tone, language, metrics=None):
+    # 게시글 생성 결과를 토큰이 도착하는 대로 텍스트 조각 단위로 반환
+    # metrics 사전을 넘기면 첫 토큰까지의 시간(time_to_first_token), 전체 생성 시간(total_seconds), 프롬프트 토큰 구성(prompt_budget),
+    # 토큰 사용량(usage, 캐시된 프롬프트 토큰 포함)을 기록
+    start = time.perf_counter()
+    budget_report = {}
+    stream = client.chat.completions.create(
+        model="gpt-4o-mini",
+        messages=build_final_post_messages(second_sys_prompt_content, chosen_format_content, user_question, clean_description, image_filenames, example_text, tone, language, budget_report),
+        stream=True,
+        stream_options={"include_usage": True}  # 마지막 청크로 토큰 사용량 수신
+    )
+    if metrics is not None:
+        metrics['prompt_budget'] = budget_report
+    chunks = 0
+    for chunk in stream:
+        if getattr(chunk, "usage", None) is not None:
+            usage = usage_tracker.record("게시글", chunk.usage)
+            if metrics is not None:
+                metrics['usage'] = usage
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if not delta:
+            continue
+        if chunks == 0 and metrics is not None:
+            metrics['time_to_first_token'] = time.perf_counter() - start
+        chunks += 1
+        yield delta
+    if metrics is not None:
+        metrics['total_seconds'] = time.perf_counter() - start
+        metrics['chunks'] = chunks
+
+def translate_post(client, final_post, target_language, metrics=None):
     # 게시글 번역 함수 추가
+    # 고정 지시문과 게시글을 앞에, 대상 언어를 마지막 메시지에 두어 같은 게시글의 언어별 번역 요청이 앞부분(프롬프트 캐시)을 공유
     translation_completion = client.chat.completions.create(
         model="gpt-4o-mini",
         messages=[
             {
                 "role": "system",
-                "content": f"Please translate the following text into {target_language}. Maintain the formatting and placeholders for images (e.g., {{image_filename}})."
+                "content": "Please translate the text provided by the user into the target language given in the last message. Maintain the formatting and placeholders for images (e.g., {image_filename})."
             },
             {
                 "role": "user",
                 "content": final_post
+            },
+            {
+                "role": "system",
+                "content": f"Target language: {target_language}"
             }
         ]
     )
+    usage = usage_tracker.record("번역", translation_completion.usage)
+    if metrics is not None:
+        metrics['usage'] = usage
     translated_post = translation_completion.choices[0].message.content.strip()
     return translated_post
 
-def apply_md_formatting(paragraph, text):
-    # 기존 내용 제거
-    p_element = paragraph._element
-    for child in p_element[:]:
-        p_element.remove(child)
-
-    # 헤딩 처리
-    heading_match = re.match(r'^(#{1,6})\s+(.*)', text)
-    if heading_match:
-        level = len(heading_match.group(1))
-        content = heading_match.group(2)
-        paragraph.style = f'Heading {level}'
-        # 중앙 정렬
-        paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        process_inline_formatting(paragraph, content)
-        return
+def translate_posts(client, final_post, target_languages, max_concurrency=TRANSLATION_CONCURRENCY, metrics=None):
+    # 여러 언어 번역을 동시에 요청하고, 끝나는 순서대로 (언어, 번역문, 오류)를 반환
+    # 한 언어가 실패해도 나머지 언어의 결과는 그대로 반환됨
+    # metrics 사전을 넘기면 언어별 metrics 사전(토큰 사용량 등)을 채움
+    if metrics is not None:
+        for lang in target_languages:
+            metrics[lang] = {}
+    with ThreadPoolExecutor(max_workers=max(1, max_concurrency), thread_name_prefix="translate") as executor:
+        futures = {executor.submit(translate_post, client, final_post, lang, metrics[lang] if metrics is not None else None): lang for lang in target_languages}
+        for future in as_completed(futures):
+            lang = futures[future]
+            try:
+                yield lang, future.result(), None
+            except Exception as e:
+                yield lang, None, e
+
+def word_file_key(post, digests):
+    # 게시글 내용과 게시글이 참조하는 이미지 내용으로 만든 Word 파일 캐시 키
+    key = hashlib.sha256(post.encode('utf-8'))
+    for name in sorted(referenced_image_names(post, digests)):
+        key.update(f"\0{name}\0{digests[name]}".encode('utf-8'))
+    return key.hexdigest()
+
+def get_word_file(post, image_bytes_dict, digests, word_files, used_keys):
+    """
+    게시글의 Word 파일 바이트를 반환합니다. word_files(캐시 키 → 바이트)에 같은 내용으로 만든 파일이 있으면
+    다시 만들지 않고, 사용한 캐시 키는 used_keys에 추가합니다.
+    """
+    key = word_file_key(post, digests)
+    if key not in word_files:
+        word_files[key] = render_docx(post, image_bytes_dict).getvalue()
+    used_keys.add(key)
+    return word_files[key]
+
+def generate_post_job(job, api_key, client_id, client_secret, first_sys_prompt_content, second_sys_prompt_content,
+                      chosen_format_content, user_question, images, example_text, tone, language_choices, stream_post, use_keyword_cache):
+    """
+    백그라운드 작업: 이미지 분석 → 키워드 생성 → 블로그 검색 → 게시글 생성 → 번역.
+    진행 메시지와 생성 중인 게시글은 job(JobContext)에 기록하고, 결과 사전을 반환합니다 (Word용 이미지는 첨부로 전달).
+    """
+    client = create_openai_client(api_key)  # OpenAI 클라이언트 초기화
 
-    # 리스트 처리
-    list_match = re.match(r'^(\*|\-|\+)\s+(.*)', text)
-    if list_match:
-        content = list_match.group(2)
-        paragraph.style = 'List Bullet'
-        process_inline_formatting(paragraph, content)
-        return
+    # 이미지 분석(CPU)과 키워드 생성 → 블로그 검색(네트워크)을 동시에 실행
+    caption_messages = []
 
-    numbered_list_match = re.match(r'^(\d+)\.\s+(.*)', text)
-    if numbered_list_match:
-        content = numbered_list_match.group(2)
-        paragraph.style = 'List Number'
-        process_inline_formatting(paragraph, content)
-        return
+    def analyze_images():
+        if not images:
+            caption_messages.append("이미지가 업로드되지 않았습니다.")
+            return [], {}
+        return analyze_uploaded_images(images, caption_messages)
 
-    # 블록 인용 처리
-    blockquote_match = re.match(r'^>\s+(.*)', text)
-    if blockquote_match:
-        content = blockquote_match.group(1)
-        paragraph.style = 'Quote'
-        process_inline_formatting(paragraph, content)
-        return
-
-    # 수평선 처리
-    if re.match(r'^(\*\*\*|---)$', text.strip()):
-        run = paragraph.add_run()
-        p = run._element
-        pPr = paragraph._element.get_or_add_pPr()
-        pBdr = OxmlElement('w:pBdr')
-        pPr.insert_element_before(pBdr, 'w:spacing')
-        bottom = OxmlElement('w:bottom')
-        bottom.set(qn('w:val'), 'single')
-        bottom.set(qn('w:sz'), '6')
-        bottom.set(qn('w:space'), '1')
-        bottom.set(qn('w:color'), 'auto')
-        pBdr.append(bottom)
-        return
+    tasks = {
+        "images": (analyze_images, []),
+        # 키워드 생성 (첫 번째 선택한 언어로)
+        "keyword": (lambda: generate_keywords(client, first_sys_prompt_content, user_question, language_choices[0], use_keyword_cache, keyword_metrics), []),
+        # 네이버 블로그 검색 (여러 검색어 × 여러 페이지)
+        "references": (lambda keyword: search_naver_blog(client_id, client_secret, keyword, retrieval_stats), ["keyword"]),
+        # 참고자료 정리 (정규화, 중복 제거, 질문 관련도 순 선택)
+        "context": (lambda references: process_references(references, user_question, stats=reference_stats), ["references"]),
+        # Word 파일에 넣을 이미지 축소/압축 (캡션 생성이 끝난 이미지만)
+        "embed": (lambda images: prepare_docx_images(images[1], stats=embed_stats), ["images"]),
+    }
+    timings = {}
+    retrieval_stats = {}
+    reference_stats = {}
+    embed_stats = {}
+    keyword_metrics = {}
+    job.stage("이미지 분석 및 참고자료 수집 중...")
+    results = run_pipeline(tasks, timings)
+
+    image_filenames = results["images"][0]
+    image_bytes_dict = results["embed"]
+    keyword = results["keyword"]
+    clean_description = format_references(results["context"])
+    for message in caption_messages:
+        job.progress(message)
+    job.progress(f"추출된 키워드: {keyword}")
+    if keyword_metrics.get('usage'):
+        job.progress(f"키워드 생성 토큰: {describe_usage(keyword_metrics['usage'])}")
+    llm_cache = get_llm_cache()
+    if llm_cache is not None:
+        cache_stats = llm_cache.stats()
+        job.progress(
+            f"키워드 캐시: 적중 {cache_stats['hits']}회 / 미적중 {cache_stats['misses']}회 (적중률 {cache_stats['hit_ratio']:.0%}, 저장 {cache_stats['entries']}개)"
+        )
+    job.progress(f"참고자료 수집 완료: {describe_retrieval(retrieval_stats)}")
+    job.progress(get_naver_client(client_id, client_secret).metrics.describe())
+    job.progress(f"참고자료 정리: {describe_references(reference_stats)}")
+    if image_bytes_dict:
+        job.progress(f"Word용 이미지 변환: {describe_docx_images(embed_stats)}")
+    job.progress(
+        f"단계별 소요 시간: {describe_timings(timings, {'images': '이미지 분석', 'keyword': '키워드 생성', 'references': '참고자료 수집', 'context': '참고자료 정리', 'embed': 'Word용 이미지 변환'})}"
+    )
+    # Word용으로 변환한 이미지는 이미지 저장소(메모리 상한을 넘으면 디스크)에 담아 첨부로 전달하고, 결과를 읽는 세션이 그대로 사용
+    image_store = SessionImageStore()
+    image_store.replace(image_bytes_dict)
+    job.attach('images', image_store)
+
+    # 게시글 생성 (첫 번째 선택한 언어로)
+    job.stage("게시글 생성 중...")
+    generation_metrics = {}
+    if stream_post:
+        # 도착한 토큰을 이어 붙여 부분 결과로 기록 (화면은 진행 상황을 확인할 때마다 다시 그림)
+        parts = []
+        for delta in stream_final_post(client, second_sys_prompt_content, chosen_format_content, user_question, clean_description, image_filenames, example_text, tone, language_choices[0], generation_metrics):
+            parts.append(delta)
+            job.partial(''.join(parts))
+        final_post = ''.join(parts).strip()
+        job.progress(
+            f"게시글 생성: 첫 토큰 {generation_metrics.get('time_to_first_token', 0.0):.2f}초, 전체 {generation_metrics['total_seconds']:.1f}초"
+        )
+    else:
+        start = time.perf_counter()
+        final_post = generate_final_post(client, second_sys_prompt_content, chosen_format_content, user_question, clean_description, image_filenames, example_text, tone, language_choices[0], generation_metrics)
+        generation_metrics['total_seconds'] = time.perf_counter() - start
+        job.progress(f"게시글 생성: 전체 {generation_metrics['total_seconds']:.1f}초")
+    job.partial(final_post, force=True)
+    job.progress(f"프롬프트 토큰: {describe_budget(generation_metrics['prompt_budget'])}")
+    job.progress(f"게시글 생성 토큰: {describe_usage(generation_metrics.get('usage'))}")
+
+    # 선택된 다른 언어로 동시에 번역 (끝나는 대로 언어별 중간 결과로 기록해 진행 화면에 바로 표시)
+    translated_posts = {}
+    if len(language_choices) > 1:
+        target_languages = language_choices[1:]
+        job.stage(f"{', '.join(target_languages)}로 번역 중...")
+        translation_metrics = {}
+        for done, (lang, translated_post, error) in enumerate(translate_posts(client, final_post, target_languages, metrics=translation_metrics), start=1):
+            if error is None:
+                translated_posts[lang] = translated_post
+                job.part(lang, translated_post)
+                job.progress(f"{lang}로 번역 완료 ({describe_usage(translation_metrics[lang].get('usage'))})")
+            else:
+                job.progress(f"{lang} 번역 실패: {error}")
+            job.stage(f"번역 {done}/{len(target_languages)} 완료 ({lang})")
+    job.progress(f"프롬프트 캐시 누적 (이 프로세스): {usage_tracker.describe()}")
+
+    return {
+        "language": language_choices[0],
+        "generated_post": final_post,
+        "translated_posts": translated_posts,
+        "generation_metrics": generation_metrics,
+    }
 
-    # 코드 블록 처리
-    code_block_match = re.match(r'^```(.*)', text)
-    if code_block_match:
-        content = code_block_match.group(1)
-        run = paragraph.add_run(content)
-        run.font.name = 'Courier New'
-        run.font.size = Pt(10)
+def load_job_result(job):
+    # 끝난 작업의 진행 과정과 결과를 세션 상태로 옮김 (작업마다 한 번)
+    st.session_state['loaded_job_id'] = job['id']
+    st.session_state['progress_messages'] = job['progress']
+    if job['status'] == FAILED:
+        st.session_state['progress_messages'] = job['progress'] + [f"게시글 생성 실패: {job['error']}"]
         return
-
-    # 인라인 서식 처리
-    process_inline_formatting(paragraph, text)
-
-def process_inline_formatting(paragraph, text):
-    # 인라인 마크다운 서식을 적용합니다.
-    # 패턴 정의
-    pattern = r'(\*\*\*.+?\*\*\*|\*\*.+?\*\*|\*.+?\*|`.+?`|~~.+?~~|\!\[.*?\]\(.*?\)|\!\[.*?\]|\[.+?\]\(.*?\))'
-    tokens = re.split(pattern, text)
-
-    for token in tokens:
-        if not token:
-            continue
-        if token.startswith('***') and token.endswith('***'):
-            # 굵게 및 기울임
-            run = paragraph.add_run(token[3:-3])
-            run.bold = True
-            run.italic = True
-        elif token.startswith('**') and token.endswith('**'):
-            # 굵게
-            run = paragraph.add_run(token[2:-2])
-            run.bold = True
-        elif token.startswith('*') and token.endswith('*'):
-            # 기울임
-            run = paragraph.add_run(token[1:-1])
-            run.italic = True
-        elif token.startswith('~~') and token.endswith('~~'):
-            # 취소선
-            run = paragraph.add_run(token[2:-2])
-            run.font.strike = True
-        elif token.startswith('`') and token.endswith('`'):
-            # 인라인 코드
-            run = paragraph.add_run(token[1:-1])
-            run.font.name = 'Courier New'
-            run.font.size = Pt(10)
-        elif token.startswith('![') and '](' in token and token.endswith(')'):
-            # 마크다운 이미지 태그 처리 (![alt](image.png))
-            alt_text = token[2:token.index('](')]
-            image_url = token[token.index('](')+2:-1]
-            # 텍스트로 대체
-            run = paragraph.add_run(f"[이미지: {alt_text}]")
-            run.font.color.rgb = RGBColor(0, 0, 255)
-            run.font.underline = True
-        elif token.startswith('![') and token.endswith(']'):
-            # 마크다운 이미지 태그 처리 (![alt])
-            alt_text = token[2:-1]
-            run = paragraph.add_run(f"[이미지: {alt_text}]")
-            run.font.color.rgb = RGBColor(0, 0, 255)
-            run.font.underline = True
-        elif token.startswith('[') and '](' in token and token.endswith(')'):
-            # 하이퍼링크
-            link_text = token[1:token.index(']')]
-            link_url = token[token.index('](')+2:-1]
-            run = paragraph.add_run(f'{link_text} ({link_url})')
-            run.font.color.rgb = RGBColor(0, 0, 255)
-            run.font.underline = True
-        else:
-            # 일반 텍스트
-            run = paragraph.add_run(token)
-
-def save_post_to_word(final_post, image_bytes_dict):
-    doc = Document()
-
-    # 이미지 태그 패턴 정의
-    image_tag_patterns = [
-        r'\{(.+?\.(?:png|jpg|jpeg))\}',       # {image.png}
-        r'\((.+?\.(?:png|jpg|jpeg))\)',      # (image.png)
-        r'!\[.*?\]\((.+?\.(?:png|jpg|jpeg))\)',  # ![alt](image.png)
-        r'!\[(.*?)\]'                          # ![alt]
-    ]
-
-    for line in final_post.split('\n'):
-        original_line = line  # 디버깅용 원본 라인 저장
-
-        # 이미지 태그 처리
-        for pattern in image_tag_patterns:
-            matches = re.findall(pattern, line)
-            for image_name in matches:
-                if pattern == r'!\[(.*?)\]':
-                    # ![alt] 형식의 경우 이미지 이름을 alt 텍스트로 가정
-                    image_name = image_name + ".png"  # 확장자 추가 필요 시 조정
-
-                image_bytes = image_bytes_dict.get(image_name)
-                if image_bytes:
-                    try:
-                        # 이미지 바이트를 BytesIO로 변환
-                        image_stream = BytesIO(image_bytes)
-                        doc.add_picture(image_stream, width=Inches(5))
-                    except Exception as e:
-                        line = line.replace(image_name, f"[이미지 '{image_name}'를 삽입할 수 없습니다]")
-                else:
-                    line = line.replace(image_name, f"[이미지 '{image_name}'를 찾을 수 없습니다]")
-
-                # 이미지 태그 제거
-                if pattern == r'\{(.+?\.(?:png|jpg|jpeg))\}':
-                    line = re.sub(r'\{' + re.escape(image_name) + r'\}', '', line)
-                elif pattern == r'\((.+?\.(?:png|jpg|jpeg))\)':
-                    line = re.sub(r'\(' + re.escape(image_name) + r'\)', '', line)
-                elif pattern == r'!\[.*?\]\((.+?\.(?:png|jpg|jpeg))\)':
-                    line = re.sub(r'!\[.*?\]\(' + re.escape(image_name) + r'\)', '', line)
-                elif pattern == r'!\[(.*?)\]':
-                    line = re.sub(r'!\[' + re.escape(image_name[:-4]) + r'\]', '', line)
-
-        # 이미지 태그가 제거된 후의 텍스트 삽입
-        if line.strip():
-            paragraph = doc.add_paragraph()
-            apply_md_formatting(paragraph, line)
-
-    # BytesIO를 사용하여 메모리에 저장
-    output = BytesIO()
-    doc.save(output)
-    output.seek(0)
-    return output
+    result = job['result']
+    st.session_state['post_language'] = result['language']
+    st.session_state['generated_post'] = result['generated_post']  # 세션 상태에 저장
+    st.session_state['translated_posts'] = result['translated_posts']
+    st.session_state['generation_metrics'] = result['generation_metrics']
+    # Word용 이미지 저장소를 세션 저장소로 사용 (작업 풀에도 JOB_ATTACHMENT_MAX_AGE 동안 남아 ?job=으로 다시 접속한 세션과 함께 쓰므로 비우지 않음)
+    # 다른 프로세스에서 실행했거나 오래되어 정리된 작업이면 빈 저장소로 바꾸고 이미지 없이 Word 파일 생성
+    image_store = get_job_queue().attachments(job['id']).get('images')
+    st.session_state['image_store'] = image_store if image_store is not None else SessionImageStore()
+
+@st.fragment(run_every=JOB_POLL_INTERVAL)
+def show_job_progress(job_id):
+    # 진행 중인 작업 상태를 주기적으로 다시 읽어 표시하고, 끝나면 전체 페이지를 다시 실행해 결과 표시
+    job = get_job_queue().get(job_id)
+    if job is None or job['status'] in FINISHED:
+        st.rerun()
+    st.info(job['stage'] or "작업 대기 중...")
+    if job['progress']:
+        st.markdown("## 🔄 진행 과정")
+        for msg in job['progress']:
+            st.write(f"- {msg}")
+    if job['partial']:
+        st.markdown(f"## ✨ 생성된 게시글 (생성 중...)\n\n{job['partial']}", unsafe_allow_html=True)
+    # 번역이 끝난 언어는 작업 전체가 끝나기 전에 바로 표시
+    for lang, translated_post in job['parts'].items():
+        st.markdown('<div class="generated-post">', unsafe_allow_html=True)
+        st.markdown(f"### {lang}")
+        st.markdown(translated_post, unsafe_allow_html=True)
+        st.markdown('</div>', unsafe_allow_html=True)
 
 def main():
     # 세션 상태 초기화
@@ -457,8 +566,11 @@ def main():
         st.session_state['progress_messages'] = []
     if 'translated_posts' not in st.session_state:
         st.session_state['translated_posts'] = {}
-    if 'image_bytes_dict' not in st.session_state:
-        st.session_state['image_bytes_dict'] = {}
+    if 'image_store' not in st.session_state:
+        # Word 파일에 넣을 이미지 (메모리 상한을 넘으면 디스크에 저장)
+        st.session_state['image_store'] = SessionImageStore()
+    if 'word_files' not in st.session_state:
+        st.session_state['word_files'] = {}  # Word 파일 캐시 (게시글/이미지 내용이 바뀔 때만 다시 생성)
 
     # 커스텀 CSS 추가
     add_custom_css()
@@ -474,7 +586,6 @@ def main():
 
     # API 키 가져오기
     api_key, client_id, client_secret = get_api_keys()
-    client = create_openai_client(api_key)  # OpenAI 클라이언트 초기화
 
     # 시스템 프롬프트 읽기
     first_sys_prompt = read_sys_prompt('first_sys_prompt')
@@ -516,52 +627,49 @@ def main():
         example_text = example_file.read().decode('utf-8')
         st.sidebar.success("예시 텍스트 파일이 업로드되었습니다.")
 
-    if st.sidebar.button("📄 게시글 생성"):
-        st.session_state['progress_messages'] = []  # 진행 과정 초기화
-        st.session_state['translated_posts'] = {}    # 번역된 게시글 초기화
+    # 게시글을 토큰 단위로 받아 실시간으로 표시할지 여부
+    stream_post = st.sidebar.checkbox("게시글 실시간 표시 (스트리밍)", value=True)
+    use_keyword_cache = st.sidebar.checkbox("이전에 생성한 키워드 재사용 (캐시)", value=True)
+    zip_export = st.sidebar.checkbox("모든 언어를 ZIP 파일 하나로 다운로드 (Word + 마크다운)", value=False)
 
+    if st.sidebar.button("📄 게시글 생성"):
         if not user_question:
             st.error("작성하고자 하는 내용을 입력하세요.")
             return
 
-        # 이미지 캡션 및 바이트 생성
-        if uploaded_images:
-            with st.spinner("이미지 분석 중..."):
-                image_filenames, image_bytes_dict = analyze_uploaded_images(uploaded_images, st.session_state['progress_messages'])
-        else:
-            image_filenames = []
-            image_bytes_dict = {}
-            st.session_state['progress_messages'].append("이미지가 업로드되지 않았습니다.")
-
-        # 키워드 생성 (첫 번째 선택한 언어로)
-        if language_choices:
-            with st.spinner("키워드 생성 중..."):
-                keyword = generate_keywords(client, first_sys_prompt["content"], user_question, language_choices[0])
-                st.session_state['progress_messages'].append(f"추출된 키워드: {keyword}")
-        else:
+        if not language_choices:
             st.error("언어를 선택하세요.")
             return
 
-        # 네이버 블로그 검색
-        with st.spinner("블로그에서 참고자료 수집 중..."):
-            clean_description = search_naver_blog(client_id, client_secret, keyword)
-            st.session_state['progress_messages'].append("참고자료 수집 완료")
-
-        # 게시글 생성 (첫 번째 선택한 언어로)
-        with st.spinner("게시글 생성 중..."):
-            final_post = generate_final_post(client, second_sys_prompt["content"], chosen_format_content, user_question, clean_description, image_filenames, example_text, tone, language_choices[0])
-            st.session_state['generated_post'] = final_post  # 세션 상태에 저장
-
-        # 이미지 바이트를 세션 상태에 저장
-        st.session_state['image_bytes_dict'] = image_bytes_dict
+        # 게시글 생성은 백그라운드 작업으로 실행 (페이지를 새로 고치거나 위젯을 바꿔도 계속 진행)
+        # 이 세션의 이전 작업은 새 작업으로 대체되므로 이전 작업의 이미지 첨부는 버림
+        if st.session_state.get('job_id'):
+            get_job_queue().discard_attachments(st.session_state['job_id'])
+        images = [(uploaded_file.name, uploaded_file.getvalue()) for uploaded_file in uploaded_images or []]
+        job_id = get_job_queue().submit(
+            generate_post_job, api_key, client_id, client_secret, first_sys_prompt["content"], second_sys_prompt["content"],
+            chosen_format_content, user_question, images, example_text, tone, language_choices, stream_post, use_keyword_cache,
+        )
+        st.session_state['job_id'] = job_id
+        st.session_state['loaded_job_id'] = None
+        st.query_params['job'] = job_id  # 다시 접속해도 같은 작업 결과를 볼 수 있도록 주소에 작업 ID 기록
+        st.session_state['progress_messages'] = []  # 진행 과정 초기화
+        st.session_state['generated_post'] = ''
+        st.session_state['translated_posts'] = {}    # 번역된 게시글 초기화
 
-        # 선택된 다른 언어로 번역
-        if len(language_choices) > 1:
-            for lang in language_choices[1:]:
-                with st.spinner(f"{lang}로 번역 중..."):
-                    translated_post = translate_post(client, final_post, lang)
-                    st.session_state['translated_posts'][lang] = translated_post
-                    st.session_state['progress_messages'].append(f"{lang}로 번역 완료")
+    # 진행 중인 작업 표시 또는 끝난 작업 결과 불러오기
+    job_id = st.session_state.get('job_id') or st.query_params.get('job')
+    if job_id and job_id != st.session_state.get('loaded_job_id'):
+        st.session_state['job_id'] = job_id
+        job = get_job_queue().get(job_id)
+        if job is None:
+            st.warning("게시글 생성 작업을 찾을 수 없습니다. 다시 생성해 주세요.")
+            st.session_state['job_id'] = None
+            st.query_params.pop('job', None)
+        elif job['status'] in FINISHED:
+            load_job_result(job)
+        else:
+            show_job_progress(job_id)
 
     # 진행 과정 표시
     if st.session_state['progress_messages']:
@@ -574,35 +682,72 @@ def main():
     # 생성된 게시글 표시
     if st.session_state['generated_post']:
         st.markdown("## ✨ 생성된 게시글")
-        st.markdown('<div class="generated-post">', unsafe_allow_html=True)
-        st.markdown(f"### {language_choices[0]}")
-        st.markdown(st.session_state['generated_post'], unsafe_allow_html=True)
-        st.markdown('</div>', unsafe_allow_html=True)
-
-        # 게시글 Word 파일로 저장
-        word_file = save_post_to_word(st.session_state['generated_post'], st.session_state.get('image_bytes_dict', {}))
-        st.download_button(
-            label=f"📥 게시글 Word 파일로 다운로드 ({language_choices[0]})",
-            data=word_file,
-            file_name=f"generated_post_{language_choices[0]}.docx",
-            mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-        )
-
-        # 번역된 게시글 표시 및 다운로드
-        for lang, translated_post in st.session_state['translated_posts'].items():
+        # 첫 번째 언어 게시글과 번역된 게시글 (선택한 언어 순서대로)
+        translated_posts = st.session_state['translated_posts']
+        posts = [(st.session_state.get('post_language') or language_choices[0], st.session_state['generated_post'])]
+        for lang in sorted(translated_posts, key=lambda x: language_choices.index(x) if x in language_choices else len(language_choices)):
+            posts.append((lang, translated_posts[lang]))
+
+        # 게시글 Word 파일로 저장 (다운로드 버튼 클릭 등으로 다시 실행될 때는 캐시한 파일 사용)
+        image_bytes_dict = st.session_state['image_store']
+        digests = image_bytes_dict.digests()
+        word_files = st.session_state['word_files']
+        used_keys = set()
+        for lang, post in posts:
             st.markdown('<div class="generated-post">', unsafe_allow_html=True)
             st.markdown(f"### {lang}")
-            st.markdown(translated_post, unsafe_allow_html=True)
+            st.markdown(post, unsafe_allow_html=True)
             st.markdown('</div>', unsafe_allow_html=True)
 
-            # 번역된 게시글 Word 파일로 저장
-            translated_word_file = save_post_to_word(translated_post, st.session_state.get('image_bytes_dict', {}))
-            st.download_button(
-                label=f"📥 게시글 Word 파일로 다운로드 ({lang})",
-                data=translated_word_file,
-                file_name=f"generated_post_{lang}.docx",
-                mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-            )
+            if not zip_export:
+                st.download_button(
+                    label=f"📥 게시글 Word 파일로 다운로드 ({lang})",
+                    data=get_word_file(post, image_bytes_dict, digests, word_files, used_keys),
+                    file_name=f"generated_post_{lang}.docx",
+                    mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+                )
+
+        if zip_export:
+            # 모든 언어의 Word 파일을 ZIP 임시 파일 하나로 묶음 (게시글/이미지가 바뀔 때만 다시 생성)
+            # Word 파일은 언어별 다운로드와 같은 캐시(word_files)를 사용하고, 캐시에 없는 것만 동시에 만듦
+            names = [(f"generated_post_{lang}", post) for lang, post in posts]
+            post_keys = [word_file_key(post, digests) for _, post in names]
+            used_keys.update(post_keys)
+            key = bundle_key([(name, post_key) for (name, _), post_key in zip(names, post_keys)])
+            bundle = st.session_state.get('export_bundle')
+            if bundle is None or bundle['key'] != key or not os.path.exists(bundle['path']):
+                if bundle is not None and os.path.exists(bundle['path']):
+                    os.remove(bundle['path'])
+                bundle_stats = {}
+                with st.spinner("ZIP 파일 생성 중..."):
+                    path = write_bundle(names, lambda post: get_word_file(post, image_bytes_dict, digests, word_files, used_keys),
+                                        stats=bundle_stats)
+                bundle = {'key': key, 'path': path, 'stats': bundle_stats}
+                st.session_state['export_bundle'] = bundle
+            st.write(describe_bundle(bundle['stats']))
+            # download_button은 파일 객체도 전부 읽어 Streamlit 미디어 저장소(메모리)에 보관하므로, 다음 재실행까지 ZIP 전체가 메모리에 남음
+            with open(bundle['path'], 'rb') as bundle_file:
+                st.download_button(
+                    label="📥 모든 언어 게시글 ZIP 파일로 다운로드",
+                    data=bundle_file,
+                    file_name="generated_posts.zip",
+                    mime="application/zip"
+                )
+
+        # 더 이상 표시하지 않는 게시글의 Word 파일은 캐시에서 제거
+        for key in set(word_files) - used_keys:
+            del word_files[key]
+
+    # 관리자용 메모리 사용량 (ADMIN_VIEW=1)
+    if ADMIN_VIEW:
+        with st.sidebar.expander("메모리 사용량 (관리자)"):
+            st.write(f"프로세스 전체: {describe_memory_report(memory_report())}")
+            session_stats = st.session_state['image_store'].stats()
+            st.write(f"이 세션: 이미지 {session_stats['images']}개, 메모리 {session_stats['memory_bytes'] / 1e6:.1f}MB, "
+                     f"디스크 {session_stats['spilled_bytes'] / 1e6:.1f}MB")
+            if CAPTION_SERVICE_ENABLED:
+                st.write(f"캡션 서비스: {get_caption_service().describe()}")
+            st.write(f"캡션 추론: {admission.describe()}")
 
     # 푸터 추가
     st.markdown(
@@ -614,5 +759,10 @@ def main():
         unsafe_allow_html=True,
     )
 
+    # 페이지를 먼저 그린 뒤 BLIP 모델(torch/transformers)을 백그라운드에서 미리 로드
+    # (BLIP_WARMUP=0 이면 첫 이미지 분석 시 로드)
+    if os.getenv("BLIP_WARMUP", "1") != "0":
+        registry.warm_up()
+
 if __name__ == "__main__":
     main()
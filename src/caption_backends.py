@@ -0,0 +1,154 @@
+# src/caption_backends.py
+# BLIP 캡션 생성 추론 백엔드: eager fp32 / 동적 int8 양자화 / ONNX Runtime
+import os
+import re
+
+from disk_cache import CACHE_DIR
+from inference_budget import configure_torch_threads, onnx_session_options
+
+BACKENDS = ("eager", "int8", "onnx")
+
+# ONNX로 내보낸 모델을 저장할 폴더
+ONNX_DIR = os.path.join(CACHE_DIR, "onnx")
+
+
+class EagerBackend:
+    """기존과 같은 fp32 PyTorch 추론 (model.generate)"""
+
+    name = "eager"
+
+    def __init__(self, model):
+        self.model = model
+
+    def generate(self, pixel_values, max_new_tokens):
+        import torch
+
+        with torch.inference_mode():
+            return self.model.generate(pixel_values=pixel_values, max_new_tokens=max_new_tokens)
+
+
+class QuantizedBackend(EagerBackend):
+    """Linear 레이어를 int8로 동적 양자화한 PyTorch 추론"""
+
+    name = "int8"
+
+    def __init__(self, model):
+        import torch
+
+        # 가중치는 로드 시 한 번만 int8로 변환되고, 활성값은 추론 시 동적으로 양자화됨
+        super().__init__(torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True))
+
+
+class OnnxBackend:
+    """
+    비전 인코더와 텍스트 디코더를 ONNX로 내보내 ONNX Runtime에서 greedy 디코딩합니다.
+    디코더는 과거 키/값 캐시 없이 매 스텝 전체 시퀀스를 다시 계산합니다 (캡션은 50토큰 이하로 짧음).
+    """
+
+    name = "onnx"
+
+    def __init__(self, model_dir, bos_token_id, eos_token_id, pad_token_id):
+        import onnxruntime as ort
+
+        options = onnx_session_options(ort.SessionOptions())
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        providers = ["CPUExecutionProvider"]
+        self.vision = ort.InferenceSession(os.path.join(model_dir, "vision.onnx"), options, providers=providers)
+        self.decoder = ort.InferenceSession(os.path.join(model_dir, "decoder.onnx"), options, providers=providers)
+        self.bos_token_id = bos_token_id
+        self.eos_token_id = eos_token_id
+        self.pad_token_id = pad_token_id
+
+    def generate(self, pixel_values, max_new_tokens):
+        import numpy as np
+
+        image_embeds = self.vision.run(None, {"pixel_values": pixel_values.numpy()})[0]
+        batch_size = image_embeds.shape[0]
+        input_ids = np.full((batch_size, 1), self.bos_token_id, dtype=np.int64)
+        finished = np.zeros(batch_size, dtype=bool)
+        for _ in range(max_new_tokens):
+            logits = self.decoder.run(None, {"input_ids": input_ids, "encoder_hidden_states": image_embeds})[0]
+            next_tokens = np.where(finished, self.pad_token_id, logits.argmax(axis=-1))
+            input_ids = np.concatenate([input_ids, next_tokens[:, None]], axis=1)
+            finished |= next_tokens == self.eos_token_id
+            if finished.all():
+                break
+        return input_ids
+
+
+def _onnx_model_dir(model_id):
+    return os.path.join(ONNX_DIR, re.sub(r'[^A-Za-z0-9_.-]+', '_', model_id))
+
+
+def export_onnx(model, model_dir):
+    # 비전 인코더(pixel_values → image_embeds)와 디코더 한 스텝(input_ids, image_embeds → 마지막 토큰 logits)을 내보냄
+    import torch
+
+    class VisionEncoder(torch.nn.Module):
+        def __init__(self, vision_model):
+            super().__init__()
+            self.vision_model = vision_model
+
+        def forward(self, pixel_values):
+            return self.vision_model(pixel_values=pixel_values)[0]
+
+    class DecoderStep(torch.nn.Module):
+        def __init__(self, text_decoder):
+            super().__init__()
+            self.text_decoder = text_decoder
+
+        def forward(self, input_ids, encoder_hidden_states):
+            outputs = self.text_decoder(input_ids=input_ids, encoder_hidden_states=encoder_hidden_states, use_cache=False, return_dict=True)
+            return outputs.logits[:, -1, :]
+
+    os.makedirs(model_dir, exist_ok=True)
+    image_size = model.config.vision_config.image_size
+    pixel_values = torch.zeros(2, 3, image_size, image_size)
+    with torch.no_grad():
+        image_embeds = VisionEncoder(model.vision_model)(pixel_values)
+    input_ids = torch.full((2, 2), model.config.text_config.bos_token_id, dtype=torch.long)
+
+    # 여러 프로세스가 동시에 내보내도 안전하도록 임시 파일에 쓴 뒤 교체
+    exports = [
+        ("vision.onnx", VisionEncoder(model.vision_model), (pixel_values,), ["pixel_values"], ["image_embeds"],
+         {"pixel_values": {0: "batch"}, "image_embeds": {0: "batch"}}),
+        ("decoder.onnx", DecoderStep(model.text_decoder), (input_ids, image_embeds), ["input_ids", "encoder_hidden_states"], ["logits"],
+         {"input_ids": {0: "batch", 1: "sequence"}, "encoder_hidden_states": {0: "batch"}, "logits": {0: "batch"}}),
+    ]
+    for filename, module, args, input_names, output_names, dynamic_axes in exports:
+        path = os.path.join(model_dir, filename)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with torch.no_grad():
+            torch.onnx.export(module, args, tmp_path, input_names=input_names, output_names=output_names,
+                              dynamic_axes=dynamic_axes, opset_version=17, dynamo=False)
+        os.replace(tmp_path, path)
+
+
+def load_backend(name, model_id):
+    """
+    백엔드 이름에 맞는 (processor, backend) 튜플을 생성합니다. 첫 로드 때 torch 스레드 수를 설정합니다.
+    onnx 백엔드는 내보낸 파일이 없을 때만 fp32 모델을 로드해 내보내고, 이후에는 ONNX 파일만 사용합니다.
+    """
+    from transformers import AutoConfig, BlipForConditionalGeneration, BlipProcessor
+
+    if name not in BACKENDS:
+        raise ValueError(f"지원하지 않는 캡션 백엔드입니다: {name} (사용 가능: {', '.join(BACKENDS)})")
+
+    # 모델을 로드하기 전에 torch 스레드 수를 추론 예산(INFERENCE_THREADS)에 맞춤
+    configure_torch_threads()
+    processor = BlipProcessor.from_pretrained(model_id)
+    if name == "onnx":
+        model_dir = _onnx_model_dir(model_id)
+        if not all(os.path.exists(os.path.join(model_dir, f)) for f in ("vision.onnx", "decoder.onnx")):
+            model = BlipForConditionalGeneration.from_pretrained(model_id)
+            model.eval()
+            export_onnx(model, model_dir)
+            del model
+        text_config = AutoConfig.from_pretrained(model_id).text_config
+        return processor, OnnxBackend(model_dir, text_config.bos_token_id, text_config.sep_token_id, text_config.pad_token_id)
+
+    model = BlipForConditionalGeneration.from_pretrained(model_id)
+    model.eval()
+    if name == "int8":
+        return processor, QuantizedBackend(model)
+    return processor, EagerBackend(model)
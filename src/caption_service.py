@@ -0,0 +1,170 @@
+# src/caption_service.py
+# 모든 세션의 캡션 요청을 하나의 작업 스레드로 모아, 짧은 시간 안에 들어온 이미지를 한 번의 배치 generate로 처리합니다.
+# 세션마다 따로 추론해 CPU를 나눠 쓰는 대신, 동시에 들어온 요청을 묶어 처리량을 높입니다.
+import os
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, InvalidStateError, wait
+
+from captioning import (BLIP_MODEL_ID, CAPTION_BACKEND, DEFAULT_BATCH_SIZE, MAX_NEW_TOKENS, CaptionResult,
+                        _generate_captions, registry)
+
+# 첫 요청이 들어온 뒤 같은 배치에 묶을 요청을 기다리는 시간(초)
+CAPTION_BATCH_WINDOW = float(os.getenv("CAPTION_BATCH_WINDOW", "0.02"))
+# caption()이 결과를 기다리는 최대 시간(초), 넘으면 남은 이미지는 error가 채워진 결과로 반환
+CAPTION_TIMEOUT = float(os.getenv("CAPTION_TIMEOUT", "300"))
+
+
+class CaptionService:
+    """
+    submit(파일명, PIL 이미지)로 받은 요청을 큐에 쌓고, 작업 스레드 하나가 CAPTION_BATCH_WINDOW 동안 모인 요청을
+    최대 max_batch_size장까지 묶어 한 번의 generate로 처리합니다. 추론 중에 들어온 요청은 다음 배치로 묶입니다.
+    요청마다 CaptionResult를 돌려주는 Future를 반환하며, 실패한 이미지는 error가 채워진 결과가 됩니다.
+    """
+
+    def __init__(self, model_id=BLIP_MODEL_ID, backend=CAPTION_BACKEND, max_new_tokens=MAX_NEW_TOKENS,
+                 max_batch_size=DEFAULT_BATCH_SIZE, window=CAPTION_BATCH_WINDOW, timeout=CAPTION_TIMEOUT):
+        self.model_id = model_id
+        self.backend = backend
+        self.max_new_tokens = max_new_tokens
+        self.max_batch_size = max(1, max_batch_size)
+        self.window = window
+        self.timeout = timeout
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        # 지표
+        self._batch_sizes = Counter()
+        self._images = 0
+        self._max_queue_depth = 0
+        self._wait_seconds = 0.0
+        self._inference_seconds = 0.0
+
+    def submit(self, filename, image):
+        # 이미지 한 장의 캡션 요청을 큐에 넣고 Future 반환 (작업 스레드는 첫 요청 때 시작)
+        future = Future()
+        self._queue.put((filename, image, future, time.perf_counter()))
+        with self._lock:
+            self._max_queue_depth = max(self._max_queue_depth, self._queue.qsize())
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=f"caption-{self.backend}", daemon=True)
+                self._thread.start()
+        return future
+
+    def caption(self, items):
+        """
+        (파일명, 이미지 로더) 목록을 이미지가 준비되는 대로 제출하고, 입력 순서대로 CaptionResult 목록을 반환합니다.
+        caption_images와 같은 형태이며, 로더가 실패한 이미지는 제출하지 않고 error가 채워진 결과로 남깁니다.
+        모든 결과를 최대 timeout초까지 기다리며, 그 안에 끝나지 않은 이미지는 (아직 시작 전이면 요청을 취소하고) error가 채워진 결과로 반환합니다.
+        """
+        pending = []
+        for filename, load_image in items:
+            try:
+                pending.append((filename, self.submit(filename, load_image())))
+            except Exception as e:
+                pending.append((filename, CaptionResult(filename, None, str(e))))
+        wait([item for _, item in pending if isinstance(item, Future)], timeout=self.timeout)
+        results = []
+        for filename, item in pending:
+            if isinstance(item, Future):
+                if not item.done():
+                    item.cancel()
+                    item = CaptionResult(filename, None, f"캡션 대기 시간 초과 ({self.timeout:g}초)")
+                elif item.cancelled():
+                    item = CaptionResult(filename, None, "캡션 요청이 취소됨")
+                else:
+                    item = item.result()
+            results.append(item)
+        return results
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            try:
+                deadline = time.perf_counter() + self.window
+                while len(batch) < self.max_batch_size:
+                    try:
+                        batch.append(self._queue.get(timeout=max(0.0, deadline - time.perf_counter())))
+                    except queue.Empty:
+                        break
+                # 이미 취소된 요청은 제외
+                batch = [request for request in batch if request[2].set_running_or_notify_cancel()]
+                if batch:
+                    self._process(batch)
+            except Exception as e:
+                # 예상하지 못한 오류는 이번 배치의 요청만 실패로 처리하고, 작업 스레드는 계속 다음 요청을 처리
+                for filename, _, future, _ in batch:
+                    try:
+                        future.set_result(CaptionResult(filename, None, str(e)))
+                    except InvalidStateError:
+                        # 이미 결과가 있거나 취소된 요청
+                        pass
+
+    def _process(self, batch):
+        start = time.perf_counter()
+        try:
+            processor, backend = registry.get_backend(self.backend, self.model_id)
+            try:
+                captions = _generate_captions(processor, backend, [image for _, image, _, _ in batch], self.max_new_tokens)
+                results = [CaptionResult(filename, caption.strip(), None) for (filename, _, _, _), caption in zip(batch, captions)]
+            except Exception:
+                # 배치 전체가 실패하면 한 장씩 다시 처리해 실패한 이미지만 골라냄
+                results = []
+                for filename, image, _, _ in batch:
+                    try:
+                        caption = _generate_captions(processor, backend, [image], self.max_new_tokens)[0]
+                        results.append(CaptionResult(filename, caption.strip(), None))
+                    except Exception as e:
+                        results.append(CaptionResult(filename, None, str(e)))
+        except Exception as e:
+            # 모델 로드 실패 등 (작업 스레드는 계속 다음 요청을 처리)
+            results = [CaptionResult(filename, None, str(e)) for filename, _, _, _ in batch]
+        end = time.perf_counter()
+
+        with self._lock:
+            self._batch_sizes[len(batch)] += 1
+            self._images += len(batch)
+            self._wait_seconds += sum(start - submitted for _, _, _, submitted in batch)
+            self._inference_seconds += end - start
+        for (_, _, future, _), result in zip(batch, results):
+            future.set_result(result)
+
+    def stats(self):
+        # 큐 길이와 배치 크기 지표
+        with self._lock:
+            batches = sum(self._batch_sizes.values())
+            return {
+                "queue_depth": self._queue.qsize(),
+                "max_queue_depth": self._max_queue_depth,
+                "batches": batches,
+                "images": self._images,
+                "batch_sizes": dict(sorted(self._batch_sizes.items())),
+                "mean_batch_size": self._images / batches if batches else 0.0,
+                "mean_wait_seconds": self._wait_seconds / self._images if self._images else 0.0,
+                "inference_seconds": self._inference_seconds,
+            }
+
+    def describe(self):
+        # 진행 과정/관리자 화면 표시용 요약 문자열
+        stats = self.stats()
+        sizes = ", ".join(f"{size}장×{count}" for size, count in stats["batch_sizes"].items()) or "없음"
+        return (f"대기 {stats['queue_depth']}장 (최대 {stats['max_queue_depth']}장), 배치 {stats['batches']}회/"
+                f"이미지 {stats['images']}장 (평균 {stats['mean_batch_size']:.1f}장, {sizes}), "
+                f"평균 대기 {stats['mean_wait_seconds'] * 1000:.0f}ms, 추론 {stats['inference_seconds']:.1f}초")
+
+
+_services = {}
+_services_lock = threading.Lock()
+
+
+def get_caption_service(model_id=BLIP_MODEL_ID, backend=CAPTION_BACKEND, max_new_tokens=MAX_NEW_TOKENS):
+    # 프로세스 전체에서 (모델 ID, 백엔드, 생성 설정)별로 같은 캡션 서비스 사용
+    key = (model_id, backend, max_new_tokens)
+    with _services_lock:
+        service = _services.get(key)
+        if service is None:
+            service = CaptionService(model_id, backend, max_new_tokens)
+            _services[key] = service
+    return service
@@ -0,0 +1,269 @@
+# src/captioning.py
+# 이미지 캡션 생성에 사용하는 BLIP 모델(추론 백엔드)을 프로세스 전체에서 한 번만 로드해 공유합니다.
+import hashlib
+import os
+import sys
+import threading
+import time
+from collections import namedtuple
+
+import inference_budget
+from disk_cache import CACHE_DIR, DiskCache
+from image_preprocess import preprocess_async
+
+# 사용할 BLIP 모델 (BLIP_MODEL_ID 환경 변수로 로컬 경로 등 지정 가능)
+BLIP_MODEL_ID = os.getenv("BLIP_MODEL_ID", "Salesforce/blip-image-captioning-base")
+# 추론 백엔드: eager(fp32) / int8(동적 양자화) / onnx(ONNX Runtime)
+CAPTION_BACKEND = os.getenv("CAPTION_BACKEND", "eager")
+
+
+def get_rss_mb():
+    # 현재 프로세스의 상주 메모리(RSS)를 MB 단위로 반환 (측정 불가 시 None)
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS는 바이트, Linux는 KB 단위 (최대 RSS 값)
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    except (ImportError, OSError):
+        return None
+
+
+class ModelRegistry:
+    """
+    BLIP 프로세서와 추론 백엔드를 (모델 ID, 백엔드)별로 한 번만 로드해 보관합니다.
+    Streamlit의 모든 세션과 CLI가 같은 인스턴스를 재사용합니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._models = {}
+        self._stats = {}
+        self._warmup_threads = {}
+
+    def get_backend(self, backend=CAPTION_BACKEND, model_id=BLIP_MODEL_ID):
+        # (processor, backend) 튜플 반환, 이미 로드된 백엔드는 잠금 없이 바로 반환
+        key = (model_id, backend)
+        entry = self._models.get(key)
+        if entry is not None:
+            return entry
+        with self._lock:
+            entry = self._models.get(key)
+            if entry is None:
+                entry = self._load(backend, model_id)
+                self._models[key] = entry
+        return entry
+
+    def get(self, model_id=BLIP_MODEL_ID):
+        # fp32 eager 모델의 (processor, model) 튜플 반환
+        processor, backend = self.get_backend("eager", model_id)
+        return processor, backend.model
+
+    def _load(self, backend, model_id):
+        from caption_backends import load_backend
+
+        rss_before = get_rss_mb()
+        start = time.perf_counter()
+        entry = load_backend(backend, model_id)
+        self._stats[(model_id, backend)] = {
+            "load_seconds": time.perf_counter() - start,
+            "rss_before_mb": rss_before,
+            "rss_after_mb": get_rss_mb(),
+        }
+        return entry
+
+    def is_loaded(self, backend=CAPTION_BACKEND, model_id=BLIP_MODEL_ID):
+        return (model_id, backend) in self._models
+
+    def warm_up(self, backend=CAPTION_BACKEND, model_id=BLIP_MODEL_ID, background=True):
+        # 시작 시 모델을 미리 로드 (background=True면 별도 스레드에서 로드)
+        if not background:
+            self.get_backend(backend, model_id)
+            return None
+        key = (model_id, backend)
+        with self._lock:
+            thread = self._warmup_threads.get(key)
+            if thread is None and key not in self._models:
+                thread = threading.Thread(target=self._warm_up, args=key, name=f"warmup-{model_id}-{backend}", daemon=True)
+                self._warmup_threads[key] = thread
+                thread.start()
+        return thread
+
+    def _warm_up(self, model_id, backend):
+        key = (model_id, backend)
+        try:
+            self.get_backend(backend, model_id)
+        finally:
+            # 로드에 실패하면 기록을 지워 다음 warm_up 호출에서 다시 시도
+            if key not in self._models:
+                with self._lock:
+                    self._warmup_threads.pop(key, None)
+
+    def stats(self, backend=CAPTION_BACKEND, model_id=BLIP_MODEL_ID):
+        return self._stats.get((model_id, backend))
+
+    def describe(self, backend=CAPTION_BACKEND, model_id=BLIP_MODEL_ID):
+        # 진행 과정 표시에 사용할 로드 시간/메모리 요약 문자열
+        stats = self.stats(backend, model_id)
+        if stats is None:
+            return f"{model_id} ({backend}): 아직 로드되지 않음"
+        rss = stats["rss_after_mb"]
+        rss_text = f"{rss:.0f}MB" if rss is not None else "측정 불가"
+        return f"{model_id} ({backend}): 로드 {stats['load_seconds']:.1f}초, 프로세스 메모리 {rss_text}"
+
+
+# 프로세스 전역 레지스트리
+registry = ModelRegistry()
+
+
+def get_blip(model_id=BLIP_MODEL_ID):
+    # (processor, model) 튜플 반환, 최초 호출 시에만 로드
+    return registry.get(model_id)
+
+
+# 한 번의 generate 호출에 묶을 이미지 수 (CAPTION_BATCH_SIZE 환경 변수로 변경 가능)
+DEFAULT_BATCH_SIZE = int(os.getenv("CAPTION_BATCH_SIZE", "8"))
+MAX_NEW_TOKENS = 50
+
+
+class CaptionResult(namedtuple("CaptionResult", ["filename", "caption", "error", "cached"], defaults=(False,))):
+    __slots__ = ()
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def _generate_captions(processor, backend, images, max_new_tokens):
+    # 여러 이미지를 한 번에 전처리하고, 패딩된 배치로 생성한 뒤 디코딩
+    # (generate는 동시 추론 수 제한(INFERENCE_CONCURRENCY) 안에서만 실행)
+    inputs = processor(images=images, return_tensors="pt")
+    with inference_budget.admission.admit():
+        out = backend.generate(inputs["pixel_values"], max_new_tokens)
+    return processor.batch_decode(out, skip_special_tokens=True)
+
+
+def caption_images(items, batch_size=None, model_id=BLIP_MODEL_ID, max_new_tokens=MAX_NEW_TOKENS, backend=CAPTION_BACKEND):
+    """
+    (파일명, 이미지 로더) 목록을 batch_size 단위로 묶어 캡션을 생성합니다.
+    이미지 로더는 PIL 이미지를 반환하는 함수이며, 결과는 입력 순서대로 CaptionResult 목록으로 반환합니다.
+    로드 또는 생성에 실패한 이미지는 error가 채워진 결과로 남고, 같은 배치의 나머지 이미지는 계속 처리됩니다.
+    """
+    batch_size = max(1, batch_size or DEFAULT_BATCH_SIZE)
+    processor, backend = registry.get_backend(backend, model_id)
+
+    results = [None] * len(items)
+    pending = []  # (결과 인덱스, 파일명, 이미지)
+
+    def flush():
+        if not pending:
+            return
+        try:
+            captions = _generate_captions(processor, backend, [image for _, _, image in pending], max_new_tokens)
+            for (index, filename, _), caption in zip(pending, captions):
+                results[index] = CaptionResult(filename, caption.strip(), None)
+        except Exception:
+            # 배치 전체가 실패하면 한 장씩 다시 처리해 실패한 이미지만 골라냄
+            for index, filename, image in pending:
+                try:
+                    caption = _generate_captions(processor, backend, [image], max_new_tokens)[0]
+                    results[index] = CaptionResult(filename, caption.strip(), None)
+                except Exception as e:
+                    results[index] = CaptionResult(filename, None, str(e))
+        pending.clear()
+
+    for index, (filename, load_image) in enumerate(items):
+        try:
+            image = load_image()
+        except Exception as e:
+            results[index] = CaptionResult(filename, None, str(e))
+            continue
+        pending.append((index, filename, image))
+        if len(pending) >= batch_size:
+            flush()
+    flush()
+
+    return results
+
+
+# 캡션 캐시 설정 (CAPTION_CACHE=0 이면 사용하지 않음)
+CAPTION_CACHE_ENABLED = os.getenv("CAPTION_CACHE", "1") != "0"
+CAPTION_CACHE_MAX_ENTRIES = int(os.getenv("CAPTION_CACHE_MAX_ENTRIES", "5000"))
+# 캐시에 없는 이미지를 모든 세션이 공유하는 캡션 서비스(caption_service.py)로 처리 (CAPTION_SERVICE=0 이면 요청마다 따로 추론)
+CAPTION_SERVICE_ENABLED = os.getenv("CAPTION_SERVICE", "1") != "0"
+
+_caption_cache = None
+_caption_cache_lock = threading.Lock()
+
+
+def get_caption_cache():
+    # 프로세스당 하나의 캡션 캐시 인스턴스 (파일은 모든 프로세스가 공유)
+    global _caption_cache
+    if not CAPTION_CACHE_ENABLED:
+        return None
+    with _caption_cache_lock:
+        if _caption_cache is None:
+            _caption_cache = DiskCache(os.path.join(CACHE_DIR, "captions.sqlite"), max_entries=CAPTION_CACHE_MAX_ENTRIES)
+    return _caption_cache
+
+
+def caption_cache_key(image_bytes, model_id=BLIP_MODEL_ID, max_new_tokens=MAX_NEW_TOKENS, backend=CAPTION_BACKEND):
+    # 이미지 내용 해시 + 모델 ID + 생성 설정(백엔드 포함)으로 캐시 키 생성
+    digest = hashlib.sha256(image_bytes).hexdigest()
+    return f"{digest}:{model_id}:{backend}:max_new_tokens={max_new_tokens}"
+
+
+def caption_image_bytes(items, batch_size=None, model_id=BLIP_MODEL_ID, max_new_tokens=MAX_NEW_TOKENS, backend=CAPTION_BACKEND, cache=None, preprocess_stats=None):
+    """
+    (파일명, 이미지 바이트) 목록의 캡션을 생성합니다.
+    캐시에 있는 이미지는 디코딩과 모델 추론 없이 바로 반환하고(cached=True), 나머지만 배치로 처리해 캐시에 저장합니다.
+    캐시에 없는 이미지는 전처리 스레드 풀에서 미리 축소 디코딩되어 앞 배치의 추론과 겹쳐 실행되며,
+    preprocess_stats 리스트를 넘기면 이미지별 PreprocessStats가 입력 순서대로 추가됩니다.
+    batch_size를 지정하지 않으면 공유 캡션 서비스에 제출해 다른 세션의 요청과 한 배치로 묶어 처리합니다.
+    """
+    if cache is None:
+        cache = get_caption_cache()
+
+    results = [None] * len(items)
+    misses = []  # (결과 인덱스, 캐시 키, 파일명, 이미지 바이트)
+    for index, (filename, image_bytes) in enumerate(items):
+        key = caption_cache_key(image_bytes, model_id, max_new_tokens, backend)
+        caption = cache.get(key) if cache is not None else None
+        if caption is not None:
+            results[index] = CaptionResult(filename, caption, None, True)
+        else:
+            misses.append((index, key, filename, image_bytes))
+
+    if misses:
+        def load_image(future):
+            image, stats = future.result()
+            if preprocess_stats is not None:
+                preprocess_stats.append(stats)
+            return image
+
+        futures = preprocess_async([(filename, image_bytes) for _, _, filename, image_bytes in misses])
+        loaders = [(filename, lambda f=future: load_image(f)) for filename, future in futures]
+        if CAPTION_SERVICE_ENABLED and batch_size is None:
+            from caption_service import get_caption_service
+
+            generated = get_caption_service(model_id, backend, max_new_tokens).caption(loaders)
+        else:
+            generated = caption_images(
+                loaders,
+                batch_size=batch_size,
+                model_id=model_id,
+                max_new_tokens=max_new_tokens,
+                backend=backend,
+            )
+        for (index, key, _, _), result in zip(misses, generated):
+            if result.ok and cache is not None:
+                cache.set(key, result.caption)
+            results[index] = result
+
+    return results
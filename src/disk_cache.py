@@ -0,0 +1,120 @@
+# src/disk_cache.py
+# 여러 Streamlit 워커 프로세스와 CLI가 함께 사용할 수 있는 SQLite 기반 디스크 캐시
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# 캐시 파일을 저장할 폴더 (CACHE_DIR 환경 변수로 변경 가능)
+CACHE_DIR = os.getenv("CACHE_DIR", ".cache")
+
+
+class DiskCache:
+    """
+    키-값(JSON 직렬화 가능한 값) 캐시를 SQLite 파일에 저장합니다.
+    WAL 모드와 busy_timeout을 사용해 여러 프로세스가 같은 파일을 동시에 읽고 쓸 수 있으며,
+    max_entries / max_bytes를 넘으면 가장 오래 사용하지 않은 항목부터 삭제합니다(LRU).
+    ttl(초)을 지정하면 저장 후 ttl이 지난 항목은 없는 것으로 처리합니다.
+    """
+
+    def __init__(self, path, max_entries=None, max_bytes=None, ttl=None):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)")
+
+    def _connect(self):
+        # sqlite3 연결은 스레드 간에 공유할 수 없으므로 스레드마다 따로 생성
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, hit):
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def _expired(self, created_at, now):
+        return self.ttl is not None and now - created_at > self.ttl
+
+    def get(self, key, default=None):
+        conn = self._connect()
+        row = conn.execute("SELECT value, created_at FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None or self._expired(row[1], time.time()):
+            self._count(False)
+            return default
+        with conn:
+            conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        self._count(True)
+        return json.loads(row[0])
+
+    def set(self, key, value):
+        data = json.dumps(value, ensure_ascii=False)
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, data, len(data.encode("utf-8")), now, now),
+            )
+            self._evict(conn)
+
+    def delete(self, key):
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def _evict(self, conn):
+        # 만료된 항목을 먼저 지우고, 항목 수 / 총 크기 제한을 넘으면 오래 사용하지 않은 항목부터 삭제
+        if self.ttl is not None:
+            conn.execute("DELETE FROM entries WHERE created_at < ?", (time.time() - self.ttl,))
+        if self.max_entries is not None:
+            conn.execute(
+                "DELETE FROM entries WHERE key IN ("
+                " SELECT key FROM entries ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+        if self.max_bytes is not None:
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total > self.max_bytes:
+                for key, size in conn.execute("SELECT key, size FROM entries ORDER BY accessed_at").fetchall():
+                    conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                    total -= size
+                    if total <= self.max_bytes:
+                        break
+
+    def __len__(self):
+        return self._connect().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+            "entries": len(self),
+        }
@@ -0,0 +1,87 @@
+# src/export_bundle.py
+# 여러 언어의 게시글을 Word 파일 + 마크다운 원문으로 묶은 ZIP 파일 생성
+# Word 파일은 작업 풀에서 동시에 만들고, 끝나는 순서대로 임시 파일의 ZIP에 바로 기록해 메모리에 묶음 전체를 들고 있지 않습니다.
+import hashlib
+import os
+import tempfile
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# 동시에 만들 Word 파일 수
+EXPORT_WORKERS = int(os.getenv("EXPORT_WORKERS", "4"))
+# ZIP 파일을 저장할 폴더와, 이 시간(초)보다 오래된 ZIP 파일은 새 ZIP을 만들 때 삭제
+EXPORT_DIR = os.getenv("EXPORT_DIR", os.path.join(tempfile.gettempdir(), "cafeblog_exports"))
+EXPORT_MAX_AGE = int(os.getenv("EXPORT_MAX_AGE", "86400"))
+
+
+def bundle_key(entries):
+    # [(파일 이름, 게시글 캐시 키)] 목록으로 만든 ZIP 캐시 키 (게시글이나 이미지가 바뀌면 달라짐)
+    key = hashlib.sha256()
+    for name, post_key in entries:
+        key.update(f"{name}\0{post_key}\0".encode('utf-8'))
+    return key.hexdigest()
+
+
+def remove_old_bundles(directory=EXPORT_DIR, max_age=EXPORT_MAX_AGE):
+    # 끝난 세션이 남긴 오래된 ZIP 파일 정리
+    if not os.path.isdir(directory):
+        return
+    cutoff = time.time() - max_age
+    for filename in os.listdir(directory):
+        path = os.path.join(directory, filename)
+        try:
+            if filename.endswith('.zip') and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
+
+
+def write_bundle(posts, render_docx, directory=EXPORT_DIR, max_workers=EXPORT_WORKERS, stats=None):
+    """
+    posts([(파일 이름, 게시글)])의 각 게시글을 "이름.md"와 render_docx(게시글)로 만든 "이름.docx"로 묶은
+    ZIP 파일을 directory에 만들고 경로를 반환합니다. Word 파일은 max_workers개씩 동시에 만들며,
+    완성된 파일은 바로 ZIP에 기록하고 버리므로 메모리에는 만드는 중인 Word 파일만 남습니다.
+    stats 사전을 넘기면 파일 수, ZIP 크기, 소요 시간을 채웁니다.
+    """
+    start = time.perf_counter()
+    os.makedirs(directory, exist_ok=True)
+    remove_old_bundles(directory)
+    fd, path = tempfile.mkstemp(suffix='.zip', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as file, zipfile.ZipFile(file, 'w') as archive:
+            for name, post in posts:
+                archive.writestr(f"{name}.md", post, compress_type=zipfile.ZIP_DEFLATED)
+            workers = max(1, min(max_workers, len(posts)))
+            pending = iter(posts)
+            futures = {}  # 만드는 중인 Word 파일만 보관 (최대 workers개)
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="export") as executor:
+                for name, post in pending:
+                    futures[executor.submit(render_docx, post)] = name
+                    if len(futures) >= workers:
+                        break
+                while futures:
+                    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        # docx는 이미 압축된 형식이므로 다시 압축하지 않음, 기록한 파일은 바로 버림
+                        archive.writestr(f"{futures.pop(future)}.docx", future.result(), compress_type=zipfile.ZIP_STORED)
+                        # 하나를 기록한 뒤에야 다음 게시글을 제출
+                        for name, post in pending:
+                            futures[executor.submit(render_docx, post)] = name
+                            break
+    except BaseException:
+        os.remove(path)
+        raise
+
+    if stats is not None:
+        stats.update({
+            "posts": len(posts),
+            "bytes": os.path.getsize(path),
+            "seconds": time.perf_counter() - start,
+        })
+    return path
+
+
+def describe_bundle(stats):
+    # 진행 과정 표시용 요약 문자열
+    return f"게시글 {stats['posts']}개 (Word + 마크다운), ZIP {stats['bytes'] / 1e6:.2f}MB, {stats['seconds']:.1f}초"
@@ -0,0 +1,238 @@
+# src/image_preprocess.py
+# 캡션 모델 입력용 이미지 전처리: 축소 디코딩 + RGB 변환을 스레드 풀에서 수행
+# Word 파일에 넣을 이미지도 인쇄 폭 × DPI 크기로 줄이고 다시 압축합니다.
+import hashlib
+import os
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from PIL import Image, ImageOps
+
+# BLIP 프로세서가 최종적으로 사용하는 입력 크기
+CAPTION_IMAGE_SIZE = 384
+# 전처리 스레드 수 (PREPROCESS_WORKERS 환경 변수로 변경 가능)
+PREPROCESS_WORKERS = int(os.getenv("PREPROCESS_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# 기존 방식(원본 디코딩) 소요 시간도 측정해 절약 시간을 보고할지 여부
+# 이미지마다 원본을 한 번 더 디코딩하므로 기본값은 측정하지 않음 (PREPROCESS_MEASURE_BASELINE=1로 사용)
+PREPROCESS_MEASURE_BASELINE = os.getenv("PREPROCESS_MEASURE_BASELINE", "0") == "1"
+
+# Word 파일에 넣는 이미지: 인쇄 폭(인치) × DPI 픽셀 폭으로 줄이고, 투명 영역이 없으면 이 품질의 JPEG로 압축
+DOCX_IMAGE_WIDTH = float(os.getenv("DOCX_IMAGE_WIDTH", "5"))
+DOCX_IMAGE_DPI = int(os.getenv("DOCX_IMAGE_DPI", "150"))
+DOCX_IMAGE_QUALITY = int(os.getenv("DOCX_IMAGE_QUALITY", "85"))
+
+# EXIF 방향 값 중 가로/세로가 바뀌는 값
+_TRANSPOSED_ORIENTATIONS = (5, 6, 7, 8)
+
+
+class PreprocessStats(namedtuple(
+    "PreprocessStats",
+    ["filename", "original_size", "decoded_size", "bytes_full", "bytes_decoded", "seconds", "baseline_seconds", "output_size"],
+    defaults=(None, None),
+)):
+    # decoded_size/bytes_decoded는 PIL이 실제로 디코딩한 크기 (JPEG는 draft로 줄어든 크기, 그 외 형식은 원본 크기),
+    # output_size는 thumbnail까지 적용해 모델에 넘기는 이미지 크기
+    __slots__ = ()
+
+    @property
+    def seconds_saved(self):
+        if self.baseline_seconds is None:
+            return None
+        return self.baseline_seconds - self.seconds
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_preprocess_pool():
+    # PIL 디코딩은 GIL을 해제하므로 스레드 풀로 모델 추론과 겹쳐 실행 가능
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=PREPROCESS_WORKERS, thread_name_prefix="preprocess")
+    return _pool
+
+
+def _reduced_size(size, target_size):
+    # 짧은 변이 target_size가 되도록 비율을 유지해 축소 (확대는 하지 않음)
+    width, height = size
+    scale = target_size / min(width, height)
+    if scale >= 1:
+        return size
+    return max(target_size, round(width * scale)), max(target_size, round(height * scale))
+
+
+def _to_rgb(image):
+    # 투명 영역은 흰 배경으로 합성한 뒤 RGB로 한 번만 변환
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    if image.mode != 'RGB':
+        return image.convert('RGB')
+    return image
+
+
+def _resize_for_model(image, target_size):
+    # BLIP 프로세서가 수행하는 최종 리사이즈와 같은 작업
+    return image.convert('RGB').resize((target_size, target_size), Image.Resampling.BICUBIC)
+
+
+def measure_full_decode(image_bytes, target_size=CAPTION_IMAGE_SIZE):
+    # 비교용: 기존 방식(원본 해상도 디코딩 + RGBA 변환 + 모델 입력 크기로 리사이즈)에 걸리는 시간
+    start = time.perf_counter()
+    image = Image.open(BytesIO(image_bytes))
+    if image.mode != 'RGBA':
+        image = image.convert('RGBA')
+    _resize_for_model(image, target_size)
+    return time.perf_counter() - start
+
+
+def load_for_caption(image_bytes, filename=None, target_size=CAPTION_IMAGE_SIZE, measure_baseline=PREPROCESS_MEASURE_BASELINE):
+    """
+    이미지 바이트를 캡션 모델 입력 크기에 맞춰 축소 디코딩하고 RGB로 변환합니다.
+    JPEG는 draft()로 DCT 단계에서 바로 줄여 디코딩하고, 그래도 2배 이상 큰 이미지는 thumbnail()로 줄입니다.
+    (RGB 이미지, PreprocessStats) 튜플을 반환하며, measure_baseline이면 기존 방식의 디코딩 시간도 함께 측정합니다.
+    """
+    baseline_seconds = measure_full_decode(image_bytes, target_size) if measure_baseline else None
+
+    start = time.perf_counter()
+    image = Image.open(BytesIO(image_bytes))
+    original_size = image.size
+    bytes_full = original_size[0] * original_size[1] * len(image.getbands())
+
+    reduced_size = _reduced_size(original_size, target_size)
+    if reduced_size != original_size:
+        image.draft('RGB', reduced_size)
+    # thumbnail은 디코딩한 이미지를 줄이는 것이므로, 실제 디코딩 크기는 draft 이후(thumbnail 이전)의 크기
+    decoded_size = image.size
+    bytes_decoded = decoded_size[0] * decoded_size[1] * len(image.getbands())
+    # 2배 이상 큰 경우에만 미리 축소 (그 이하는 프로세서의 리사이즈 한 번이 더 저렴)
+    if reduced_size != original_size and min(image.size) >= 2 * target_size:
+        image.thumbnail(reduced_size, Image.Resampling.BICUBIC)
+    image = _to_rgb(image)
+    image.load()
+    seconds = time.perf_counter() - start
+
+    if baseline_seconds is not None:
+        # 두 방식 모두 프로세서의 최종 리사이즈를 거치므로, 축소된 이미지의 리사이즈 시간을 빼서 비교
+        resize_start = time.perf_counter()
+        _resize_for_model(image, target_size)
+        baseline_seconds -= time.perf_counter() - resize_start
+
+    stats = PreprocessStats(
+        filename=filename,
+        original_size=original_size,
+        decoded_size=decoded_size,
+        bytes_full=bytes_full,
+        bytes_decoded=bytes_decoded,
+        seconds=seconds,
+        baseline_seconds=baseline_seconds,
+        output_size=image.size,
+    )
+    return image, stats
+
+
+def preprocess_async(items, target_size=CAPTION_IMAGE_SIZE):
+    # (파일명, 이미지 바이트) 목록을 전처리 풀에 제출하고 (파일명, Future) 목록을 입력 순서대로 반환
+    pool = get_preprocess_pool()
+    return [(filename, pool.submit(load_for_caption, image_bytes, filename, target_size)) for filename, image_bytes in items]
+
+
+def describe_stats(stats):
+    # 진행 과정 표시용 요약 문자열
+    # 절약 시간은 원본 디코딩 시간을 측정한 경우(PREPROCESS_MEASURE_BASELINE=1)에만 표시
+    text = (f"{stats.filename}: {stats.original_size[0]}x{stats.original_size[1]} → "
+            f"디코딩 {stats.decoded_size[0]}x{stats.decoded_size[1]} {stats.bytes_decoded / 1e6:.1f}MB "
+            f"(원본 {stats.bytes_full / 1e6:.1f}MB)")
+    if stats.output_size is not None and stats.output_size != stats.decoded_size:
+        text += f" → {stats.output_size[0]}x{stats.output_size[1]}"
+    text += f", {stats.seconds * 1000:.0f}ms"
+    if stats.seconds_saved is not None:
+        text += f", 절약 {stats.seconds_saved * 1000:.0f}ms"
+    return text
+
+
+def _has_transparency(image):
+    # 알파 채널이 있어도 모두 불투명하면 JPEG로 저장
+    if image.mode in ('RGBA', 'LA'):
+        return image.getchannel('A').getextrema()[0] < 255
+    return image.mode == 'P' and 'transparency' in image.info
+
+
+def prepare_for_docx(image_bytes, width_inches=DOCX_IMAGE_WIDTH, dpi=DOCX_IMAGE_DPI, quality=DOCX_IMAGE_QUALITY):
+    """
+    Word 파일에 넣을 이미지 바이트를 만듭니다. EXIF 방향을 적용하고 폭이 width_inches × dpi 픽셀보다 크면
+    비율을 유지해 줄인 뒤, 투명 영역이 있으면 PNG, 없으면 quality 품질의 JPEG로 다시 저장합니다.
+    크기를 줄이거나 회전할 필요가 없고 다시 저장한 결과가 더 크면 원본을 그대로 반환합니다.
+    """
+    max_width = round(width_inches * dpi)
+    image = Image.open(BytesIO(image_bytes))
+    orientation = image.getexif().get(0x0112, 1)
+    display_width = image.height if orientation in _TRANSPOSED_ORIENTATIONS else image.width
+    resize = display_width > max_width
+    if resize:
+        # JPEG는 DCT 단계에서 목표 크기 가까이 줄여 디코딩
+        scale = max_width / display_width
+        image.draft('RGB', (round(image.width * scale), round(image.height * scale)))
+    image = ImageOps.exif_transpose(image)
+    if image.width > max_width:
+        image = image.resize((max_width, max(1, round(image.height * max_width / image.width))), Image.Resampling.LANCZOS)
+
+    output = BytesIO()
+    if _has_transparency(image):
+        image.save(output, format='PNG', dpi=(dpi, dpi))
+    else:
+        _to_rgb(image).save(output, format='JPEG', quality=quality, optimize=True, dpi=(dpi, dpi))
+    if not resize and orientation == 1 and output.tell() >= len(image_bytes):
+        return image_bytes
+    return output.getvalue()
+
+
+def prepare_docx_images(image_bytes_dict, width_inches=DOCX_IMAGE_WIDTH, dpi=DOCX_IMAGE_DPI, quality=DOCX_IMAGE_QUALITY, stats=None):
+    """
+    {파일명: 이미지 바이트}의 각 이미지를 prepare_for_docx로 변환한 같은 키의 사전을 반환합니다.
+    내용이 같은 이미지는 한 번만 변환하고 같은 바이트를 공유하며, 변환은 전처리 풀에서 동시에 수행합니다.
+    디코딩할 수 없는 이미지는 원본을 그대로 둡니다 (Word 변환 시 삽입 실패로 표시됨).
+    stats 사전을 넘기면 이미지 수와 변환 전후 바이트 수를 채웁니다.
+    """
+    start = time.perf_counter()
+    pool = get_preprocess_pool()
+    digests = {name: hashlib.sha256(image_bytes).hexdigest() for name, image_bytes in image_bytes_dict.items()}
+    futures = {}
+    for name, image_bytes in image_bytes_dict.items():
+        if digests[name] not in futures:
+            futures[digests[name]] = pool.submit(prepare_for_docx, image_bytes, width_inches, dpi, quality)
+
+    prepared = {}
+    converted = {}
+    for name, image_bytes in image_bytes_dict.items():
+        digest = digests[name]
+        if digest not in converted:
+            try:
+                converted[digest] = futures[digest].result()
+            except Exception:
+                converted[digest] = image_bytes
+        prepared[name] = converted[digest]
+
+    if stats is not None:
+        stats.update({
+            "images": len(image_bytes_dict),
+            "distinct": len(converted),
+            "bytes_in": sum(len(image_bytes) for image_bytes in image_bytes_dict.values()),
+            "bytes_out": sum(len(image_bytes) for image_bytes in converted.values()),
+            "seconds": time.perf_counter() - start,
+        })
+    return prepared
+
+
+def describe_docx_images(stats):
+    # 진행 과정 표시용 요약 문자열 (bytes_out은 중복 이미지를 한 번만 센 크기)
+    return (f"이미지 {stats['images']}개 (서로 다른 이미지 {stats['distinct']}개), "
+            f"{stats['bytes_in'] / 1e6:.1f}MB → {stats['bytes_out'] / 1e6:.1f}MB, {stats['seconds'] * 1000:.0f}ms")
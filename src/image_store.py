@@ -0,0 +1,187 @@
+# src/image_store.py
+# 세션별 이미지 저장소: 세션별/프로세스 전체 메모리 상한을 넘는 이미지는 내용 해시 이름의 파일로 옮기고 mmap으로 읽습니다.
+import hashlib
+import mmap
+import os
+import threading
+import time
+import weakref
+from collections.abc import Mapping
+
+from disk_cache import CACHE_DIR
+
+# 메모리에 둘 이미지 바이트 상한 (세션별 / 프로세스 전체)
+IMAGE_STORE_SESSION_BYTES = int(os.getenv("IMAGE_STORE_SESSION_BYTES", str(16 * 1024 * 1024)))
+IMAGE_STORE_GLOBAL_BYTES = int(os.getenv("IMAGE_STORE_GLOBAL_BYTES", str(256 * 1024 * 1024)))
+# 상한을 넘은 이미지를 저장할 폴더와, 이 시간(초) 동안 사용하지 않은 파일은 새 파일을 저장할 때 삭제
+IMAGE_STORE_DIR = os.getenv("IMAGE_STORE_DIR", os.path.join(CACHE_DIR, "images"))
+IMAGE_STORE_MAX_AGE = int(os.getenv("IMAGE_STORE_MAX_AGE", "86400"))
+
+# 프로세스 전체에서 메모리에 둔 이미지 바이트 수와 살아 있는 저장소 목록 (관리자 화면용)
+_global_lock = threading.Lock()
+_global_memory_bytes = 0
+_stores = weakref.WeakValueDictionary()  # id → 저장소 (Mapping은 해시할 수 없으므로 id를 키로 사용)
+# 오래된 파일 정리는 이 간격(초)마다 한 번만
+_CLEANUP_INTERVAL = 600
+_last_cleanup = 0.0
+
+
+def _reserve(size, session_bytes, session_limit, global_limit):
+    # 두 상한 안이면 프로세스 전체 사용량에 size를 더하고 True 반환
+    global _global_memory_bytes
+    with _global_lock:
+        if session_bytes + size > session_limit or _global_memory_bytes + size > global_limit:
+            return False
+        _global_memory_bytes += size
+        return True
+
+
+def _release(size):
+    global _global_memory_bytes
+    with _global_lock:
+        _global_memory_bytes -= size
+
+
+def _remove_old_files(directory, max_age):
+    # 오래 사용하지 않은 이미지 파일 정리 (다른 세션이 mmap으로 열어 둔 파일도 매핑은 그대로 유지됨)
+    global _last_cleanup
+    now = time.time()
+    with _global_lock:
+        if now - _last_cleanup < _CLEANUP_INTERVAL:
+            return
+        _last_cleanup = now
+    cutoff = now - max_age
+    for root, _, filenames in os.walk(directory):
+        for filename in filenames:
+            path = os.path.join(root, filename)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
+
+
+class SessionImageStore(Mapping):
+    """
+    {파일명: 이미지 바이트} 사전처럼 쓰는 세션별 이미지 저장소입니다.
+    내용이 같은 이미지는 한 번만 저장하며, 세션별 상한(session_limit)이나 프로세스 전체 상한(global_limit)을
+    넘는 이미지는 directory 아래 내용 해시 이름의 파일로 저장하고 mmap 객체(bytes처럼 읽을 수 있음)로 반환합니다.
+    저장소가 사라지면(세션 종료) 메모리 사용량을 프로세스 전체 사용량에서 뺍니다.
+    """
+
+    def __init__(self, session_limit=IMAGE_STORE_SESSION_BYTES, global_limit=IMAGE_STORE_GLOBAL_BYTES,
+                 directory=IMAGE_STORE_DIR, max_age=IMAGE_STORE_MAX_AGE):
+        self.session_limit = session_limit
+        self.global_limit = global_limit
+        self.directory = directory
+        self.max_age = max_age
+        self._names = {}    # 파일명 → 내용 해시
+        self._blobs = {}    # 내용 해시 → bytes(메모리) 또는 mmap(파일)
+        self._memory = [0]  # 메모리에 둔 바이트 수 (finalize 콜백과 공유)
+        self._spilled_bytes = 0
+        self._lock = threading.Lock()
+        self._finalizer = weakref.finalize(self, lambda memory: _release(memory[0]), self._memory)
+        with _global_lock:
+            _stores[id(self)] = self
+
+    def __getitem__(self, name):
+        return self._blobs[self._names[name]]
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __len__(self):
+        return len(self._names)
+
+    def digests(self):
+        # 파일명 → 내용 해시 (sha256 hex)
+        return dict(self._names)
+
+    def put(self, name, image_bytes):
+        # 이미지를 저장하고 내용 해시를 반환 (메모리 상한을 넘으면 파일로 저장)
+        digest = hashlib.sha256(image_bytes).hexdigest()
+        with self._lock:
+            if digest not in self._blobs:
+                size = len(image_bytes)
+                # 빈 이미지는 mmap할 수 없으므로 항상 메모리에 둠
+                if not size or _reserve(size, self._memory[0], self.session_limit, self.global_limit):
+                    self._blobs[digest] = bytes(image_bytes)
+                    self._memory[0] += size
+                else:
+                    self._blobs[digest] = self._spill(digest, image_bytes)
+                    self._spilled_bytes += size
+            self._names[name] = digest
+        return digest
+
+    def _spill(self, digest, image_bytes):
+        path = os.path.join(self.directory, digest[:2], digest)
+        try:
+            # 다른 세션이 이미 저장한 같은 내용의 파일 재사용 (수정 시각 갱신으로 정리 대상에서 제외)
+            os.utime(path)
+        except FileNotFoundError:
+            self._write_file(path, image_bytes)
+        try:
+            file = open(path, 'rb')
+        except FileNotFoundError:
+            # utime과 open 사이에 다른 세션이 오래된 파일로 보고 삭제한 경우 다시 기록
+            self._write_file(path, image_bytes)
+            file = open(path, 'rb')
+        with file:
+            return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _write_file(self, path, image_bytes):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        _remove_old_files(self.directory, self.max_age)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as file:
+            file.write(image_bytes)
+        os.replace(temp_path, path)
+
+    def replace(self, image_bytes_dict):
+        # 저장된 이미지를 모두 비우고 {파일명: 이미지 바이트}로 채움
+        self.clear()
+        for name, image_bytes in image_bytes_dict.items():
+            self.put(name, image_bytes)
+
+    def clear(self):
+        # mmap은 사용 중인 곳이 없어지면 자동으로 닫힘
+        with self._lock:
+            _release(self._memory[0])
+            self._memory[0] = 0
+            self._spilled_bytes = 0
+            self._names.clear()
+            self._blobs.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "images": len(self._names),
+                "distinct": len(self._blobs),
+                "memory_bytes": self._memory[0],
+                "spilled_bytes": self._spilled_bytes,
+            }
+
+
+def memory_report():
+    # 관리자 화면용: 프로세스 전체와 세션별 이미지 메모리 사용량
+    with _global_lock:
+        stores = list(_stores.values())
+    sessions = [store.stats() for store in stores]
+    with _global_lock:
+        memory_bytes = _global_memory_bytes
+    return {
+        "sessions": len(sessions),
+        "images": sum(stats["images"] for stats in sessions),
+        "memory_bytes": memory_bytes,
+        "spilled_bytes": sum(stats["spilled_bytes"] for stats in sessions),
+        "global_limit": IMAGE_STORE_GLOBAL_BYTES,
+        "session_limit": IMAGE_STORE_SESSION_BYTES,
+        "largest_session_bytes": max((stats["memory_bytes"] for stats in sessions), default=0),
+    }
+
+
+def describe_memory_report(report):
+    # 관리자 화면 표시용 요약 문자열
+    return (f"세션 {report['sessions']}개, 이미지 {report['images']}개: 메모리 {report['memory_bytes'] / 1e6:.1f}MB "
+            f"/ 상한 {report['global_limit'] / 1e6:.0f}MB (세션별 {report['session_limit'] / 1e6:.0f}MB, 최대 세션 "
+            f"{report['largest_session_bytes'] / 1e6:.1f}MB), 디스크로 옮긴 이미지 {report['spilled_bytes'] / 1e6:.1f}MB")
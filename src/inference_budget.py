@@ -0,0 +1,110 @@
+# src/inference_budget.py
+# 캡션 추론에 쓸 CPU 스레드 수를 명시적으로 정하고, 동시에 실행되는 추론 수를 세마포어로 제한합니다.
+# 여러 세션의 추론이 동시에 실행되면 torch 스레드가 코어 수보다 많아져 모두 느려지므로, 제한을 넘는 요청은 순서대로 기다립니다.
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# 동시에 실행할 추론 수 (나머지는 대기)
+INFERENCE_CONCURRENCY = max(1, int(os.getenv("INFERENCE_CONCURRENCY", "1")))
+# 추론 하나가 사용할 스레드 수 (torch intra-op / ONNX Runtime intra-op), 기본값은 CPU 수를 동시 추론 수로 나눈 값
+INFERENCE_THREADS = max(1, int(os.getenv("INFERENCE_THREADS", str((os.cpu_count() or 1) // INFERENCE_CONCURRENCY))))
+# 연산자 간 병렬 실행 스레드 수 (torch inter-op / ONNX Runtime inter-op)
+INFERENCE_INTEROP_THREADS = max(1, int(os.getenv("INFERENCE_INTEROP_THREADS", "1")))
+
+_configured = False
+_configure_lock = threading.Lock()
+
+
+def configure_torch_threads():
+    # 프로세스에서 한 번만 torch 스레드 수 설정 (모델 로드 전에 호출)
+    global _configured
+    with _configure_lock:
+        if _configured:
+            return
+        import torch
+
+        torch.set_num_threads(INFERENCE_THREADS)
+        try:
+            torch.set_num_interop_threads(INFERENCE_INTEROP_THREADS)
+        except RuntimeError:
+            # 이미 병렬 작업이 시작된 뒤에는 변경할 수 없음 (기존 값 유지)
+            pass
+        _configured = True
+
+
+def onnx_session_options(options):
+    # ONNX Runtime 세션 옵션에 같은 스레드 예산 적용
+    options.intra_op_num_threads = INFERENCE_THREADS
+    options.inter_op_num_threads = INFERENCE_INTEROP_THREADS
+    return options
+
+
+class AdmissionController:
+    """
+    동시에 실행되는 추론을 limit개로 제한합니다. admit()로 감싼 구간은 자리가 날 때까지 기다린 뒤 실행되며,
+    대기 중/실행 중인 요청 수와 대기 시간을 기록합니다.
+    """
+
+    def __init__(self, limit=INFERENCE_CONCURRENCY, history=1000):
+        self.limit = max(1, limit)
+        self._semaphore = threading.Semaphore(self.limit)
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self._running = 0
+        self._max_waiting = 0
+        self._admitted = 0
+        self._wait_seconds = deque(maxlen=history)  # 최근 요청의 대기 시간
+
+    @contextmanager
+    def admit(self):
+        start = time.perf_counter()
+        with self._lock:
+            self._waiting += 1
+            self._max_waiting = max(self._max_waiting, self._waiting)
+        self._semaphore.acquire()
+        with self._lock:
+            self._waiting -= 1
+            self._running += 1
+            self._admitted += 1
+            self._wait_seconds.append(time.perf_counter() - start)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._running -= 1
+            self._semaphore.release()
+
+    def stats(self):
+        with self._lock:
+            waits = sorted(self._wait_seconds)
+            return {
+                "limit": self.limit,
+                "waiting": self._waiting,
+                "running": self._running,
+                "max_waiting": self._max_waiting,
+                "admitted": self._admitted,
+                "p50_wait_seconds": percentile(waits, 50),
+                "p95_wait_seconds": percentile(waits, 95),
+            }
+
+    def describe(self):
+        # 진행 과정/관리자 화면 표시용 요약 문자열
+        stats = self.stats()
+        return (f"동시 추론 {stats['running']}/{stats['limit']}개 (스레드 {INFERENCE_THREADS}개씩), 대기 {stats['waiting']}개 "
+                f"(최대 {stats['max_waiting']}개), 대기 시간 p50 {stats['p50_wait_seconds'] * 1000:.0f}ms / "
+                f"p95 {stats['p95_wait_seconds'] * 1000:.0f}ms")
+
+
+def percentile(sorted_values, percent):
+    # 정렬된 값 목록의 백분위수 (nearest-rank, 비어 있으면 0)
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * percent // 100))
+    return sorted_values[int(rank) - 1]
+
+
+# 프로세스 전역 추론 입장 제한
+admission = AdmissionController()
@@ -0,0 +1,321 @@
+# src/jobs.py
+# 게시글 생성처럼 오래 걸리는 작업을 Streamlit 스크립트 실행과 분리해 백그라운드 작업 풀에서 실행합니다.
+# 작업 상태/진행 메시지/결과는 SQLite 작업 테이블에 기록하므로 페이지를 새로 고치거나 다시 접속해도 작업 ID로 다시 읽을 수 있습니다.
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from disk_cache import CACHE_DIR
+
+# 동시에 실행할 작업 수 (나머지는 대기)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# 이 시간(초)보다 오래된 작업은 새 작업을 등록할 때 삭제
+JOB_MAX_AGE = int(os.getenv("JOB_MAX_AGE", "3600"))
+# 생성 중인 게시글(부분 결과)을 작업 테이블에 기록하는 최소 간격(초)
+JOB_PARTIAL_INTERVAL = float(os.getenv("JOB_PARTIAL_INTERVAL", "0.2"))
+# 실행 중인 작업의 생존 신호(heartbeat)를 기록하는 간격(초)과, 이 시간(초) 동안 신호가 없으면 중단된 작업으로 보는 기준
+JOB_HEARTBEAT_INTERVAL = float(os.getenv("JOB_HEARTBEAT_INTERVAL", "10"))
+JOB_HEARTBEAT_TIMEOUT = float(os.getenv("JOB_HEARTBEAT_TIMEOUT", "60"))
+# 끝난 작업의 첨부(이미지 저장소 등)를 다시 접속한 세션을 위해 메모리에 남겨 두는 시간(초)
+JOB_ATTACHMENT_MAX_AGE = int(os.getenv("JOB_ATTACHMENT_MAX_AGE", "600"))
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+FINISHED = (DONE, FAILED)
+
+
+class JobContext:
+    """작업 함수에 전달되는 객체. 진행 메시지, 생성 중인 부분 결과, 메모리로만 넘길 첨부(이미지 바이트 등)를 기록합니다."""
+
+    def __init__(self, queue, job_id):
+        self._queue = queue
+        self.job_id = job_id
+        self._last_partial = 0.0
+
+    def progress(self, message):
+        # 진행 과정에 남길 메시지
+        self._queue._add_event(self.job_id, message)
+
+    def stage(self, text):
+        # 현재 진행 중인 단계 (진행 과정에는 남기지 않음)
+        self._queue._update(self.job_id, stage=text)
+
+    def partial(self, text, force=False):
+        # 너무 자주 기록하지 않도록 JOB_PARTIAL_INTERVAL마다 한 번만 저장 (force면 바로 저장)
+        now = time.perf_counter()
+        if force or now - self._last_partial >= JOB_PARTIAL_INTERVAL:
+            self._queue._update(self.job_id, partial=text)
+            self._last_partial = now
+
+    def part(self, name, text):
+        # 이름별 중간 결과 (번역 언어별 게시글 등), 끝나는 대로 바로 기록
+        self._queue._set_part(self.job_id, name, text)
+
+    def attach(self, name, value):
+        # JSON으로 저장하지 않는 결과 (같은 프로세스에서만 읽을 수 있음)
+        self._queue._attach(self.job_id, name, value)
+
+
+class JobQueue:
+    """
+    작업 함수를 스레드 풀에서 실행하고 SQLite 작업 테이블(jobs, job_events)에 상태를 기록합니다.
+    작업 함수는 fn(JobContext, *args, **kwargs) 형태로 호출되며, 반환값(JSON 직렬화 가능)이 작업 결과가 됩니다.
+    작업마다 실행하는 프로세스(호스트:pid)와 생존 신호 시각을 기록해, 같은 파일을 쓰는 다른 프로세스의 작업은
+    그 프로세스가 종료되었거나 신호가 끊긴 경우에만 실패로 표시합니다.
+    """
+
+    def __init__(self, path, max_workers=JOB_WORKERS, max_age=JOB_MAX_AGE, heartbeat_interval=JOB_HEARTBEAT_INTERVAL,
+                 heartbeat_timeout=JOB_HEARTBEAT_TIMEOUT, attachment_max_age=JOB_ATTACHMENT_MAX_AGE):
+        self.path = path
+        self.max_age = max_age
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_timeout = heartbeat_timeout
+        self.attachment_max_age = attachment_max_age
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._local = threading.local()
+        self._attachments = {}
+        self._finished_at = {}   # 끝난 작업 ID → 끝난 시각 (첨부 정리 기준)
+        self._discarded = set()  # 첨부를 버린 작업 (실행 중이면 이후 attach도 무시)
+        self._attachments_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY,"
+                " status TEXT NOT NULL,"
+                " stage TEXT NOT NULL DEFAULT '',"
+                " partial TEXT NOT NULL DEFAULT '',"
+                " result TEXT,"
+                " error TEXT,"
+                " created_at REAL NOT NULL,"
+                " updated_at REAL NOT NULL,"
+                " owner TEXT NOT NULL DEFAULT '',"
+                " heartbeat_at REAL NOT NULL DEFAULT 0)"
+            )
+            # 실행 프로세스/생존 신호 열이 없던 이전 작업 테이블에 열 추가
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "owner" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN owner TEXT NOT NULL DEFAULT ''")
+            if "heartbeat_at" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN heartbeat_at REAL NOT NULL DEFAULT 0")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS job_events ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " job_id TEXT NOT NULL,"
+                " message TEXT NOT NULL,"
+                " created_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS job_events_job ON job_events (job_id, id)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS job_parts ("
+                " job_id TEXT NOT NULL,"
+                " name TEXT NOT NULL,"
+                " text TEXT NOT NULL,"
+                " updated_at REAL NOT NULL,"
+                " PRIMARY KEY (job_id, name))"
+            )
+        # 종료된 프로세스가 남긴 작업은 실패로 표시하고, 이 프로세스의 작업에는 주기적으로 생존 신호 기록
+        self._reap_orphaned_jobs()
+        threading.Thread(target=self._heartbeat, name="job-heartbeat", daemon=True).start()
+
+    def _connect(self):
+        # 스레드마다 연결 하나를 재사용 (WAL 모드로 작업 스레드가 쓰는 동안 스크립트 스레드가 읽을 수 있음)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def submit(self, fn, *args, **kwargs):
+        # 작업을 등록하고 작업 ID를 바로 반환
+        self._remove_old_jobs()
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        self._connect().execute(
+            "INSERT INTO jobs (id, status, created_at, updated_at, owner, heartbeat_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (job_id, QUEUED, now, now, self.owner, now),
+        )
+        self._executor.submit(self._run, job_id, fn, args, kwargs)
+        return job_id
+
+    def _run(self, job_id, fn, args, kwargs):
+        self._update(job_id, status=RUNNING)
+        try:
+            result = fn(JobContext(self, job_id), *args, **kwargs)
+        except Exception as e:
+            self._update(job_id, status=FAILED, error=f"{type(e).__name__}: {e}")
+            # 실패한 작업의 결과는 읽지 않으므로 첨부도 바로 버림
+            self.discard_attachments(job_id)
+        else:
+            self._update(job_id, status=DONE, result=json.dumps(result, ensure_ascii=False))
+        with self._attachments_lock:
+            self._finished_at[job_id] = time.time()
+            self._discarded.discard(job_id)
+        self._remove_old_attachments()
+
+    def _heartbeat(self):
+        # 이 프로세스의 끝나지 않은 작업에 생존 신호를 기록하고, 다른 프로세스가 남긴 작업과 오래된 첨부를 정리
+        while True:
+            time.sleep(self.heartbeat_interval)
+            try:
+                self._connect().execute(
+                    "UPDATE jobs SET heartbeat_at = ? WHERE owner = ? AND status IN (?, ?)",
+                    (time.time(), self.owner, QUEUED, RUNNING),
+                )
+                self._reap_orphaned_jobs()
+                self._remove_old_attachments()
+            except sqlite3.Error:
+                # 데이터베이스가 잠시 잠겨 있으면 다음 주기에 다시 시도
+                pass
+
+    def _reap_orphaned_jobs(self):
+        # 실행하던 프로세스가 종료되었거나(같은 호스트) 생존 신호가 끊긴 작업은 실패로 표시
+        conn = self._connect()
+        now = time.time()
+        host = socket.gethostname()
+        orphaned = []
+        for job_id, owner, heartbeat_at in conn.execute(
+            "SELECT id, owner, heartbeat_at FROM jobs WHERE status IN (?, ?) AND owner != ?", (QUEUED, RUNNING, self.owner)
+        ).fetchall():
+            owner_host, _, owner_pid = owner.rpartition(":")
+            stale = heartbeat_at < now - self.heartbeat_timeout
+            if stale or (owner_host == host and owner_pid.isdigit() and not _process_alive(int(owner_pid))):
+                orphaned.append(job_id)
+        for job_id in orphaned:
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE id = ? AND status IN (?, ?)",
+                (FAILED, "작업을 실행하던 서버 프로세스가 종료되어 작업이 중단되었습니다.", now, job_id, QUEUED, RUNNING),
+            )
+
+    def _update(self, job_id, **fields):
+        fields["updated_at"] = time.time()
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        self._connect().execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def _add_event(self, job_id, message):
+        self._connect().execute(
+            "INSERT INTO job_events (job_id, message, created_at) VALUES (?, ?, ?)", (job_id, message, time.time())
+        )
+
+    def _set_part(self, job_id, name, text):
+        self._connect().execute(
+            "INSERT INTO job_parts (job_id, name, text, updated_at) VALUES (?, ?, ?, ?)"
+            " ON CONFLICT (job_id, name) DO UPDATE SET text = excluded.text, updated_at = excluded.updated_at",
+            (job_id, name, text, time.time()),
+        )
+
+    def _attach(self, job_id, name, value):
+        with self._attachments_lock:
+            if job_id not in self._discarded:
+                self._attachments.setdefault(job_id, {})[name] = value
+
+    def get(self, job_id):
+        """작업 상태 사전 {id, status, stage, progress(메시지 목록), partial, parts(이름 → 중간 결과), result, error, created_at, updated_at} (없으면 None)."""
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT status, stage, partial, result, error, created_at, updated_at FROM jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        status, stage, partial, result, error, created_at, updated_at = row
+        progress = [message for (message,) in conn.execute(
+            "SELECT message FROM job_events WHERE job_id = ? ORDER BY id", (job_id,)
+        )]
+        parts = dict(conn.execute("SELECT name, text FROM job_parts WHERE job_id = ? ORDER BY rowid", (job_id,)).fetchall())
+        return {
+            "id": job_id,
+            "status": status,
+            "stage": stage,
+            "progress": progress,
+            "partial": partial,
+            "parts": parts,
+            "result": json.loads(result) if result is not None else None,
+            "error": error,
+            "created_at": created_at,
+            "updated_at": updated_at,
+        }
+
+    def attachments(self, job_id):
+        # 작업 함수가 attach로 남긴 첨부 (다른 프로세스에서 실행했거나 이미 삭제된 작업이면 빈 사전)
+        with self._attachments_lock:
+            return dict(self._attachments.get(job_id, {}))
+
+    def pop_attachments(self, job_id):
+        # 첨부를 꺼내고 작업 풀에서는 삭제 (결과를 세션으로 옮긴 뒤 메모리에 남지 않도록)
+        with self._attachments_lock:
+            return self._attachments.pop(job_id, {})
+
+    def discard_attachments(self, job_id):
+        # 더 이상 읽지 않을 작업(다시 생성으로 대체된 작업 등)의 첨부를 버림, 실행 중이면 이후에 남기는 첨부도 버림
+        with self._attachments_lock:
+            self._attachments.pop(job_id, None)
+            if job_id not in self._finished_at:
+                self._discarded.add(job_id)
+
+    def _remove_old_attachments(self):
+        # 끝난 지 attachment_max_age초가 지난 작업의 첨부 정리 (결과를 읽지 않고 떠난 세션의 이미지 등)
+        cutoff = time.time() - self.attachment_max_age
+        with self._attachments_lock:
+            for job_id in [job_id for job_id, finished_at in self._finished_at.items() if finished_at < cutoff]:
+                self._attachments.pop(job_id, None)
+                del self._finished_at[job_id]
+
+    def _remove_old_jobs(self):
+        cutoff = time.time() - self.max_age
+        conn = self._connect()
+        old_ids = [job_id for (job_id,) in conn.execute(
+            "SELECT id FROM jobs WHERE updated_at < ? AND status IN (?, ?)", (cutoff, DONE, FAILED)
+        )]
+        if not old_ids:
+            return
+        placeholders = ", ".join("?" * len(old_ids))
+        conn.execute(f"DELETE FROM job_events WHERE job_id IN ({placeholders})", old_ids)
+        conn.execute(f"DELETE FROM job_parts WHERE job_id IN ({placeholders})", old_ids)
+        conn.execute(f"DELETE FROM jobs WHERE id IN ({placeholders})", old_ids)
+        with self._attachments_lock:
+            for job_id in old_ids:
+                self._attachments.pop(job_id, None)
+                self._finished_at.pop(job_id, None)
+
+    def stats(self):
+        # 상태별 작업 수
+        rows = self._connect().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+
+def _process_alive(pid):
+    # 같은 호스트의 프로세스가 살아 있는지 (Windows의 os.kill은 프로세스를 종료하므로 생존 신호로만 판단)
+    if os.name == "nt":
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    # 프로세스 전체에서 같은 작업 풀/작업 테이블 사용 (CACHE_DIR/jobs.sqlite)
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            _job_queue = JobQueue(os.path.join(CACHE_DIR, "jobs.sqlite"))
+    return _job_queue
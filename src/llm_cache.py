@@ -0,0 +1,50 @@
+# src/llm_cache.py
+# 같은 입력에 대한 LLM 응답(키워드 추출 등)을 디스크에 저장해 재사용하는 캐시
+import hashlib
+import json
+import os
+import threading
+
+from disk_cache import CACHE_DIR, DiskCache
+
+# LLM 응답 캐시 설정 (LLM_CACHE=0 이면 사용하지 않음)
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE", "1") != "0"
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2000"))
+
+_llm_cache = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache():
+    # 프로세스당 하나의 LLM 응답 캐시 인스턴스 (파일은 앱 프로세스와 CLI가 공유)
+    global _llm_cache
+    if not LLM_CACHE_ENABLED:
+        return None
+    with _llm_cache_lock:
+        if _llm_cache is None:
+            _llm_cache = DiskCache(os.path.join(CACHE_DIR, "llm.sqlite"), max_entries=LLM_CACHE_MAX_ENTRIES, ttl=LLM_CACHE_TTL)
+    return _llm_cache
+
+
+def llm_cache_key(model, system_prompt, user_content, language=None):
+    # 모델, 시스템 프롬프트 내용, 사용자 입력, 언어로 캐시 키 생성
+    payload = json.dumps([model, system_prompt, user_content, language], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def cached_llm_call(key, call, use_cache=True):
+    """
+    캐시에 key가 있으면 저장된 응답을, 없으면 call()을 호출해 결과를 저장한 뒤 반환합니다.
+    use_cache=False면 캐시를 읽지 않고 새로 호출하며, 새 결과로 캐시를 갱신합니다.
+    (응답, 캐시 적중 여부) 튜플을 반환합니다.
+    """
+    cache = get_llm_cache()
+    if cache is not None and use_cache:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached, True
+    result = call()
+    if cache is not None:
+        cache.set(key, result)
+    return result, False
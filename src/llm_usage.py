@@ -0,0 +1,70 @@
+# src/llm_usage.py
+# OpenAI 응답의 usage(프롬프트/캐시된 프롬프트/생성 토큰 수)를 기록해 프롬프트 캐시 적중 여부를 확인합니다.
+import threading
+
+
+def _field(obj, name):
+    # usage는 SDK 객체 또는 사전(구버전 SDK) 형태
+    if obj is None:
+        return None
+    if isinstance(obj, dict):
+        return obj.get(name)
+    return getattr(obj, name, None)
+
+
+def usage_summary(usage):
+    # usage → {"prompt_tokens", "cached_tokens", "completion_tokens"} 사전 (usage가 없으면 None)
+    if usage is None:
+        return None
+    return {
+        "prompt_tokens": _field(usage, "prompt_tokens") or 0,
+        "cached_tokens": _field(_field(usage, "prompt_tokens_details"), "cached_tokens") or 0,
+        "completion_tokens": _field(usage, "completion_tokens") or 0,
+    }
+
+
+def describe_usage(summary):
+    # 진행 과정 표시용 요약 문자열
+    if not summary:
+        return "사용량 정보 없음"
+    prompt = summary["prompt_tokens"]
+    cached = summary["cached_tokens"]
+    ratio = f" ({cached / prompt:.0%})" if prompt else ""
+    return f"프롬프트 {prompt}토큰 중 캐시 {cached}토큰{ratio}, 생성 {summary['completion_tokens']}토큰"
+
+
+class UsageTracker:
+    """호출 종류(키워드, 게시글, 번역 등)별 누적 토큰 사용량. Streamlit의 모든 세션과 CLI가 같은 인스턴스를 사용합니다."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals = {}
+
+    def record(self, name, usage):
+        # usage를 누적하고 이번 호출의 요약 사전을 반환
+        summary = usage_summary(usage)
+        if summary is None:
+            return None
+        with self._lock:
+            totals = self._totals.setdefault(name, {"requests": 0, "prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0})
+            totals["requests"] += 1
+            for key, value in summary.items():
+                totals[key] += value
+        return summary
+
+    def totals(self):
+        with self._lock:
+            return {name: dict(totals) for name, totals in self._totals.items()}
+
+    def describe(self):
+        # 호출 종류별 누적 캐시 적중률 요약
+        parts = []
+        for name, totals in self.totals().items():
+            prompt = totals["prompt_tokens"]
+            ratio = totals["cached_tokens"] / prompt if prompt else 0.0
+            parts.append(f"{name} {totals['requests']}회 캐시 {ratio:.0%}")
+        return ", ".join(parts) if parts else "기록 없음"
+
+
+# 프로세스 전역 사용량 기록
+usage_tracker = UsageTracker()
@@ -2,18 +2,17 @@
 # /src/main.py
 import os
 import sys
-import urllib.request
-import urllib.parse
 import json
-import re
-import openai
-from docx import Document
-from docx.shared import Inches, Pt, RGBColor
-from docx.oxml.ns import qn
-from docx.oxml import OxmlElement
-from transformers import BlipProcessor, BlipForConditionalGeneration
 from PIL import Image
-import torch
+from captioning import caption_image_bytes, registry
+from pipeline import describe_timings, run_pipeline
+from naver_client import get_naver_client
+from retrieval import describe_retrieval, format_references, retrieve_references, split_keywords
+from references import describe_references, process_references
+from token_budget import describe_budget, fit_prompt
+from llm_usage import describe_usage, usage_tracker
+from llm_cache import cached_llm_call, llm_cache_key
+from md_render import referenced_image_names, render_docx
 
 def get_api_keys():
     # API 키 및 클라이언트 정보 가져오기
@@ -28,7 +27,9 @@ def get_api_keys():
     return api_key, client_id, client_secret
 
 def create_openai_client(api_key):
-    # OpenAI API 키 설정
+    # OpenAI API 키 설정 (openai 패키지는 API를 호출할 때만 로드)
+    import openai
+
     openai.api_key = api_key
 
 def convert_images_to_png(folder_path):
@@ -58,26 +59,32 @@ def convert_images_to_png(folder_path):
 
 def analyze_images_in_folder():
     folder_path = "/data/test/"
-    
-    processor = BlipProcessor.from_pretrained("Salesforce/blip-image-captioning-base")
-    model = BlipForConditionalGeneration.from_pretrained("Salesforce/blip-image-captioning-base")
 
     captions = []
     image_filenames = []
 
+    # 변환된 .png 파일만 배치 단위로 처리 (캐시에 있는 이미지는 디코딩/추론 생략)
+    items = []
     for filename in os.listdir(folder_path):
-        if filename.lower().endswith(".png"):  # 변환된 .png 파일만 처리
-            image_path = os.path.join(folder_path, filename)
-            try:
-                image = Image.open(image_path)
-                inputs = processor(images=image, return_tensors="pt")
-                out = model.generate(**inputs, max_new_tokens=50)
-                caption = processor.decode(out[0], skip_special_tokens=True)
-                captions.append(f"{caption} {{{filename}}}")
-                image_filenames.append(filename)
-                print(f"파일: {filename}, 생성된 캡션: {caption}")
-            except Exception as e:
-                print(f"이미지 분석 실패: {filename}, 오류: {e}")
+        if filename.lower().endswith(".png"):
+            with open(os.path.join(folder_path, filename), 'rb') as f:
+                items.append((filename, f.read()))
+
+    results = caption_image_bytes(items)
+    if registry.is_loaded():
+        print(f"BLIP 모델 준비 완료 ({registry.describe()})")
+
+    for result in results:
+        if result.ok:
+            captions.append(f"{result.caption} {{{result.filename}}}")
+            image_filenames.append(result.filename)
+            print(f"파일: {result.filename}, 생성된 캡션: {result.caption}")
+        else:
+            print(f"이미지 분석 실패: {result.filename}, 오류: {result.error}")
+
+    hits = sum(1 for result in results if result.cached)
+    if results:
+        print(f"캡션 캐시 적중: {hits}/{len(results)} (적중률 {hits / len(results):.0%})")
 
     return captions, image_filenames
 
@@ -86,53 +93,47 @@ def read_sys_prompt(file_path):
         sys_prompt = json.load(file)
     return sys_prompt
 
-def generate_keywords(first_sys_prompt_content, user_question):
-    completion = openai.ChatCompletion.create(
-        model="gpt-4o-mini",
-        messages=[
-            {
-                "role": "system",
-                "content": first_sys_prompt_content
-            },
-            {
-                "role": "user",
-                "content": user_question
-            }
-        ]
-    )
-
-    keyword = completion.choices[0].message.content.strip()
-    print(f"추출된 키워드: {keyword}")
+def generate_keywords(first_sys_prompt_content, user_question, language, use_cache=True):
+    # 같은 모델/프롬프트/질문/언어의 키워드는 LLM 응답 캐시에서 재사용 (use_cache=False면 새로 생성해 캐시 갱신)
+    model = "gpt-4o-mini"
+
+    def create():
+        import openai
+
+        completion = openai.ChatCompletion.create(
+            model=model,
+            messages=[
+                {
+                    "role": "system",
+                    "content": first_sys_prompt_content
+                },
+                {
+                    "role": "system",
+                    "content": f"사용 언어: {language}"
+                },
+                {
+                    "role": "user",
+                    "content": user_question
+                }
+            ]
+        )
+        print(f"키워드 생성 토큰: {describe_usage(usage_tracker.record('키워드', completion.usage))}")
+        return completion.choices[0].message.content.strip()
+
+    key = llm_cache_key(model, first_sys_prompt_content, user_question, language)
+    keyword, cached = cached_llm_call(key, create, use_cache=use_cache)
+    print(f"추출된 키워드: {keyword}" + (" (캐시)" if cached else ""))
     return keyword
 
 def search_naver_blog(client_id, client_secret, keyword):
-    encText = urllib.parse.quote(keyword)
-    display = 5
-    start = 1
-    sort = "sim"
-    
-    url = f"https://openapi.naver.com/v1/search/blog?query={encText}&display={display}&start={start}&sort={sort}"
-    
-    request = urllib.request.Request(url)
-    request.add_header("X-Naver-Client-Id", client_id)
-    request.add_header("X-Naver-Client-Secret", client_secret)
-    
-    try:
-        response = urllib.request.urlopen(request)
-        response_body = response.read()
-        result = json.loads(response_body.decode('utf-8'))
-
-        if "items" in result and len(result["items"]) > 0:
-            description_all = ' '.join([item["description"] for item in result["items"]])
-            clean_description = re.sub(r'<\/?b>', '', description_all)
-            print(f"참고자료: {clean_description}")
-        else:
-            clean_description = "참고 자료가 없습니다."
-    except Exception as e:
-        print("블로그 검색 중 오류가 발생했습니다.")
-        print(str(e))
-        clean_description = "참고 자료가 없습니다."
-    return clean_description
+    # 키워드 생성 결과를 여러 검색어로 나눠 여러 페이지를 동시에 검색하고, 링크 기준으로 합친 BlogItem 목록 반환
+    client = get_naver_client(client_id, client_secret)
+    stats = {}
+    items = retrieve_references(client, split_keywords(keyword), stats=stats)
+    print(f"참고자료 수집: {describe_retrieval(stats)}")
+    if stats["failed"]:
+        print("일부 블로그 검색 요청에 실패했습니다.")
+    return items
 
 def read_user_example_text(file_path):
     # 사용자 예시 텍스트 파일이 존재하는지 확인
@@ -157,199 +158,71 @@ def choose_tone(tone_choice):
     return tones.get(str(tone_choice), "casual")
 
 def generate_final_post(second_sys_prompt_content, third_sys_prompt_content, user_question, clean_description, image_captions, example_text, tone=None):
+    import openai
+
     # 톤 프롬프트에 추가 (tone이 있으면 해당하는 프롬프트 추가)
     tone_instruction = f"Please write in a {tone} tone." if tone else ""
-    example_text_content = f"Here is an example of the user's previous writing style: {example_text}" if example_text else "The user has not provided an example text."
 
+    # 구성 요소별/전체 토큰 예산 적용 (예시 텍스트, 참고자료 등 긴 입력은 잘라냄)
+    budget_report = {}
+    parts = fit_prompt({
+        "system": second_sys_prompt_content,
+        "format": third_sys_prompt_content,
+        "instructions": tone_instruction,
+        "question": user_question,
+        "references": clean_description,
+        "images": ' '.join(image_captions),
+        "example_text": example_text,
+    }, report=budget_report)
+    print(f"프롬프트 토큰: {describe_budget(budget_report)}")
+    example_text_content = f"Here is an example of the user's previous writing style: {parts['example_text']}" if parts['example_text'] else "The user has not provided an example text."
+
+    # 고정된 내용(시스템 프롬프트, 글 형식)을 맨 앞에 두고 톤은 뒤 메시지로 분리해 OpenAI 프롬프트 캐시가 적용되게 함
+    # (톤이 없으면 톤 메시지를 보내지 않음)
+    messages = [
+        {
+            "role": "system",
+            "content": f"{parts['system']}\n\n글 형식:{parts['format']}"
+        }
+    ]
+    if tone_instruction:
+        messages.append({
+            "role": "system",
+            "content": tone_instruction
+        })
+    messages.append({
+        "role": "user",
+        "content": f"사용자의 질문: {parts['question']}\n참고자료: {parts['references']}\n입력된 사진: {parts['images']}\n{example_text_content}"
+    })
     final_completion = openai.ChatCompletion.create(
         model="gpt-4o-mini",
-        messages=[
-            {
-                "role": "system",
-                "content": f"{second_sys_prompt_content}\n\n{tone_instruction}\n\n글 형식:{third_sys_prompt_content}"
-            },
-            {
-                "role": "user",
-                "content": f"사용자의 질문: {user_question}\n참고자료: {clean_description}\n입력된 사진: {' '.join(image_captions)}\n{example_text_content}"
-            }
-        ]
+        messages=messages
     )
 
+    print(f"게시글 생성 토큰: {describe_usage(usage_tracker.record('게시글', final_completion.usage))}")
+
     final_post = final_completion.choices[0].message.content.strip()
     return final_post
 
-def apply_md_formatting(paragraph, text):
-    # 기존 내용 제거
-    p_element = paragraph._element
-    for child in p_element[:]:
-        p_element.remove(child)
-
-    # 헤딩 처리
-    heading_match = re.match(r'^(#{1,6})\s+(.*)', text)
-    if heading_match:
-        level = len(heading_match.group(1))
-        content = heading_match.group(2)
-        paragraph.style = f'Heading {level}'
-        process_inline_formatting(paragraph, content)
-        return
-
-    # 리스트 처리
-    list_match = re.match(r'^(\*|\-|\+)\s+(.*)', text)
-    if list_match:
-        content = list_match.group(2)
-        paragraph.style = 'List Bullet'
-        process_inline_formatting(paragraph, content)
-        return
-
-    numbered_list_match = re.match(r'^(\d+)\.\s+(.*)', text)
-    if numbered_list_match:
-        content = numbered_list_match.group(2)
-        paragraph.style = 'List Number'
-        process_inline_formatting(paragraph, content)
-        return
-
-    # 블록 인용 처리
-    blockquote_match = re.match(r'^>\s+(.*)', text)
-    if blockquote_match:
-        content = blockquote_match.group(1)
-        paragraph.style = 'Quote'
-        process_inline_formatting(paragraph, content)
-        return
-
-    # 수평선 처리
-    if re.match(r'^(\*\*\*|---)$', text.strip()):
-        run = paragraph.add_run()
-        p = run._element
-        pPr = paragraph._element.get_or_add_pPr()
-        pBdr = OxmlElement('w:pBdr')
-        pPr.insert_element_before(pBdr, 'w:spacing')
-        bottom = OxmlElement('w:bottom')
-        bottom.set(qn('w:val'), 'single')
-        bottom.set(qn('w:sz'), '6')
-        bottom.set(qn('w:space'), '1')
-        bottom.set(qn('w:color'), 'auto')
-        pBdr.append(bottom)
-        return
-
-    # 코드 블록 처리
-    code_block_match = re.match(r'^```(.*)', text)
-    if code_block_match:
-        content = code_block_match.group(1)
-        run = paragraph.add_run(content)
-        run.font.name = 'Courier New'
-        run.font.size = Pt(10)
-        return
-
-    # 인라인 서식 처리
-    process_inline_formatting(paragraph, text)
-
-def process_inline_formatting(paragraph, text):
-    # 인라인 마크다운 서식을 적용합니다.
-    # 패턴 정의
-    pattern = r'(\*\*\*.+?\*\*\*|\*\*.+?\*\*|\*.+?\*|`.+?`|~~.+?~~|\!\[.*?\]\(.*?\)|\[.+?\]\(.*?\))'
-    tokens = re.split(pattern, text)
-
-    for token in tokens:
-        if not token:
-            continue
-        if token.startswith('***') and token.endswith('***'):
-            # 굵게 및 기울임
-            run = paragraph.add_run(token[3:-3])
-            run.bold = True
-            run.italic = True
-        elif token.startswith('**') and token.endswith('**'):
-            # 굵게
-            run = paragraph.add_run(token[2:-2])
-            run.bold = True
-        elif token.startswith('*') and token.endswith('*'):
-            # 기울임
-            run = paragraph.add_run(token[1:-1])
-            run.italic = True
-        elif token.startswith('~~') and token.endswith('~~'):
-            # 취소선
-            run = paragraph.add_run(token[2:-2])
-            run.font.strike = True
-        elif token.startswith('`') and token.endswith('`'):
-            # 인라인 코드
-            run = paragraph.add_run(token[1:-1])
-            run.font.name = 'Courier New'
-            run.font.size = Pt(10)
-        elif token.startswith('![') and '](' in token and token.endswith(')'):
-            # 마크다운 이미지 태그 처리 (![alt](image.png))
-            alt_text = token[2:token.index('](')]
-            image_url = token[token.index('](')+2:-1]
-            # 현재 Word 문서에 이미지를 직접 삽입하므로 텍스트로 변환
-            run = paragraph.add_run(f"[이미지: {alt_text}]")
-            run.font.color.rgb = RGBColor(0, 0, 255)  # 파란색으로 표시
-            run.font.underline = True
-        elif token.startswith('[') and '](' in token and token.endswith(')'):
-            # 하이퍼링크
-            link_text = token[1:token.index(']')]
-            link_url = token[token.index('](')+2:-1]
-            run = paragraph.add_run(f'{link_text} ({link_url})')
-            run.font.color.rgb = RGBColor(0, 0, 255)  # 파란색으로 표시
-            run.font.underline = True
-        else:
-            # 일반 텍스트
-            run = paragraph.add_run(token)
-
 def save_post_to_word(final_post):
     # Word 파일에 저장할 폴더 경로 설정
     output_folder = "/output/"
     if not os.path.exists(output_folder):
         os.makedirs(output_folder)
-    
-    doc = Document()
-    
-    # 이미지 태그 패턴 정의
-    image_tag_patterns = [
-        r'\{\{(.+?\.(?:png))\}\}',  # {{image.png}}
-        r'\((.+?\.(?:png))\)',      # (image.png)
-        r'!\[.*?\]\((.+?\.(?:png))\)',  # ![alt](image.png)
-        r'!\[(.*?)\]'               # ![alt]
-    ]
-    
-    # 문서에 텍스트를 삽입하면서 이미지 태그와 마크다운 서식을 인식
-    for line in final_post.split('\n'):
-        # 모든 이미지 태그 패턴에 대해 반복
-        for pattern in image_tag_patterns:
-            matches = re.findall(pattern, line)
-            for image_name in matches:
-                if pattern == r'!\[(.*?)\]':
-                    # ![alt] 형식의 경우 이미지 이름을 alt 텍스트로 가정
-                    image_name = image_name + ".png"  # 확장자 추가 필요 시 조정
-
-                image_path = os.path.join("/data/test/", image_name)
-                
-                # 이미지가 존재하는 경우 이미지 삽입
-                if os.path.exists(image_path):
-                    try:
-                        doc.add_picture(image_path, width=Inches(5))  # 이미지 삽입 (너비 5인치로 설정)
-                        print(f"이미지 삽입 완료: {image_name}")
-                    except Exception as e:
-                        print(f"이미지 삽입 실패: {image_name}, 오류: {e}")
-                        # 이미지 삽입 실패 시 대체 텍스트 삽입
-                        line = re.sub(rf'!\[.*?\]\({re.escape(image_name)}\)', f"[이미지 '{image_name}'를 삽입할 수 없습니다]", line)
-                
-                # 이미지 태그를 제거
-                if pattern == r'\{\{(.+?\.(?:png))\}\}':
-                    line = re.sub(r'\{\{'+re.escape(image_name)+r'\}\}', '', line)
-                elif pattern == r'\((.+?\.(?:png))\)':
-                    line = re.sub(r'\('+re.escape(image_name)+r'\)', '', line)
-                elif pattern == r'!\[.*?\]\((.+?\.(?:png))\)':
-                    line = re.sub(r'!\[.*?\]\('+re.escape(image_name)+r'\)', '', line)
-                elif pattern == r'!\[(.*?)\]':
-                    line = re.sub(r'!\['+re.escape(image_name[:-4])+r'\]', '', line)
-        
-        # 이미지 태그가 제거된 후의 텍스트 삽입
-        if line.strip():  # 빈 줄이 아닌 경우
-            paragraph = doc.add_paragraph()
-            apply_md_formatting(paragraph, line)
-    
+
+    # 게시글이 참조하는 이미지만 읽어 앱과 같은 렌더러(md_render)로 변환
+    folder_path = "/data/test/"
+    image_bytes_dict = {}
+    for image_name in referenced_image_names(final_post, os.listdir(folder_path)):
+        with open(os.path.join(folder_path, image_name), "rb") as f:
+            image_bytes_dict[image_name] = f.read()
+    output = render_docx(final_post, image_bytes_dict)
+
     # 파일 이름 설정 및 저장
     output_file = os.path.join(output_folder, "generated_post_with_images.docx")
-    doc.save(output_file)
-    
+    with open(output_file, "wb") as f:
+        f.write(output.getvalue())
+
     print(f"게시글이 {output_file} 파일로 저장되었습니다.")
 
 def main():
@@ -362,9 +235,6 @@ def main():
     
     first_sys_prompt = read_sys_prompt('/data/1st_sys_prompt.json')
     user_question = "애플 맥북 m2과 m3의 성능비교에 대한 게시글 작성해줘."
-    keyword = generate_keywords(first_sys_prompt["content"], user_question)
-    
-    clean_description = search_naver_blog(client_id, client_secret, keyword)
     second_sys_prompt = read_sys_prompt('/data/2nd_sys_prompt.json')
     third_sys_prompt = read_sys_prompt('/data/3rd_sys_prompt.json')
     
@@ -378,9 +248,28 @@ def main():
     tone_choice = 1  # 1: formal, 2: casual, 3: humorous, 4: informative
     tone = choose_tone(tone_choice)
 
-    # 이미지 분석 (PNG 이미지만 처리)
-    image_captions, image_filenames = analyze_images_in_folder()
-    final_post = generate_final_post(second_sys_prompt["content"], chosen_format, user_question, clean_description, image_captions, example_text, tone)
+    # 게시글 언어 (키워드 생성 지시와 LLM 응답 캐시 키에 사용)
+    language = "한국어"
+
+    # --refresh-keywords 옵션을 주면 캐시된 키워드를 쓰지 않고 새로 생성
+    use_keyword_cache = "--refresh-keywords" not in sys.argv[1:]
+
+    # 이미지 분석 (PNG 이미지만 처리)과 키워드 생성 → 블로그 검색을 동시에 실행한 뒤 게시글 생성
+    tasks = {
+        "images": (analyze_images_in_folder, []),
+        "keyword": (lambda: generate_keywords(first_sys_prompt["content"], user_question, language, use_keyword_cache), []),
+        "references": (lambda keyword: search_naver_blog(client_id, client_secret, keyword), ["keyword"]),
+        "context": (lambda references: process_references(references, user_question, stats=reference_stats), ["references"]),
+        "post": (
+            lambda images, context: generate_final_post(second_sys_prompt["content"], chosen_format, user_question, format_references(context), images[0], example_text, tone),
+            ["images", "context"],
+        ),
+    }
+    timings = {}
+    reference_stats = {}
+    final_post = run_pipeline(tasks, timings)["post"]
+    print(f"참고자료 정리: {describe_references(reference_stats)}")
+    print(f"단계별 소요 시간: {describe_timings(timings)}")
     
     save_post_to_word(final_post)
 
@@ -0,0 +1,246 @@
+# src/md_render.py
+# 게시글(마크다운 + 이미지 태그)을 한 번 훑어 블록/인라인/이미지 이벤트로 바꾸는 토크나이저
+# Word 변환(render_docx)은 이 이벤트를 받아 문단/런/그림을 추가하며, 앱(src/app.py)과 CLI(src/main.py)가 함께 사용합니다.
+import re
+from io import BytesIO
+
+from image_preprocess import DOCX_IMAGE_WIDTH
+
+# 이미지 태그: {image.png} / ![alt](image.png) / (image.png) / ![alt]
+# 기존 구현과 같은 패턴을 하나의 정규식으로 합쳐 한 줄을 한 번만 검색합니다.
+IMAGE_TAG_PATTERN = re.compile(
+    r'\{(?P<brace>.+?\.(?:png|jpg|jpeg))\}'
+    r'|!\[(?P<md_alt>.*?)\]\((?P<md_name>.+?\.(?:png|jpg|jpeg))\)'
+    r'|\((?P<paren>.+?\.(?:png|jpg|jpeg))\)'
+    r'|!\[(?P<alt>.*?)\]'
+)
+
+# 블록 서식: 헤딩 / 글머리 기호 목록 / 번호 목록 / 인용 (앞에서부터 먼저 맞는 것을 사용)
+BLOCK_PATTERN = re.compile(
+    r'(?P<heading>#{1,6})\s+(?P<heading_text>.*)'
+    r'|(?:\*|\-|\+)\s+(?P<bullet_text>.*)'
+    r'|\d+\.\s+(?P<number_text>.*)'
+    r'|>\s+(?P<quote_text>.*)'
+)
+HORIZONTAL_RULES = ('***', '---')
+CODE_FENCE = '```'
+
+# 인라인 서식: 굵게+기울임 / 굵게 / 기울임 / 인라인 코드 / 취소선 / 이미지 / 링크
+INLINE_PATTERN = re.compile(r'\*\*\*.+?\*\*\*|\*\*.+?\*\*|\*.+?\*|`.+?`|~~.+?~~|\!\[.*?\]\(.*?\)|\!\[.*?\]|\[.+?\]\(.*?\)')
+
+MISSING_IMAGE = "[이미지 '{name}'를 찾을 수 없습니다]"
+FAILED_IMAGE = "[이미지 '{name}'를 삽입할 수 없습니다]"
+
+
+def _inline_event(segment):
+    # 인라인 조각 하나의 (서식, 텍스트) 결정 (서식 기호로 시작하고 끝나면 일반 텍스트 조각도 같은 규칙을 적용)
+    if segment.startswith('***') and segment.endswith('***'):
+        return 'bold_italic', segment[3:-3]
+    if segment.startswith('**') and segment.endswith('**'):
+        return 'bold', segment[2:-2]
+    if segment.startswith('*') and segment.endswith('*'):
+        return 'italic', segment[1:-1]
+    if segment.startswith('~~') and segment.endswith('~~'):
+        return 'strike', segment[2:-2]
+    if segment.startswith('`') and segment.endswith('`'):
+        return 'code', segment[1:-1]
+    if segment.startswith('![') and '](' in segment and segment.endswith(')'):
+        return 'image_alt', f"[이미지: {segment[2:segment.index('](')]}]"
+    if segment.startswith('![') and segment.endswith(']'):
+        return 'image_alt', f"[이미지: {segment[2:-1]}]"
+    if segment.startswith('[') and '](' in segment and segment.endswith(')'):
+        return 'link', f"{segment[1:segment.index(']')]} ({segment[segment.index('](') + 2:-1]})"
+    return 'text', segment
+
+
+def iter_inline(text):
+    """text를 인라인 서식 단위로 나눠 ("inline", 서식, 텍스트) 이벤트를 반환합니다."""
+    position = 0
+    for match in INLINE_PATTERN.finditer(text):
+        if match.start() > position:
+            yield ('inline',) + _inline_event(text[position:match.start()])
+        yield ('inline',) + _inline_event(match.group())
+        position = match.end()
+    if position < len(text):
+        yield ('inline',) + _inline_event(text[position:])
+
+
+def iter_block(line):
+    """이미지 태그를 처리한 한 줄의 ("block", 종류, 헤딩 레벨) 이벤트와 뒤따르는 인라인 이벤트를 반환합니다."""
+    match = BLOCK_PATTERN.match(line)
+    if match:
+        kind = match.lastgroup
+        if kind == 'heading_text':
+            yield ('block', 'heading', len(match.group('heading')))
+        else:
+            yield ('block', kind[:-len('_text')], None)
+        yield from iter_inline(match.group(kind))
+    elif line.strip() in HORIZONTAL_RULES:
+        yield ('block', 'hr', None)
+    elif line.startswith(CODE_FENCE):
+        yield ('block', 'code', None)
+        yield ('code', line[len(CODE_FENCE):])
+    else:
+        yield ('block', 'paragraph', None)
+        yield from iter_inline(line)
+
+
+def _resolve_images(line, insert_image):
+    """
+    한 줄의 이미지 태그를 앞에서부터 처리해 (이미지 이벤트 목록, 태그를 처리한 줄)을 반환합니다.
+    insert_image(이름)은 그림을 넣고 "inserted" / "missing" / "failed" 중 하나를 반환해야 합니다.
+    넣은 이미지의 태그는 지우고, 넣지 못한 이미지는 태그 안의 이름을 안내 문구로 바꿉니다 (![alt] 형식은 지움).
+    """
+    events = []
+    unresolved = []  # 안내 문구로 바꿀 (이미지 이름, 문구)
+    parts = []  # (문자열, 본문 여부)
+    position = 0
+    for match in IMAGE_TAG_PATTERN.finditer(line):
+        parts.append((line[position:match.start()], True))
+        position = match.end()
+        kind = match.lastgroup
+        if kind == 'md_name':
+            # ![alt](image.png): (image.png) 부분과 ![alt] 부분을 차례로 처리
+            names = [('paren', match.group('md_name')), ('alt', match.group('md_alt') + '.png')]
+        elif kind == 'alt':
+            names = [('alt', match.group('alt') + '.png')]
+        else:
+            names = [(kind, match.group(kind))]
+        for tag_kind, name in names:
+            status = insert_image(name)
+            events.append(('image', name, status))
+            if status == 'inserted':
+                continue
+            message = (MISSING_IMAGE if status == 'missing' else FAILED_IMAGE).format(name=name)
+            unresolved.append((name, message))
+            if tag_kind == 'brace':
+                parts.append(('{' + message + '}', False))
+            elif tag_kind == 'paren':
+                parts.append(('(' + message + ')', False))
+    parts.append((line[position:], True))
+
+    # 본문에 넣지 못한 이미지 이름이 있으면 안내 문구로 바꿈
+    texts = []
+    for text, is_body in parts:
+        if is_body:
+            for name, message in unresolved:
+                text = text.replace(name, message)
+        texts.append(text)
+    return events, ''.join(texts)
+
+
+def iter_post_events(post, insert_image):
+    """
+    게시글을 줄 단위로 한 번 훑어 이벤트를 차례로 반환합니다.
+      ("image", 이름, 상태)      insert_image(이름)을 호출한 결과 (그림은 해당 줄의 문단보다 먼저 추가됨)
+      ("block", 종류, 레벨)      새 문단 (heading/bullet/number/quote/hr/code/paragraph, 헤딩만 레벨 있음)
+      ("inline", 서식, 텍스트)   문단에 추가할 런 (bold_italic/bold/italic/strike/code/image_alt/link/text)
+      ("code", 텍스트)           코드 블록 문단의 런
+    이미지 태그를 지운 뒤 빈 줄은 문단을 만들지 않습니다.
+    """
+    for line in post.split('\n'):
+        if '.png' in line or '.jpg' in line or '.jpeg' in line or '![' in line:
+            image_events, line = _resolve_images(line, insert_image)
+            yield from image_events
+        if line.strip():
+            yield from iter_block(line)
+
+
+def referenced_image_names(post, image_names):
+    """image_names 중 post의 이미지 태그가 가리킬 수 있는 이름 목록 (![이름] 형식은 이름.png로 찾음)."""
+    referenced = []
+    for name in image_names:
+        if name in post or (name.endswith('.png') and f"![{name[:-4]}]" in post):
+            referenced.append(name)
+    return referenced
+
+
+def add_horizontal_rule(paragraph):
+    from docx.oxml import OxmlElement
+    from docx.oxml.ns import qn
+
+    # 문단 아래쪽 테두리로 수평선 표시
+    paragraph.add_run()
+    pPr = paragraph._element.get_or_add_pPr()
+    pBdr = OxmlElement('w:pBdr')
+    pPr.insert_element_before(pBdr, 'w:spacing')
+    bottom = OxmlElement('w:bottom')
+    bottom.set(qn('w:val'), 'single')
+    bottom.set(qn('w:sz'), '6')
+    bottom.set(qn('w:space'), '1')
+    bottom.set(qn('w:color'), 'auto')
+    pBdr.append(bottom)
+
+
+def render_docx(final_post, image_bytes_dict):
+    """게시글을 Word 문서로 변환해 BytesIO로 반환합니다. 이미지 태그는 image_bytes_dict(이름 → 바이트)에서 찾습니다."""
+    # python-docx는 Word 파일을 만들 때만 로드
+    from docx import Document
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+    from docx.shared import Inches, Pt, RGBColor
+
+    doc = Document()
+
+    def insert_image(image_name):
+        # 이미지 태그 위치에 그림 추가
+        image_bytes = image_bytes_dict.get(image_name)
+        if not image_bytes:
+            return "missing"
+        try:
+            doc.add_picture(BytesIO(image_bytes), width=Inches(DOCX_IMAGE_WIDTH))
+        except Exception:
+            return "failed"
+        return "inserted"
+
+    # 스타일 객체는 문서마다 한 번만 조회 (paragraph.style에 이름을 넣으면 문단마다 스타일 목록을 다시 훑음)
+    styles = {}
+
+    def set_style(paragraph, style_name):
+        if style_name not in styles:
+            styles[style_name] = doc.styles[style_name]
+        paragraph.style = styles[style_name]
+
+    # 게시글을 한 번 훑으며 나오는 이벤트 순서대로 그림/문단/런 추가
+    block_styles = {'bullet': 'List Bullet', 'number': 'List Number', 'quote': 'Quote'}
+    paragraph = None
+    for event in iter_post_events(final_post, insert_image):
+        kind = event[0]
+        if kind == 'block':
+            block, level = event[1], event[2]
+            paragraph = doc.add_paragraph()
+            if block == 'heading':
+                set_style(paragraph, f'Heading {level}')
+                # 중앙 정렬
+                paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
+            elif block in block_styles:
+                set_style(paragraph, block_styles[block])
+            elif block == 'hr':
+                add_horizontal_rule(paragraph)
+        elif kind == 'code':
+            run = paragraph.add_run(event[1])
+            run.font.name = 'Courier New'
+            run.font.size = Pt(10)
+        elif kind == 'inline':
+            style, text = event[1], event[2]
+            run = paragraph.add_run(text)
+            if style == 'bold_italic':
+                run.bold = True
+                run.italic = True
+            elif style == 'bold':
+                run.bold = True
+            elif style == 'italic':
+                run.italic = True
+            elif style == 'strike':
+                run.font.strike = True
+            elif style == 'code':
+                run.font.name = 'Courier New'
+                run.font.size = Pt(10)
+            elif style in ('image_alt', 'link'):
+                run.font.color.rgb = RGBColor(0, 0, 255)
+                run.font.underline = True
+
+    # BytesIO를 사용하여 메모리에 저장
+    output = BytesIO()
+    doc.save(output)
+    output.seek(0)
+    return output
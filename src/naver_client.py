@@ -0,0 +1,321 @@
+# src/naver_client.py
+# 네이버 블로그 검색 API용 HTTP 클라이언트: keep-alive 연결 풀, 연결/읽기 타임아웃, 429/5xx 재시도, 지연 시간 지표,
+# 검색 결과 디스크 캐시 (TTL이 지난 결과는 바로 반환하고 백그라운드에서 갱신)
+import http.client
+import json
+import os
+import queue
+import random
+import threading
+import time
+import urllib.parse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from disk_cache import CACHE_DIR, DiskCache
+
+# 네이버 검색 API 주소 (로컬 스텁 서버로 테스트할 때 NAVER_API_BASE_URL로 변경)
+NAVER_API_BASE_URL = os.getenv("NAVER_API_BASE_URL", "https://openapi.naver.com")
+NAVER_CONNECT_TIMEOUT = float(os.getenv("NAVER_CONNECT_TIMEOUT", "3"))
+NAVER_READ_TIMEOUT = float(os.getenv("NAVER_READ_TIMEOUT", "10"))
+NAVER_MAX_RETRIES = int(os.getenv("NAVER_MAX_RETRIES", "3"))
+NAVER_POOL_SIZE = int(os.getenv("NAVER_POOL_SIZE", "10"))
+
+# 검색 결과 캐시 설정 (NAVER_CACHE=0 이면 사용하지 않음)
+# NAVER_CACHE_TTL이 지난 결과는 그대로 반환하면서 백그라운드에서 갱신하고, NAVER_CACHE_MAX_STALE이 지나면 삭제
+NAVER_CACHE_ENABLED = os.getenv("NAVER_CACHE", "1") != "0"
+NAVER_CACHE_TTL = int(os.getenv("NAVER_CACHE_TTL", "3600"))
+NAVER_CACHE_MAX_STALE = int(os.getenv("NAVER_CACHE_MAX_STALE", str(7 * 24 * 3600)))
+NAVER_CACHE_MAX_ENTRIES = int(os.getenv("NAVER_CACHE_MAX_ENTRIES", "5000"))
+
+# 재시도할 HTTP 상태 코드 (요청 한도 초과, 서버 오류)
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class NaverSearchError(Exception):
+    """재시도 후에도 검색 요청이 실패했을 때 발생합니다."""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class LatencyStats:
+    """요청별 지연 시간(최근 max_samples개)과 요청/재시도/오류/새 연결 수, 캐시 적중 수를 기록합니다."""
+
+    def __init__(self, max_samples=1000):
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=max_samples)
+        self.requests = 0
+        self.retries = 0
+        self.errors = 0
+        self.connections_opened = 0
+        self.cache_hits = 0
+        self.stale_hits = 0
+        self.cache_misses = 0
+        self.refreshes = 0
+
+    def record(self, seconds, ok=True):
+        with self._lock:
+            self.requests += 1
+            self._samples.append(seconds)
+            if not ok:
+                self.errors += 1
+
+    def count(self, field):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def percentile(self, p):
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(round(p / 100 * (len(samples) - 1))))]
+
+    def snapshot(self):
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "errors": self.errors,
+            "connections_opened": self.connections_opened,
+            "cache_hits": self.cache_hits,
+            "stale_hits": self.stale_hits,
+            "cache_misses": self.cache_misses,
+            "refreshes": self.refreshes,
+            "p50_seconds": self.percentile(50),
+            "p95_seconds": self.percentile(95),
+        }
+
+    def describe(self):
+        # 진행 과정 표시용 요약 문자열
+        s = self.snapshot()
+        cache_text = f"캐시 적중 {s['cache_hits']}회, 만료 후 재사용 {s['stale_hits']}회, 미적중 {s['cache_misses']}회"
+        if s["p50_seconds"] is None:
+            return f"네이버 검색 요청 없음 ({cache_text})"
+        return (f"네이버 검색 {s['requests']}회 (p50 {s['p50_seconds'] * 1000:.0f}ms, p95 {s['p95_seconds'] * 1000:.0f}ms, "
+                f"재시도 {s['retries']}회, 오류 {s['errors']}회, 새 연결 {s['connections_opened']}개, {cache_text})")
+
+
+class NaverSearchClient:
+    """
+    네이버 검색 API 클라이언트. 연결을 풀에 보관해 요청마다 TLS 핸드셰이크를 반복하지 않습니다.
+    연결 타임아웃과 읽기 타임아웃을 따로 적용하고, 429/5xx 응답과 끊어진 연결은 지수 백오프로 재시도합니다.
+    cache(DiskCache)를 넘기면 검색 결과를 (검색어, display, start, sort)별로 저장해 재사용합니다.
+    여러 스레드에서 동시에 사용할 수 있습니다.
+    """
+
+    def __init__(self, client_id, client_secret, base_url=NAVER_API_BASE_URL, pool_size=NAVER_POOL_SIZE,
+                 connect_timeout=NAVER_CONNECT_TIMEOUT, read_timeout=NAVER_READ_TIMEOUT,
+                 max_retries=NAVER_MAX_RETRIES, backoff=0.5, max_backoff=8.0,
+                 cache=None, cache_ttl=NAVER_CACHE_TTL):
+        self.base_url = base_url
+        parsed = urllib.parse.urlsplit(base_url)
+        self.scheme = parsed.scheme or "https"
+        self.host = parsed.hostname
+        self.port = parsed.port
+        self.base_path = parsed.path.rstrip("/")
+        self.headers = {
+            "X-Naver-Client-Id": client_id,
+            "X-Naver-Client-Secret": client_secret,
+            "Connection": "keep-alive",
+        }
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.metrics = LatencyStats()
+        self._pool = queue.LifoQueue(maxsize=max(1, pool_size))
+        self.cache = cache
+        self.cache_ttl = cache_ttl
+        self._refreshing = set()
+        self._refresh_lock = threading.Lock()
+        self._refresh_executor = None
+
+    def _new_connection(self):
+        conn_class = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        conn = conn_class(self.host, self.port, timeout=self.connect_timeout)
+        conn.connect()
+        # 연결이 맺어진 뒤에는 읽기 타임아웃 적용
+        conn.sock.settimeout(self.read_timeout)
+        self.metrics.count("connections_opened")
+        return conn
+
+    def _acquire(self):
+        # (연결, 풀에서 재사용한 연결인지) 반환
+        try:
+            return self._pool.get_nowait(), True
+        except queue.Empty:
+            return self._new_connection(), False
+
+    def _release(self, conn):
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def _send(self, url):
+        # 요청을 보내고 (연결, 응답, 본문) 반환. 풀에 있던 연결이 서버 쪽에서 이미 닫혔으면 새 연결로 바로 한 번 더 보냄
+        conn, reused = self._acquire()
+        try:
+            conn.request("GET", url, headers=self.headers)
+            response = conn.getresponse()
+            return conn, response, response.read()
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            conn.close()
+            if not reused:
+                raise
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            raise
+        conn = self._new_connection()
+        try:
+            conn.request("GET", url, headers=self.headers)
+            response = conn.getresponse()
+            return conn, response, response.read()
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            raise
+
+    def _sleep_before_retry(self, attempt, retry_after=None):
+        self.metrics.count("retries")
+        if retry_after is not None:
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                delay = None
+            if delay is not None:
+                time.sleep(min(delay, self.max_backoff))
+                return
+        # 지수 백오프 + 지터
+        delay = min(self.max_backoff, self.backoff * (2 ** attempt))
+        time.sleep(delay * (0.5 + random.random() / 2))
+
+    def get_json(self, path, params):
+        """path에 GET 요청을 보내 JSON 응답을 반환합니다. 재시도 후에도 실패하면 NaverSearchError를 발생시킵니다."""
+        url = f"{self.base_path}{path}?{urllib.parse.urlencode(params)}"
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            start = time.perf_counter()
+            try:
+                conn, response, body = self._send(url)
+            except (http.client.HTTPException, OSError) as e:
+                # 연결 실패나 타임아웃: 백오프 후 재시도
+                self.metrics.record(time.perf_counter() - start, ok=False)
+                last_error = NaverSearchError(f"네이버 검색 요청 실패: {e}")
+                if attempt < self.max_retries:
+                    self._sleep_before_retry(attempt)
+                continue
+
+            if response.will_close:
+                conn.close()
+            else:
+                self._release(conn)
+            elapsed = time.perf_counter() - start
+
+            if response.status == 200:
+                try:
+                    result = json.loads(body.decode("utf-8"))
+                except ValueError:
+                    # 프록시/점검 안내 HTML 등 JSON이 아닌 200 응답: 일시적인 경우가 많으므로 재시도
+                    self.metrics.record(elapsed, ok=False)
+                    last_error = NaverSearchError(f"네이버 검색 응답 형식 오류: JSON이 아닌 응답 {body[:200].decode('utf-8', 'replace')}", response.status)
+                    if attempt < self.max_retries:
+                        self._sleep_before_retry(attempt)
+                    continue
+                self.metrics.record(elapsed)
+                return result
+
+            self.metrics.record(elapsed, ok=False)
+            last_error = NaverSearchError(f"네이버 검색 응답 오류: HTTP {response.status} {body[:200].decode('utf-8', 'replace')}", response.status)
+            if response.status not in RETRY_STATUSES:
+                break
+            if attempt < self.max_retries:
+                self._sleep_before_retry(attempt, response.getheader("Retry-After"))
+        raise last_error
+
+    def search_blog(self, query, display=10, start=1, sort="sim", use_cache=True):
+        """
+        /v1/search/blog 응답(JSON 사전)을 반환합니다.
+        캐시에 있으면 API를 호출하지 않고, cache_ttl이 지난 결과는 그대로 반환한 뒤 백그라운드에서 새로 받아 둡니다.
+        use_cache=False면 캐시를 읽지 않고 새로 받아 캐시를 갱신합니다.
+        """
+        path = "/v1/search/blog"
+        params = {"query": query, "display": display, "start": start, "sort": sort}
+        if self.cache is None:
+            return self.get_json(path, params)
+
+        key = json.dumps([self.base_url, path, params], ensure_ascii=False, sort_keys=True)
+        entry = self.cache.get(key) if use_cache else None
+        if entry is not None:
+            if time.time() - entry["fetched_at"] <= self.cache_ttl:
+                self.metrics.count("cache_hits")
+            else:
+                self.metrics.count("stale_hits")
+                self._refresh_in_background(key, path, params)
+            return entry["result"]
+        self.metrics.count("cache_misses")
+        return self._fetch_and_store(key, path, params)
+
+    def _fetch_and_store(self, key, path, params):
+        result = self.get_json(path, params)
+        self.cache.set(key, {"fetched_at": time.time(), "result": result})
+        return result
+
+    def _refresh_in_background(self, key, path, params):
+        # 같은 키의 갱신은 프로세스 안에서 한 번만 실행
+        with self._refresh_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+            if self._refresh_executor is None:
+                self._refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="naver-refresh")
+
+        def refresh():
+            try:
+                self._fetch_and_store(key, path, params)
+                self.metrics.count("refreshes")
+            except NaverSearchError:
+                # 갱신에 실패하면 기존 결과를 계속 사용 (NAVER_CACHE_MAX_STALE이 지나면 삭제됨)
+                pass
+            finally:
+                with self._refresh_lock:
+                    self._refreshing.discard(key)
+
+        self._refresh_executor.submit(refresh)
+
+    def close(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+_search_cache = None
+
+
+def get_search_cache():
+    # 프로세스당 하나의 검색 결과 캐시 인스턴스 (파일은 앱 프로세스와 CLI가 공유)
+    global _search_cache
+    if not NAVER_CACHE_ENABLED:
+        return None
+    with _clients_lock:
+        if _search_cache is None:
+            _search_cache = DiskCache(os.path.join(CACHE_DIR, "naver_search.sqlite"), max_entries=NAVER_CACHE_MAX_ENTRIES, ttl=NAVER_CACHE_MAX_STALE)
+    return _search_cache
+
+
+def get_naver_client(client_id, client_secret, base_url=NAVER_API_BASE_URL):
+    # 같은 인증 정보의 클라이언트(연결 풀)를 프로세스 전체에서 재사용 (Streamlit 재실행 사이에도 유지)
+    key = (client_id, client_secret, base_url)
+    cache = get_search_cache()
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = NaverSearchClient(client_id, client_secret, base_url, cache=cache)
+            _clients[key] = client
+    return client
@@ -0,0 +1,61 @@
+# src/pipeline.py
+# 게시글 생성 단계를 작은 의존성 그래프로 표현해, 서로 독립적인 단계를 동시에 실행합니다.
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+def run_pipeline(tasks, timings=None):
+    """
+    tasks는 {단계 이름: (함수, [의존 단계 이름, ...])} 형태의 사전입니다.
+    각 함수는 의존 단계의 결과를 같은 이름의 키워드 인자로 받으며, 의존 단계가 모두 끝나면 바로 실행됩니다.
+    {단계 이름: 결과} 사전을 반환하고, timings 사전을 넘기면 단계별 (시작, 종료) 시각(초, 파이프라인 시작 기준)을 채웁니다.
+    한 단계라도 실패하면 아직 시작하지 않은 단계는 취소하고 해당 예외를 그대로 발생시킵니다.
+    """
+    for name, (_, deps) in tasks.items():
+        unknown = [dep for dep in deps if dep not in tasks]
+        if unknown:
+            raise ValueError(f"'{name}' 단계의 의존 단계를 찾을 수 없습니다: {', '.join(unknown)}")
+
+    results = {}
+    pending = dict(tasks)
+    running = {}
+    started = time.perf_counter()
+
+    def run(name, fn, kwargs):
+        start = time.perf_counter() - started
+        try:
+            return fn(**kwargs)
+        finally:
+            if timings is not None:
+                timings[name] = (start, time.perf_counter() - started)
+
+    with ThreadPoolExecutor(max_workers=max(1, len(tasks)), thread_name_prefix="pipeline") as executor:
+        while pending or running:
+            # 의존 단계가 모두 끝난 단계를 제출
+            for name, (fn, deps) in list(pending.items()):
+                if all(dep in results for dep in deps):
+                    kwargs = {dep: results[dep] for dep in deps}
+                    running[executor.submit(run, name, fn, kwargs)] = name
+                    del pending[name]
+            if not running:
+                raise ValueError(f"순환 의존성이 있는 단계가 있습니다: {', '.join(pending)}")
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                error = future.exception()
+                if error is not None:
+                    for other in running:
+                        other.cancel()
+                    raise error
+                results[name] = future.result()
+
+    return results
+
+
+def describe_timings(timings, labels=None):
+    # 진행 과정 표시용 단계별 소요 시간 요약 문자열
+    labels = labels or {}
+    parts = [f"{labels.get(name, name)} {end - start:.1f}초" for name, (start, end) in sorted(timings.items(), key=lambda item: item[1][0])]
+    total = max((end for _, end in timings.values()), default=0.0)
+    return f"{', '.join(parts)} (전체 {total:.1f}초)"
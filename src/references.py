@@ -0,0 +1,145 @@
+# src/references.py
+# 수집한 참고자료를 정리합니다: 텍스트 정규화 → 질문과의 관련도(BM25) 순 정렬 → 유사 중복(MinHash) 제거 → 토큰 예산 안에서 선택
+import html
+import math
+import os
+import re
+import unicodedata
+import zlib
+from collections import Counter
+
+from retrieval import format_reference_line
+from token_budget import count_tokens
+
+# 참고자료 정리 설정
+REFERENCE_TOKEN_BUDGET = int(os.getenv("REFERENCE_TOKEN_BUDGET", "1500"))                  # 프롬프트에 넣을 참고자료 최대 토큰 수
+REFERENCE_DEDUP_THRESHOLD = float(os.getenv("REFERENCE_DEDUP_THRESHOLD", "0.7"))          # 이 값 이상 유사하면 중복으로 처리 (추정 자카드 유사도)
+REFERENCE_MIN_SCORE = float(os.getenv("REFERENCE_MIN_SCORE", "-1"))                       # 이 점수 이하의 참고자료는 제외 (-1이면 모두 사용, 0이면 질문과 겹치는 단어가 없는 참고자료 제외)
+
+# MinHash 설정: 문자 4-gram shingle, 해시 함수 64개
+_SHINGLE_SIZE = 4
+_NUM_PERMUTATIONS = 64
+_MERSENNE_PRIME = (1 << 61) - 1
+_PERMUTATIONS = [
+    (1 + (0x9E3779B97F4A7C15 * (i + 1)) % (_MERSENNE_PRIME - 1), (0xBF58476D1CE4E5B9 * (i + 7)) % _MERSENNE_PRIME)
+    for i in range(_NUM_PERMUTATIONS)
+]
+
+_TAG_PATTERN = re.compile(r'<[^>]+>')
+_SPACE_PATTERN = re.compile(r'\s+')
+_WORD_PATTERN = re.compile(r'[0-9A-Za-z가-힣]+')
+
+
+def normalize_text(text):
+    # HTML 엔티티(&quot; 등) 복원, 태그 제거, 유니코드 정규화, 공백 정리
+    text = html.unescape(_TAG_PATTERN.sub(' ', text or ''))
+    text = unicodedata.normalize('NFKC', text)
+    return _SPACE_PATTERN.sub(' ', text).strip()
+
+
+def tokenize(text):
+    """
+    BM25용 토큰 목록. 영문은 소문자 단어, 한글 단어는 단어 자체와 글자 2-gram을 함께 사용해
+    조사가 붙은 형태('맥북의', '맥북과')도 같은 단어로 매칭되게 합니다.
+    """
+    tokens = []
+    for word in _WORD_PATTERN.findall(text.lower()):
+        tokens.append(word)
+        if len(word) > 2 and not word.isascii():
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+def bm25_scores(query, documents, k1=1.5, b=0.75):
+    # documents(문자열 목록) 각각의 query에 대한 BM25 점수 (documents 자체를 말뭉치로 사용)
+    doc_tokens = [Counter(tokenize(doc)) for doc in documents]
+    if not doc_tokens:
+        return []
+    lengths = [sum(counts.values()) for counts in doc_tokens]
+    avg_length = sum(lengths) / len(lengths) or 1.0
+    document_frequency = Counter(token for counts in doc_tokens for token in counts)
+    n = len(documents)
+    query_terms = set(tokenize(query))
+    scores = []
+    for counts, length in zip(doc_tokens, lengths):
+        score = 0.0
+        for term in query_terms:
+            tf = counts.get(term)
+            if not tf:
+                continue
+            idf = math.log(1 + (n - document_frequency[term] + 0.5) / (document_frequency[term] + 0.5))
+            score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * length / avg_length))
+        scores.append(score)
+    return scores
+
+
+def minhash_signature(text):
+    # 공백을 제거한 문자 4-gram 집합의 MinHash 서명
+    compact = re.sub(r'\s+', '', text.lower())
+    shingles = {compact[i:i + _SHINGLE_SIZE] for i in range(max(1, len(compact) - _SHINGLE_SIZE + 1))}
+    hashes = [zlib.crc32(shingle.encode('utf-8')) for shingle in shingles]
+    return [min((a * h + c) % _MERSENNE_PRIME for h in hashes) for a, c in _PERMUTATIONS]
+
+
+def estimated_similarity(signature_a, signature_b):
+    # 두 MinHash 서명으로 추정한 자카드 유사도
+    return sum(1 for x, y in zip(signature_a, signature_b) if x == y) / len(signature_a)
+
+
+def process_references(items, question, token_budget=REFERENCE_TOKEN_BUDGET, dedup_threshold=REFERENCE_DEDUP_THRESHOLD,
+                       min_score=REFERENCE_MIN_SCORE, count_tokens=count_tokens, format_item=format_reference_line, stats=None):
+    """
+    BlogItem 목록을 정리해 프롬프트에 넣을 참고자료만 남깁니다.
+    제목/설명을 정규화하고, 질문에 대한 BM25 점수가 높은 순으로 정렬한 뒤, 이미 고른 참고자료와 유사한 항목은
+    제외하면서 format_item으로 만든 문자열의 토큰 수 합이 token_budget을 넘지 않을 때까지 선택합니다.
+    점수가 같으면 검색 순위를 유지하므로 같은 입력에는 항상 같은 결과를 반환합니다.
+    stats 사전을 넘기면 단계별 항목 수와 토큰 수를 채웁니다.
+    """
+    normalized = []
+    for item in items:
+        item = item._replace(title=normalize_text(item.title), description=normalize_text(item.description))
+        if item.description:
+            normalized.append(item)
+
+    scores = bm25_scores(question, [f"{item.title} {item.description}" for item in normalized])
+    ranked = sorted(range(len(normalized)), key=lambda i: -scores[i])
+
+    selected = []
+    signatures = []
+    duplicates = irrelevant = over_budget = 0
+    used_tokens = 0
+    for i in ranked:
+        item = normalized[i]
+        if scores[i] <= min_score:
+            irrelevant += 1
+            continue
+        signature = minhash_signature(f"{item.title} {item.description}")
+        if any(estimated_similarity(signature, other) >= dedup_threshold for other in signatures):
+            duplicates += 1
+            continue
+        tokens = count_tokens(format_item(item))
+        if used_tokens + tokens > token_budget:
+            over_budget += 1
+            continue
+        selected.append(item)
+        signatures.append(signature)
+        used_tokens += tokens
+
+    if stats is not None:
+        stats.update({
+            "input": len(items),
+            "input_tokens": sum(count_tokens(format_item(item)) for item in items),
+            "duplicates": duplicates,
+            "irrelevant": irrelevant,
+            "over_budget": over_budget,
+            "selected": len(selected),
+            "tokens": used_tokens,
+            "token_budget": token_budget,
+        })
+    return selected
+
+
+def describe_references(stats):
+    # 진행 과정 표시용 요약 문자열
+    return (f"참고자료 {stats['input']}개 중 {stats['selected']}개 사용 (유사 중복 {stats['duplicates']}개, 관련 없음 {stats['irrelevant']}개, "
+            f"예산 초과 {stats['over_budget']}개 제외), 약 {stats['input_tokens']} → {stats['tokens']}토큰 (예산 {stats['token_budget']})")
@@ -0,0 +1,131 @@
+# src/retrieval.py
+# 여러 키워드 × 여러 페이지의 네이버 블로그 검색을 동시에 실행해 참고자료를 모읍니다.
+import os
+import re
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from naver_client import NaverSearchError
+
+# 참고자료 수집 설정
+REFERENCE_BUDGET = int(os.getenv("REFERENCE_BUDGET", "30"))            # 최대 참고자료 수
+REFERENCE_PAGE_SIZE = int(os.getenv("REFERENCE_PAGE_SIZE", "10"))      # 요청 한 번의 display (최대 100)
+REFERENCE_MAX_PAGES = int(os.getenv("REFERENCE_MAX_PAGES", "3"))       # 키워드별 최대 페이지 수
+REFERENCE_MAX_KEYWORDS = int(os.getenv("REFERENCE_MAX_KEYWORDS", "3"))  # 검색할 최대 키워드 수
+REFERENCE_CONCURRENCY = int(os.getenv("REFERENCE_CONCURRENCY", "10"))  # 동시에 보낼 검색 요청 수
+
+NO_REFERENCES = "참고 자료가 없습니다."
+
+# 네이버 검색 API의 start 최대값
+_NAVER_MAX_START = 1000
+
+
+class BlogItem(namedtuple("BlogItem", ["title", "link", "description", "postdate"])):
+    __slots__ = ()
+
+    @classmethod
+    def from_api(cls, item):
+        # 검색 결과 항목에서 강조 태그(<b>)를 제거해 생성
+        return cls(
+            re.sub(r'<\/?b>', '', item.get("title", "")),
+            item.get("link", ""),
+            re.sub(r'<\/?b>', '', item.get("description", "")),
+            item.get("postdate", ""),
+        )
+
+
+def split_keywords(keyword_text, max_keywords=REFERENCE_MAX_KEYWORDS):
+    """
+    키워드 생성 결과를 검색어 목록으로 나눕니다.
+    쉼표/줄바꿈 등으로 여러 키워드가 오면 각각을 사용하고, 부족하면 첫 키워드의 뒤 단어를 하나씩 뺀
+    더 넓은 검색어('애플 맥북 M2 칩 성능' → '애플 맥북 M2 칩')를 추가합니다. 중복은 제외합니다.
+    """
+    keywords = []
+    for part in re.split(r'[,\n;/]|\s\|\s', keyword_text or ""):
+        part = part.strip().strip("'\"“”‘’-•*").strip()
+        part = re.sub(r'^\d+[.)]\s*', '', part)
+        if part and part not in keywords:
+            keywords.append(part)
+    if keywords:
+        words = keywords[0].split()
+        while len(keywords) < max_keywords and len(words) > 2:
+            words = words[:-1]
+            broader = " ".join(words)
+            if broader not in keywords:
+                keywords.append(broader)
+    return keywords[:max(1, max_keywords)]
+
+
+def retrieve_references(client, keywords, budget=REFERENCE_BUDGET, page_size=REFERENCE_PAGE_SIZE,
+                        max_pages=REFERENCE_MAX_PAGES, sort="sim", max_workers=REFERENCE_CONCURRENCY, stats=None):
+    """
+    keywords 각각에 대해 budget을 채울 만큼의 페이지(키워드별 최대 max_pages)를 동시에 검색하고,
+    링크 기준으로 중복을 제거한 BlogItem 목록(최대 budget개)을 반환합니다.
+    결과는 키워드의 검색 순위를 번갈아 가며 합쳐 한 키워드의 결과만 몰리지 않게 합니다.
+    일부 요청이 실패해도 나머지 결과는 반환하며, stats 사전을 넘기면 요청/실패/중복 수를 채웁니다.
+    """
+    if not keywords or budget <= 0:
+        return []
+    page_size = max(1, min(100, page_size))
+    pages = max(1, min(max_pages, -(-budget // page_size)))
+    requests = [
+        (keyword_index, page, keyword)
+        for keyword_index, keyword in enumerate(keywords)
+        for page in range(pages)
+        if 1 + page * page_size <= _NAVER_MAX_START
+    ]
+
+    def fetch(request):
+        _, page, keyword = request
+        try:
+            return client.search_blog(keyword, display=page_size, start=1 + page * page_size, sort=sort).get("items", [])
+        except NaverSearchError:
+            return None
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(requests))), thread_name_prefix="retrieval") as executor:
+        responses = list(executor.map(fetch, requests))
+
+    # (키워드 내 순위, 키워드 순서) 순으로 정렬해 키워드별 결과를 번갈아 합침
+    ranked = []
+    for (keyword_index, page, _), items in zip(requests, responses):
+        for position, item in enumerate(items or []):
+            ranked.append((page * page_size + position, keyword_index, item))
+    ranked.sort(key=lambda entry: entry[:2])
+
+    results = []
+    seen = set()
+    for _, _, item in ranked:
+        blog_item = BlogItem.from_api(item)
+        if blog_item.link in seen:
+            continue
+        seen.add(blog_item.link)
+        results.append(blog_item)
+        if len(results) >= budget:
+            break
+
+    if stats is not None:
+        stats.update({
+            "keywords": len(keywords),
+            "requests": len(requests),
+            "failed": sum(1 for items in responses if items is None),
+            "fetched": len(ranked),
+            "items": len(results),
+        })
+    return results
+
+
+def format_reference_line(item):
+    return f"- {item.title}: {item.description}"
+
+
+def format_references(items):
+    # 게시글 생성 프롬프트에 넣을 참고자료 문자열
+    if not items:
+        return NO_REFERENCES
+    return "\n".join(format_reference_line(item) for item in items)
+
+
+def describe_retrieval(stats):
+    # 진행 과정 표시용 요약 문자열
+    return (f"키워드 {stats['keywords']}개, 검색 요청 {stats['requests']}회 (실패 {stats['failed']}회), "
+            f"검색 결과 {stats['fetched']}개 중 중복 제외 {stats['items']}개 사용")
@@ -0,0 +1,144 @@
+# src/token_budget.py
+# 프롬프트 구성 요소별 토큰 수 측정과 예산 적용 (tiktoken이 없거나 인코딩 파일을 받을 수 없으면 추정값 사용)
+import os
+import re
+import threading
+
+# gpt-4o 계열 모델의 토크나이저
+TOKEN_ENCODING = os.getenv("TOKEN_ENCODING", "o200k_base")
+
+# 게시글 생성 프롬프트 전체 토큰 예산과 구성 요소별 상한
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "6000"))
+PROMPT_COMPONENT_CAPS = {
+    "system": int(os.getenv("PROMPT_CAP_SYSTEM", "2000")),
+    "format": int(os.getenv("PROMPT_CAP_FORMAT", "1500")),
+    "question": int(os.getenv("PROMPT_CAP_QUESTION", "500")),
+    "references": int(os.getenv("PROMPT_CAP_REFERENCES", "2000")),
+    "example_text": int(os.getenv("PROMPT_CAP_EXAMPLE_TEXT", "1000")),
+}
+# 전체 예산을 넘으면 이 순서대로 줄임 (지시문, 이미지 자리표시자처럼 여기에 없는 요소는 자르지 않음)
+PROMPT_SHRINK_ORDER = ("example_text", "references", "format")
+
+TRUNCATION_MARKER = " …(이하 생략)"
+
+# 이 비율보다 뒤에 문장/줄 경계가 있으면 그 위치에서 자름
+_BOUNDARY_MIN_RATIO = 0.7
+_BOUNDARY_PATTERN = re.compile(r'[\n.!?。]\s')
+
+_encoding = None
+_encoding_unavailable = False
+_encoding_lock = threading.Lock()
+
+
+def _get_encoding():
+    # tiktoken 인코딩을 한 번만 로드 (실패하면 이후에는 추정값 사용)
+    global _encoding, _encoding_unavailable
+    if _encoding is None and not _encoding_unavailable:
+        with _encoding_lock:
+            if _encoding is None and not _encoding_unavailable:
+                try:
+                    import tiktoken
+                    _encoding = tiktoken.get_encoding(TOKEN_ENCODING)
+                except Exception:
+                    # 미설치 또는 오프라인 환경에서 인코딩 파일 다운로드 실패
+                    _encoding_unavailable = True
+    return _encoding
+
+
+def tokenizer_name():
+    return f"tiktoken {TOKEN_ENCODING}" if _get_encoding() is not None else "추정"
+
+
+def estimate_tokens(text):
+    # 토크나이저 없이 쓰는 보수적인 토큰 수 추정 (한글 1자 ≈ 1토큰, 영문 약 3자 ≈ 1토큰)
+    return -(-len(text.encode('utf-8')) // 3)
+
+
+def count_tokens(text):
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def _head(text, max_tokens):
+    # 앞에서부터 max_tokens 토큰까지의 문자열
+    encoding = _get_encoding()
+    if encoding is None:
+        return text.encode('utf-8')[:max_tokens * 3].decode('utf-8', 'ignore')
+    return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens]).rstrip('�')
+
+
+def truncate_to_tokens(text, max_tokens, marker=TRUNCATION_MARKER):
+    """
+    text가 max_tokens를 넘으면 뒷부분을 잘라내고 marker를 붙입니다 (marker 포함 max_tokens 이하).
+    가능하면 문장이나 줄이 끝나는 위치에서 자르며, 같은 입력에는 항상 같은 결과를 반환합니다.
+    """
+    if count_tokens(text) <= max_tokens:
+        return text
+    keep = max_tokens - count_tokens(marker)
+    if keep <= 0:
+        return ""
+    head = _head(text, keep)
+    boundaries = [m.end() for m in _BOUNDARY_PATTERN.finditer(head)]
+    if boundaries and boundaries[-1] >= len(head) * _BOUNDARY_MIN_RATIO:
+        head = head[:boundaries[-1]]
+    truncated = head.rstrip() + marker
+    # 디코딩한 문자열을 다시 인코딩하면 토큰 경계가 달라질 수 있으므로 넘치면 조금씩 더 자름
+    while count_tokens(truncated) > max_tokens and head:
+        head = head[:-max(1, len(head) // 20)]
+        truncated = head.rstrip() + marker
+    return truncated
+
+
+def fit_prompt(components, caps=None, total_budget=PROMPT_TOKEN_BUDGET, shrink_order=PROMPT_SHRINK_ORDER, report=None):
+    """
+    {구성 요소 이름: 문자열}의 각 요소를 caps 상한 안으로 자르고, 합계가 total_budget을 넘으면
+    shrink_order 순서대로 넘친 만큼 더 잘라 같은 키의 사전을 반환합니다.
+    report 사전을 넘기면 요소별 원래/최종 토큰 수와 합계를 채웁니다.
+    """
+    caps = PROMPT_COMPONENT_CAPS if caps is None else caps
+    fitted = {}
+    breakdown = {}
+    for name, text in components.items():
+        text = text or ""
+        tokens_in = count_tokens(text)
+        cap = caps.get(name)
+        if cap is not None and tokens_in > cap:
+            text = truncate_to_tokens(text, cap)
+        fitted[name] = text
+        breakdown[name] = {"tokens_in": tokens_in, "tokens": count_tokens(text)}
+
+    total = sum(entry["tokens"] for entry in breakdown.values())
+    for name in shrink_order:
+        if total <= total_budget:
+            break
+        if name not in fitted:
+            continue
+        tokens = breakdown[name]["tokens"]
+        fitted[name] = truncate_to_tokens(fitted[name], max(0, tokens - (total - total_budget)))
+        breakdown[name]["tokens"] = count_tokens(fitted[name])
+        total -= tokens - breakdown[name]["tokens"]
+
+    if report is not None:
+        report.update({
+            "tokenizer": tokenizer_name(),
+            "components": breakdown,
+            "total_in": sum(entry["tokens_in"] for entry in breakdown.values()),
+            "total": total,
+            "budget": total_budget,
+        })
+    return fitted
+
+
+def describe_budget(report):
+    # 진행 과정 표시용 요약 문자열 (요소별 토큰 수, 잘린 요소는 원래 → 최종)
+    parts = []
+    for name, entry in report["components"].items():
+        if entry["tokens"] < entry["tokens_in"]:
+            parts.append(f"{name} {entry['tokens_in']}→{entry['tokens']}")
+        else:
+            parts.append(f"{name} {entry['tokens']}")
+    return f"{', '.join(parts)} / 합계 {report['total']}토큰 (예산 {report['budget']}, {report['tokenizer']})"
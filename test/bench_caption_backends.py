@@ -0,0 +1,63 @@
+# 캡션 추론 백엔드(eager fp32 / int8 / onnx)의 지연 시간, 처리량, fp32 대비 캡션 일치도 비교
+# 실행: python test/bench_caption_backends.py [백엔드 ...] (기본: eager int8 onnx)
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from caption_backends import BACKENDS
+from captioning import caption_images, registry
+from image_preprocess import load_for_caption
+
+folder_path = "./data/test/"
+backends = sys.argv[1:] or list(BACKENDS)
+batch_size = int(os.getenv("CAPTION_BATCH_SIZE", "8"))
+
+images = {}
+for filename in sorted(os.listdir(folder_path)):
+    if filename.lower().endswith((".png", ".jpg", ".jpeg")):
+        with open(os.path.join(folder_path, filename), 'rb') as f:
+            images[filename] = load_for_caption(f.read(), filename)[0]
+filenames = list(images)
+
+
+def token_overlap(a, b):
+    # 두 캡션의 단어 집합 자카드 유사도
+    a, b = set(a.split()), set(b.split())
+    return len(a & b) / len(a | b) if a | b else 1.0
+
+
+baseline = None
+for backend in ["eager"] + [b for b in backends if b != "eager"]:
+    registry.get_backend(backend)
+    load_text = registry.describe(backend)
+    # 워밍업
+    caption_images([(filenames[0], lambda: images[filenames[0]])], batch_size=1, backend=backend)
+
+    # 이미지 한 장 지연 시간
+    latencies = []
+    captions = {}
+    for filename in filenames:
+        start = time.perf_counter()
+        captions[filename] = caption_images([(filename, lambda f=filename: images[f])], batch_size=1, backend=backend)[0].caption
+        latencies.append(time.perf_counter() - start)
+
+    # 배치 처리량
+    start = time.perf_counter()
+    caption_images([(f, lambda f=f: images[f]) for f in filenames], batch_size=batch_size, backend=backend)
+    throughput = len(filenames) / (time.perf_counter() - start)
+
+    if baseline is None:
+        baseline = captions
+    exact = sum(1 for f in filenames if captions[f] == baseline[f])
+    overlap = statistics.mean(token_overlap(captions[f], baseline[f]) for f in filenames)
+
+    if backend in backends:
+        latencies.sort()
+        print(f"[{backend}] {load_text}")
+        print(f"  지연 시간 p50 {statistics.median(latencies) * 1000:.0f}ms, "
+              f"p95 {latencies[int(0.95 * (len(latencies) - 1))] * 1000:.0f}ms, "
+              f"배치({batch_size}) 처리량 {throughput:.2f} 장/초")
+        print(f"  fp32 대비 캡션 일치 {exact}/{len(filenames)}, 단어 유사도 평균 {overlap:.2f}")
@@ -0,0 +1,46 @@
+# 이미지 한 장씩 캡션을 생성하는 기존 방식과 배치 캡션 생성의 처리량 비교
+# 실행: python test/bench_caption_batch.py [배치 크기 ...]
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from PIL import Image
+from captioning import MAX_NEW_TOKENS, caption_images, get_blip, registry
+
+folder_path = "./data/test/"
+batch_sizes = [int(arg) for arg in sys.argv[1:]] or [1, 4, 8]
+
+filenames = sorted(f for f in os.listdir(folder_path) if f.lower().endswith((".png", ".jpg", ".jpeg")))
+images = {}
+for filename in filenames:
+    with Image.open(os.path.join(folder_path, filename)) as img:
+        images[filename] = img.convert("RGB")
+
+processor, model = get_blip()
+print(f"모델 로드: {registry.describe()}")
+print(f"이미지 {len(filenames)}장, max_new_tokens={MAX_NEW_TOKENS}")
+
+# 워밍업 (첫 호출의 지연 초기화 비용 제외)
+caption_images([(filenames[0], lambda: images[filenames[0]])], batch_size=1)
+
+# 기존 방식: 이미지 한 장마다 processor + generate 호출
+start = time.perf_counter()
+baseline = {}
+for filename in filenames:
+    inputs = processor(images=images[filename], return_tensors="pt")
+    out = model.generate(**inputs, max_new_tokens=MAX_NEW_TOKENS)
+    baseline[filename] = processor.decode(out[0], skip_special_tokens=True).strip()
+baseline_seconds = time.perf_counter() - start
+print(f"이미지별 루프     : {baseline_seconds:7.2f}초, {len(filenames) / baseline_seconds:5.2f} 장/초")
+
+for batch_size in batch_sizes:
+    items = [(filename, lambda f=filename: images[f]) for filename in filenames]
+    start = time.perf_counter()
+    results = caption_images(items, batch_size=batch_size)
+    seconds = time.perf_counter() - start
+    assert [r.filename for r in results] == filenames, "결과 순서가 입력 순서와 다릅니다"
+    same = sum(1 for r in results if r.caption == baseline[r.filename])
+    print(f"배치 크기 {batch_size:2d}      : {seconds:7.2f}초, {len(filenames) / seconds:5.2f} 장/초, "
+          f"속도 {baseline_seconds / seconds:4.2f}배, 캡션 일치 {same}/{len(filenames)}")
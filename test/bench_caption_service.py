@@ -0,0 +1,84 @@
+# test/bench_caption_service.py
+# 여러 세션이 동시에 캡션을 요청할 때, 세션마다 따로 추론하는 방식과 공유 캡션 서비스(동적 배치)의 처리량/세션별 지연 비교
+# 사용: python test/bench_caption_service.py [동시 세션 수, 기본 4] [세션별 이미지 수, 기본 3]
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from PIL import Image  # noqa: E402
+from caption_service import CaptionService  # noqa: E402
+from captioning import caption_images, registry  # noqa: E402
+
+folder_path = "./data/test/"
+
+
+def run_sessions(sessions, caption):
+    # 세션 수만큼 스레드를 동시에 시작하고 (전체 시간, 세션별 지연 목록, 결과) 반환
+    latencies = [None] * len(sessions)
+    outputs = [None] * len(sessions)
+    barrier = threading.Barrier(len(sessions) + 1)
+
+    def session(index, items):
+        barrier.wait()
+        start = time.perf_counter()
+        outputs[index] = caption(items)
+        latencies[index] = time.perf_counter() - start
+
+    threads = [threading.Thread(target=session, args=(index, items)) for index, items in enumerate(sessions)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, latencies, outputs
+
+
+def report(name, seconds, latencies, image_count):
+    print(f"{name}: 전체 {seconds:6.2f}초, {image_count / seconds:5.2f} 장/초, "
+          f"세션 지연 중앙값 {statistics.median(latencies):.2f}초 / 최대 {max(latencies):.2f}초")
+
+
+def main():
+    session_count = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    per_session = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    filenames = sorted(f for f in os.listdir(folder_path) if f.lower().endswith((".png", ".jpg", ".jpeg")))
+    images = {}
+    for filename in filenames:
+        with Image.open(os.path.join(folder_path, filename)) as img:
+            img.draft("RGB", (768, 768))
+            images[filename] = img.convert("RGB")
+    sessions = [
+        [(filenames[(index * per_session + offset) % len(filenames)],
+          lambda f=filenames[(index * per_session + offset) % len(filenames)]: images[f]) for offset in range(per_session)]
+        for index in range(session_count)
+    ]
+    image_count = session_count * per_session
+
+    registry.get_backend()
+    print(f"모델 로드: {registry.describe()}")
+    print(f"동시 세션 {session_count}개 × 이미지 {per_session}장")
+
+    # 워밍업 (첫 호출의 지연 초기화 비용 제외)
+    caption_images(sessions[0][:1])
+
+    # 기존 방식: 세션마다 자기 이미지만 배치로 묶어 따로 추론 (CPU를 서로 나눠 씀)
+    seconds, latencies, independent = run_sessions(sessions, caption_images)
+    report("세션별 독립 추론   ", seconds, latencies, image_count)
+
+    service = CaptionService()
+    seconds, latencies, shared = run_sessions(sessions, service.caption)
+    report("공유 캡션 서비스   ", seconds, latencies, image_count)
+    print(f"서비스 지표: {service.describe()}")
+
+    same = sum(a.caption == b.caption for outputs_a, outputs_b in zip(independent, shared) for a, b in zip(outputs_a, outputs_b))
+    print(f"캡션 일치: {same}/{image_count}")
+
+
+if __name__ == "__main__":
+    main()
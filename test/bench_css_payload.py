@@ -0,0 +1,38 @@
+# test/bench_css_payload.py
+# 다시 실행(위젯 조작)마다 브라우저로 보내는 CSS 크기와 준비 시간 비교: 배경 이미지 base64 인라인 vs 정적 파일 URL
+# 사용: python test/bench_css_payload.py [배경 이미지 경로, 기본 data/example.jpg]
+import base64
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from app import BACKGROUND_IMAGE, build_custom_css  # noqa: E402
+
+DEFAULT_IMAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'example.jpg')
+
+
+def main():
+    image_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_IMAGE
+    reruns = 100
+
+    # 기존 방식: 다시 실행될 때마다 파일을 읽고 base64로 인코딩해 CSS에 포함
+    start = time.perf_counter()
+    for _ in range(reruns):
+        with open(image_path, 'rb') as image_file:
+            inline_css = build_custom_css(f"data:image/png;base64,{base64.b64encode(image_file.read()).decode()}")
+    inline_seconds = (time.perf_counter() - start) / reruns
+
+    # 변경 후: 프로세스마다 한 번 만든 CSS 문자열 재사용, 이미지는 정적 파일 URL로 참조
+    static_css = build_custom_css(f"app/static/{BACKGROUND_IMAGE}")
+
+    image_size = os.path.getsize(image_path)
+    print(f"배경 이미지: {os.path.basename(image_path)} ({image_size / 1e3:.0f}KB)")
+    print(f"base64 인라인: 다시 실행마다 CSS {len(inline_css.encode('utf-8')) / 1e3:8.1f}KB, 준비 {inline_seconds * 1000:.2f}ms")
+    print(f"정적 파일 URL: 다시 실행마다 CSS {len(static_css.encode('utf-8')) / 1e3:8.1f}KB, 준비 0ms "
+          f"(이미지 {image_size / 1e3:.0f}KB는 브라우저가 처음 한 번만 받음)")
+
+
+if __name__ == "__main__":
+    main()
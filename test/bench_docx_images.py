@@ -0,0 +1,68 @@
+# test/bench_docx_images.py
+# Word 파일에 원본 이미지를 넣을 때와 인쇄 크기로 줄여 넣을 때의 파일 크기/생성 시간 비교
+# data/test 이미지와 큰 사진(합성)을 각각 두 번씩 참조하는 게시글을 사용합니다.
+# 사용: python test/bench_docx_images.py [이미지 폴더, 기본 data/test]
+import os
+import sys
+import time
+from io import BytesIO
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from PIL import Image  # noqa: E402
+
+from image_preprocess import describe_docx_images, prepare_docx_images  # noqa: E402
+from md_render import render_docx  # noqa: E402
+
+DEFAULT_IMAGE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'test')
+
+
+def load_images(image_dir):
+    images = {}
+    for filename in sorted(os.listdir(image_dir)):
+        if filename.lower().endswith(('.png', '.jpg', '.jpeg')):
+            with open(os.path.join(image_dir, filename), 'rb') as file:
+                images[filename] = file.read()
+    # 휴대폰 사진 크기(4032x3024)의 JPEG
+    photo = Image.effect_noise((4032, 3024), 40).convert('RGB')
+    buffer = BytesIO()
+    photo.save(buffer, format='JPEG', quality=95)
+    images['photo.jpg'] = buffer.getvalue()
+    return images
+
+
+def make_post(image_names):
+    lines = ["# 이미지 테스트"]
+    for name in image_names:
+        lines.append(f"{{{name}}}")
+        lines.append(f"{name} 설명 문단입니다.")
+    # 같은 이미지를 한 번 더 참조
+    lines.extend(f"({name})" for name in image_names)
+    return '\n'.join(lines)
+
+
+def main():
+    image_dir = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_IMAGE_DIR
+    images = load_images(image_dir)
+    post = make_post(list(images))
+    print(f"이미지 {len(images)}개 (각 2회 참조), 원본 합계 {sum(map(len, images.values())) / 1e6:.1f}MB")
+
+    start = time.perf_counter()
+    original = render_docx(post, images).getvalue()
+    original_seconds = time.perf_counter() - start
+
+    stats = {}
+    start = time.perf_counter()
+    prepared = prepare_docx_images(images, stats=stats)
+    prepare_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    resized = render_docx(post, prepared).getvalue()
+    render_seconds = time.perf_counter() - start
+
+    print(f"원본 이미지:   docx {len(original) / 1e6:6.2f}MB, 생성 {original_seconds * 1000:6.0f}ms")
+    print(f"변환 이미지:   docx {len(resized) / 1e6:6.2f}MB, 생성 {render_seconds * 1000:6.0f}ms (+ 변환 {prepare_seconds * 1000:.0f}ms)")
+    print(f"  {describe_docx_images(stats)}")
+
+
+if __name__ == "__main__":
+    main()
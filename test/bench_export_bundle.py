@@ -0,0 +1,51 @@
+# test/bench_export_bundle.py
+# 언어별 Word 파일을 차례로 만들어 메모리에 모을 때와 ZIP 묶음(작업 풀 + 임시 파일)으로 만들 때의 시간/최대 메모리 비교
+# 사용: python test/bench_export_bundle.py [언어 수, 기본 6] [게시글 줄 수, 기본 400]
+import os
+import sys
+import time
+import tracemalloc
+from io import BytesIO
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TEST_DIR, '..', 'src'))
+sys.path.insert(0, TEST_DIR)
+
+from md_render import render_docx  # noqa: E402
+from bench_md_render import make_images, make_post  # noqa: E402
+from export_bundle import describe_bundle, write_bundle  # noqa: E402
+
+
+def measure(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, seconds, peak
+
+
+def main():
+    languages = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+    line_count = int(sys.argv[2]) if len(sys.argv) > 2 else 400
+    images = make_images()
+    posts = [(f"generated_post_{index}", make_post(line_count) + f"\n언어 {index}") for index in range(languages)]
+    render = lambda post: render_docx(post, images).getvalue()  # noqa: E731
+    print(f"게시글 {languages}개 × {line_count}줄")
+
+    def serial():
+        # 기존 방식: 언어별 다운로드 버튼마다 Word 파일을 차례로 만들어 모두 메모리에 유지
+        return [BytesIO(render(post)) for _, post in posts]
+
+    _, seconds, peak = measure(serial)
+    print(f"언어별 순차 생성: {seconds:.2f}초, 최대 메모리 {peak / 1e6:.1f}MB")
+
+    stats = {}
+    path, seconds, peak = measure(lambda: write_bundle(posts, render, stats=stats))
+    print(f"ZIP 묶음 생성:   {seconds:.2f}초, 최대 메모리 {peak / 1e6:.1f}MB ({describe_bundle(stats)})")
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
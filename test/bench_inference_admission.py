@@ -0,0 +1,79 @@
+# test/bench_inference_admission.py
+# 동시 캡션 요청 1/4/16개에서 추론 입장 제한이 없을 때와 있을 때(INFERENCE_CONCURRENCY)의 요청별 지연 p50/p95 비교
+# 사용: python test/bench_inference_admission.py [동시 요청 수 ...] (기본 1 4 16)
+#       INFERENCE_THREADS / INFERENCE_INTEROP_THREADS / INFERENCE_CONCURRENCY 환경 변수로 예산 변경
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from PIL import Image  # noqa: E402
+import inference_budget  # noqa: E402
+from captioning import caption_images, registry  # noqa: E402
+from inference_budget import (INFERENCE_CONCURRENCY, INFERENCE_INTEROP_THREADS, INFERENCE_THREADS,  # noqa: E402
+                              AdmissionController, percentile)
+
+folder_path = "./data/test/"
+ROUNDS = 3
+
+
+def run_concurrent(images, count):
+    # count개의 요청(이미지 한 장씩)을 동시에 시작해 요청별 지연 목록 반환
+    latencies = [None] * count
+    barrier = threading.Barrier(count)
+
+    def request(index):
+        filename, image = images[index % len(images)]
+        barrier.wait()
+        start = time.perf_counter()
+        caption_images([(filename, lambda: image)], batch_size=1)
+        latencies[index] = time.perf_counter() - start
+
+    threads = [threading.Thread(target=request, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies
+
+
+def measure(images, count, limit):
+    inference_budget.admission = AdmissionController(limit)
+    latencies = []
+    for _ in range(ROUNDS):
+        latencies.extend(run_concurrent(images, count))
+    latencies.sort()
+    return latencies, inference_budget.admission
+
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or [1, 4, 16]
+    filenames = sorted(f for f in os.listdir(folder_path) if f.lower().endswith((".png", ".jpg", ".jpeg")))
+    images = []
+    for filename in filenames:
+        with Image.open(os.path.join(folder_path, filename)) as img:
+            img.draft("RGB", (768, 768))
+            images.append((filename, img.convert("RGB")))
+
+    registry.get_backend()
+    import torch
+
+    print(f"모델 로드: {registry.describe()}")
+    print(f"CPU {os.cpu_count()}개, torch 스레드 {torch.get_num_threads()}개 (INFERENCE_THREADS={INFERENCE_THREADS}), "
+          f"inter-op {torch.get_num_interop_threads()}개 (INFERENCE_INTEROP_THREADS={INFERENCE_INTEROP_THREADS})")
+
+    # 워밍업 (첫 호출의 지연 초기화 비용 제외)
+    caption_images(images[:1], batch_size=1)
+
+    for count in counts:
+        for name, limit in (("제한 없음", count), (f"동시 {INFERENCE_CONCURRENCY}개", INFERENCE_CONCURRENCY)):
+            latencies, controller = measure(images, count, limit)
+            stats = controller.stats()
+            print(f"요청 {count:2d}개 × {ROUNDS}회, {name:7s}: p50 {percentile(latencies, 50):6.2f}초, "
+                  f"p95 {percentile(latencies, 95):6.2f}초 (입장 대기 p95 {stats['p95_wait_seconds']:.2f}초)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# test/bench_md_render.py
+# 수천 줄 게시글의 Word 변환 시간 비교: 기존 구현(test/md_legacy.py) vs 단일 패스 렌더러(src/md_render.py)
+# 토크나이저만의 시간(문서 생성 제외)과 render_docx 전체 시간을 함께 출력합니다.
+# 사용: python test/bench_md_render.py [줄 수, 기본 5000]
+import os
+import sys
+import time
+from io import BytesIO
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TEST_DIR, '..', 'src'))
+sys.path.insert(0, TEST_DIR)
+
+from PIL import Image  # noqa: E402
+
+import md_legacy  # noqa: E402
+from md_render import iter_post_events, render_docx  # noqa: E402
+
+# 생성된 게시글에 흔한 줄 형태 (이미지 태그는 일부 줄에만 있음)
+LINES = [
+    "## 소제목 {n}",
+    "맥북 M3는 M2보다 **멀티코어 성능**이 약 20% 향상되었고, *발열*도 줄었습니다. 자세한 내용은 [공식 문서](https://apple.com) 참고.",
+    "- 배터리: 최대 22시간 `영상 재생` 기준",
+    "1. 디스플레이 밝기 ~~500니트~~ 600니트",
+    "> 실사용에서는 체감 차이가 크지 않았습니다.",
+    "{{image{m}.png}}",
+    "사진처럼 (image{m}.png) 색감이 좋아졌습니다.",
+    "",
+    "---",
+    "일반 문단입니다. 특별한 서식 없이 긴 문장이 이어지는 경우가 가장 많습니다. " * 3,
+]
+
+
+def make_post(line_count):
+    lines = []
+    for i in range(line_count):
+        lines.append(LINES[i % len(LINES)].format(n=i, m=i % 4))
+    return '\n'.join(lines)
+
+
+def make_images():
+    images = {}
+    for i in range(4):
+        buffer = BytesIO()
+        Image.new('RGB', (64, 48), (i * 60, 100, 200)).save(buffer, format='PNG')
+        images[f'image{i}.png'] = buffer.getvalue()
+    return images
+
+
+class _NullParagraph:
+    # 기존 구현의 토크나이저 시간만 재기 위한 빈 문단 (런 추가를 무시)
+    def __init__(self):
+        self._element = []
+        self.style = None
+        self.alignment = None
+
+    def add_run(self, text=''):
+        return _NullRun()
+
+
+class _NullRun:
+    def __init__(self):
+        self.font = _NullFont()
+
+
+class _NullFont:
+    def __init__(self):
+        self.color = type('Color', (), {})()
+
+
+def legacy_tokenize(post):
+    # 기존 구현에서 문서 생성을 뺀 줄 단위 처리 (이미지 태그 검색/치환 + 블록/인라인 분류)
+    import re
+    for line in post.split('\n'):
+        for pattern in (r'\{(.+?\.(?:png|jpg|jpeg))\}', r'\((.+?\.(?:png|jpg|jpeg))\)',
+                        r'!\[.*?\]\((.+?\.(?:png|jpg|jpeg))\)', r'!\[(.*?)\]'):
+            for image_name in re.findall(pattern, line):
+                line = re.sub(r'\{' + re.escape(image_name) + r'\}', '', line)
+                line = re.sub(r'\(' + re.escape(image_name) + r'\)', '', line)
+        if line.strip() and not re.match(r'^(\*\*\*|---)$', line.strip()) and not line.startswith('```'):
+            md_legacy.apply_md_formatting(_NullParagraph(), line)
+
+
+def timed(func, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    line_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    post = make_post(line_count)
+    images = make_images()
+    print(f"게시글: {line_count}줄, {len(post)}자")
+
+    legacy = timed(lambda: legacy_tokenize(post))
+    current = timed(lambda: sum(1 for _ in iter_post_events(post, lambda name: "inserted")))
+    print(f"토크나이저  기존 {legacy * 1000:8.1f}ms / 단일 패스 {current * 1000:8.1f}ms ({legacy / current:.1f}배)")
+
+    legacy = timed(lambda: md_legacy.save_post_to_word(post, images), repeat=1)
+    current = timed(lambda: render_docx(post, images), repeat=1)
+    print(f"Word 변환   기존 {legacy * 1000:8.1f}ms / 단일 패스 {current * 1000:8.1f}ms ({legacy / current:.1f}배, 대부분 python-docx 문서 생성 시간)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+# 원본 해상도 디코딩(RGBA 변환)과 축소 디코딩 전처리의 이미지별 디코딩 크기/시간 비교
+# 실행: python test/bench_preprocess.py
+import os
+import sys
+from io import BytesIO
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from PIL import Image
+from image_preprocess import describe_stats, load_for_caption
+
+folder_path = "./data/test/"
+
+items = []
+for filename in sorted(os.listdir(folder_path)):
+    if filename.lower().endswith((".png", ".jpg", ".jpeg")):
+        with open(os.path.join(folder_path, filename), 'rb') as f:
+            items.append((filename, f.read()))
+
+# 휴대폰 사진 크기(12MP)의 JPEG 예시를 추가 (data/test 이미지의 확대본)
+with Image.open(os.path.join(folder_path, "hal1.jpg")) as img:
+    phone_photo = BytesIO()
+    img.convert('RGB').resize((4032, 3024)).save(phone_photo, "JPEG", quality=90)
+items.append(("phone_4032x3024.jpg", phone_photo.getvalue()))
+
+total_saved = 0.0
+total_full = total_decoded = 0
+for filename, image_bytes in items:
+    # 첫 호출의 캐시 효과를 줄이기 위해 세 번 측정해 최솟값 사용
+    runs = [load_for_caption(image_bytes, filename, measure_baseline=True)[1] for _ in range(3)]
+    stats = min(runs, key=lambda s: s.seconds)._replace(baseline_seconds=min(s.baseline_seconds for s in runs))
+    total_saved += stats.seconds_saved
+    total_full += stats.bytes_full
+    total_decoded += stats.bytes_decoded
+    print(describe_stats(stats))
+
+print(f"합계: 디코딩 {total_decoded / 1e6:.1f}MB (원본 {total_full / 1e6:.1f}MB), 절약 {total_saved * 1000:.0f}ms")
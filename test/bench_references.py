@@ -0,0 +1,55 @@
+# test/bench_references.py
+# 참고자료 정리(정규화 → BM25 정렬 → MinHash 중복 제거 → 토큰 예산) 전후의 참고자료 수/토큰 수와 처리 시간 비교
+# 사용: python test/bench_references.py [토큰 예산, 기본 REFERENCE_TOKEN_BUDGET]
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from references import REFERENCE_TOKEN_BUDGET, describe_references, process_references  # noqa: E402
+from retrieval import BlogItem, format_references  # noqa: E402
+
+QUESTION = "애플 맥북 m2과 m3의 성능비교에 대한 게시글 작성해줘."
+
+# 실제 검색 결과에서 흔한 형태: 같은 글의 재게시/요약, HTML 엔티티, 질문과 관련 없는 글
+SNIPPETS = [
+    ("맥북 M2 vs M3 성능 비교 후기", "M3 맥북 프로를 한 달 써보고 M2 에어와 &quot;긱벤치&quot; 점수, 발열, 배터리를 비교했습니다. 멀티코어 기준 약 20% 향상되었고..."),
+    ("[후기] 맥북 M2 vs M3 성능 비교", "M3 맥북 프로를 한 달 써 보고 M2 에어와 &quot;긱벤치&quot; 점수, 발열, 배터리를 비교했습니다. 멀티코어 기준 약 20% 향상되었고!"),
+    ("M3 칩 벤치마크 정리", "애플 M3 칩의 CPU/GPU 벤치마크를 M2, M1과 비교한 표입니다. 싱글코어 &amp; 멀티코어, Metal 점수를 정리했어요."),
+    ("M3 칩 벤치마크 정리 (스크랩)", "애플 M3 칩의 CPU/GPU 벤치마크를 M2, M1과 비교한 표 입니다. 싱글코어 &amp; 멀티코어, Metal 점수를 정리 했어요."),
+    ("제주도 3박 4일 여행 코스", "성산일출봉, 우도, 협재 해수욕장을 다녀온 가족 여행 후기입니다. 렌터카 팁과 맛집 목록도 함께."),
+    ("맥북 에어 M2 배터리 사용 시간", "M2 맥북 에어로 영상 편집과 문서 작업을 하며 배터리 사용 시간을 측정했습니다. M3와 비교하면..."),
+    ("<b>맥북</b> 구매 가이드 2024", "M2, M3, M3 Pro 중 어떤 맥북을 사야 할까? 용도별 추천과 가격 대비 성능을 비교합니다."),
+    ("강아지 산책 용품 추천", "하네스, 리드줄, 배변봉투 케이스 등 산책 필수템을 정리했습니다."),
+    ("M3 맥북 프로 발열 테스트", "시네벤치를 30분 돌리며 M3 맥북 프로와 M2 맥북 프로의 발열과 팬 소음을 비교했습니다."),
+    ("맥북 M2 M3 차이점", "디스플레이, 칩 성능, 가격, 무게까지 M2와 M3 맥북의 차이점을 한눈에 정리했습니다."),
+]
+
+
+def make_items(copies=3):
+    # 검색어/페이지가 달라 링크는 다르지만 내용은 같은 항목을 포함
+    items = []
+    for copy in range(copies):
+        for i, (title, description) in enumerate(SNIPPETS):
+            items.append(BlogItem(title, f"https://blog.naver.com/user{copy}/{i}", description + (" 더 보기" * copy), "20240101"))
+    return items
+
+
+def main():
+    budget = int(sys.argv[1]) if len(sys.argv) > 1 else REFERENCE_TOKEN_BUDGET
+    items = make_items()
+    stats = {}
+    start = time.perf_counter()
+    selected = process_references(items, QUESTION, token_budget=budget, stats=stats)
+    elapsed = time.perf_counter() - start
+
+    print(f"정리 전: {len(items)}개, {len(format_references(items))}자")
+    print(f"정리 후: {len(selected)}개, {len(format_references(selected))}자 ({elapsed * 1000:.1f}ms)")
+    print(f"  {describe_references(stats)}")
+    for item in selected:
+        print(f"  - {item.title}: {item.description[:40]}...")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+# test/bench_retrieval.py
+# 스텁 서버(응답 지연 지정)로 기존 단일 검색(display=10) 대비 여러 키워드 × 여러 페이지 동시 검색의 소요 시간/참고자료 수 비교
+# 사용: python test/bench_retrieval.py [응답 지연(초), 기본 0.15]
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from naver_client import NaverSearchClient  # noqa: E402
+from naver_stub_server import start_stub_server  # noqa: E402
+from retrieval import BlogItem, describe_retrieval, retrieve_references, split_keywords  # noqa: E402
+
+
+def main():
+    delay = float(sys.argv[1]) if len(sys.argv) > 1 else 0.15
+    server, _, base_url = start_stub_server(delay=delay)
+    client = NaverSearchClient("id", "secret", base_url)
+    keyword = "애플 맥북 M2 칩 성능"
+
+    start = time.perf_counter()
+    single = [BlogItem.from_api(item) for item in client.search_blog(keyword, display=10)["items"]]
+    single_seconds = time.perf_counter() - start
+
+    stats = {}
+    start = time.perf_counter()
+    multi = retrieve_references(client, split_keywords(keyword), stats=stats)
+    multi_seconds = time.perf_counter() - start
+
+    print(f"응답 지연 {delay * 1000:.0f}ms 기준")
+    print(f"  단일 검색:      참고자료 {len(single):3d}개, {single_seconds * 1000:6.0f}ms")
+    print(f"  동시 검색:      참고자료 {len(multi):3d}개, {multi_seconds * 1000:6.0f}ms ({describe_retrieval(stats)})")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
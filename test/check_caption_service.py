@@ -0,0 +1,74 @@
+# test/check_caption_service.py
+# 공유 캡션 서비스의 배치 처리/예상하지 못한 오류 뒤 작업 스레드 유지/결과 대기 시간 초과 확인 (모델 없이 가짜 추론 사용)
+# 사용: python test/check_caption_service.py
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import caption_service  # noqa: E402
+from caption_service import CaptionService  # noqa: E402
+from checks import check, finish  # noqa: E402
+
+
+class FakeRegistry:
+    def get_backend(self, backend=None, model_id=None):
+        return None, None
+
+
+release = threading.Event()
+
+
+def fake_generate(processor, backend, images, max_new_tokens):
+    # "slow" 이미지는 release가 설정될 때까지 추론이 끝나지 않음
+    if "slow" in images:
+        release.wait()
+    return [f"caption of {image}" for image in images]
+
+
+def items(*names):
+    return [(name, lambda name=name: name) for name in names]
+
+
+def main():
+    caption_service.registry = FakeRegistry()
+    caption_service._generate_captions = fake_generate
+    results = []
+
+    service = CaptionService(window=0.01, timeout=5)
+    output = service.caption(items("a.png", "b.png"))
+    results.append(check("입력 순서대로 캡션", [r.caption for r in output] == ["caption of a.png", "caption of b.png"]))
+
+    # _process 밖에서 난 예외: 이번 배치만 실패하고 작업 스레드는 계속 동작
+    process = service._process
+    calls = []
+
+    def broken_process(batch):
+        calls.append(len(batch))
+        if len(calls) == 1:
+            raise RuntimeError("metrics failed")
+        process(batch)
+
+    service._process = broken_process
+    failed = service.caption(items("c.png"))
+    results.append(check("예상하지 못한 오류는 배치의 요청을 실패로 처리", failed[0].caption is None and failed[0].error == "metrics failed"))
+    recovered = service.caption(items("d.png"))
+    results.append(check("오류 뒤에도 작업 스레드가 다음 요청을 처리",
+                         recovered[0].caption == "caption of d.png" and service._thread.is_alive()))
+    service._process = process
+
+    # 결과를 timeout초 넘게 기다리지 않음
+    slow = CaptionService(window=0.01, timeout=0.3)
+    timed_out = slow.caption(items("slow"))
+    results.append(check("대기 시간을 넘으면 오류 결과 반환", timed_out[0].caption is None and "시간 초과" in timed_out[0].error,
+                         timed_out[0].error))
+    release.set()
+    results.append(check("시간 초과 뒤에도 다음 요청 처리", slow.caption(items("e.png"))[0].caption == "caption of e.png"))
+
+    finish(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# test/check_disk_cache.py
+# SQLite 디스크 캐시의 LRU 삭제(항목 수/크기 상한), TTL 만료, 적중 통계, 다른 인스턴스와의 파일 공유 확인
+# 사용: python test/check_disk_cache.py
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from checks import check, finish  # noqa: E402
+from disk_cache import DiskCache  # noqa: E402
+
+
+def main():
+    directory = tempfile.mkdtemp(prefix="disk_cache_")
+    results = []
+
+    cache = DiskCache(os.path.join(directory, "lru.sqlite"), max_entries=3)
+    for key in ("a", "b", "c"):
+        cache.set(key, {"value": key})
+        time.sleep(0.01)
+    cache.get("a")  # a를 최근 사용으로 갱신
+    time.sleep(0.01)
+    cache.set("d", {"value": "d"})
+    results.append(check("항목 수 상한: 가장 오래 사용하지 않은 항목 삭제",
+                         len(cache) == 3 and cache.get("b") is None and cache.get("a") == {"value": "a"}))
+    results.append(check("JSON 값 그대로 복원", cache.get("d") == {"value": "d"}))
+
+    cache.set("a", {"value": "A"})
+    results.append(check("같은 키는 덮어씀", cache.get("a") == {"value": "A"} and len(cache) == 3))
+    cache.delete("a")
+    results.append(check("delete", cache.get("a") is None and cache.get("a", "없음") == "없음"))
+
+    sized = DiskCache(os.path.join(directory, "size.sqlite"), max_bytes=100)
+    for index in range(5):
+        sized.set(f"k{index}", "x" * 30)
+        time.sleep(0.01)
+    results.append(check("크기 상한: 오래된 항목부터 삭제",
+                         len(sized) == 3 and sized.get("k0") is None and sized.get("k4") == "x" * 30))
+
+    expiring = DiskCache(os.path.join(directory, "ttl.sqlite"), ttl=0.2)
+    expiring.set("old", 1)
+    results.append(check("TTL 안에서는 적중", expiring.get("old") == 1))
+    time.sleep(0.3)
+    results.append(check("TTL이 지나면 없는 것으로 처리", expiring.get("old") is None))
+    expiring.set("new", 2)
+    results.append(check("저장할 때 만료된 항목 삭제", len(expiring) == 1))
+
+    stats = expiring.stats()
+    results.append(check("적중/미적중 통계", stats["hits"] == 1 and stats["misses"] == 1 and stats["hit_ratio"] == 0.5, f"({stats})"))
+
+    # 다른 인스턴스(다른 프로세스와 같은 상황)와 다른 스레드에서 같은 파일 사용
+    other = DiskCache(os.path.join(directory, "lru.sqlite"), max_entries=3)
+    results.append(check("다른 인스턴스와 파일 공유", other.get("d") == {"value": "d"}))
+    seen = []
+    reader = threading.Thread(target=lambda: seen.append(cache.get("d")))
+    reader.start()
+    reader.join()
+    results.append(check("다른 스레드에서 조회", seen == [{"value": "d"}]))
+
+    finish(results)
+
+
+if __name__ == "__main__":
+    main()
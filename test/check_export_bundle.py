@@ -0,0 +1,75 @@
+# test/check_export_bundle.py
+# ZIP 묶음 확인: 항목 이름/압축 방식, 동시에 만드는 Word 파일 수 상한, 렌더링 실패 시 임시 파일 삭제, 캐시 키, 오래된 ZIP 정리
+# 사용: python test/check_export_bundle.py
+import os
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from checks import check, finish  # noqa: E402
+from export_bundle import bundle_key, remove_old_bundles, write_bundle  # noqa: E402
+
+
+def main():
+    directory = tempfile.mkdtemp(prefix="export_bundle_")
+    results = []
+    posts = [(f"generated_post_{index}", f"# 게시글 {index}\n본문") for index in range(6)]
+
+    lock = threading.Lock()
+    in_flight = [0, 0]  # 현재, 최대
+
+    def render(post):
+        with lock:
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight[1], in_flight[0])
+        time.sleep(0.02)
+        with lock:
+            in_flight[0] -= 1
+        return f"docx:{post}".encode('utf-8')
+
+    stats = {}
+    path = write_bundle(posts, render, directory=directory, max_workers=2, stats=stats)
+    with zipfile.ZipFile(path) as archive:
+        infos = {info.filename: info for info in archive.infolist()}
+        names_ok = sorted(infos) == sorted([f"{name}.md" for name, _ in posts] + [f"{name}.docx" for name, _ in posts])
+        contents_ok = all(archive.read(f"{name}.md").decode('utf-8') == post
+                          and archive.read(f"{name}.docx") == f"docx:{post}".encode('utf-8') for name, post in posts)
+    results.append(check("게시글마다 .md와 .docx 항목", names_ok and contents_ok))
+    results.append(check("docx는 다시 압축하지 않음, md는 압축",
+                         all(info.compress_type == (zipfile.ZIP_STORED if name.endswith('.docx') else zipfile.ZIP_DEFLATED)
+                             for name, info in infos.items())))
+    results.append(check("동시에 만드는 Word 파일은 max_workers개 이하", in_flight[1] <= 2, f"(최대 {in_flight[1]}개)"))
+    results.append(check("통계", stats["posts"] == 6 and stats["bytes"] == os.path.getsize(path)))
+
+    def failing(post):
+        raise ValueError("렌더링 실패")
+
+    before = set(os.listdir(directory))
+    try:
+        write_bundle(posts, failing, directory=directory)
+        results.append(check("렌더링 실패는 예외로 전달", False))
+    except ValueError:
+        results.append(check("렌더링 실패는 예외로 전달", True))
+    results.append(check("실패하면 만들던 ZIP 파일 삭제", set(os.listdir(directory)) == before))
+
+    key = bundle_key([("a", "k1"), ("b", "k2")])
+    results.append(check("캐시 키: 같은 입력은 같은 키", key == bundle_key([("a", "k1"), ("b", "k2")])))
+    results.append(check("캐시 키: 내용이나 순서가 바뀌면 다른 키",
+                         key != bundle_key([("a", "k1"), ("b", "k3")]) and key != bundle_key([("b", "k2"), ("a", "k1")])))
+
+    old = os.path.join(directory, "old.zip")
+    open(old, 'wb').close()
+    os.utime(old, (time.time() - 1000, time.time() - 1000))
+    remove_old_bundles(directory, max_age=500)
+    results.append(check("오래된 ZIP만 정리", not os.path.exists(old) and os.path.exists(path)))
+
+    finish(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# test/check_image_store.py
+# 세션 이미지 저장소의 메모리 상한/디스크 저장(mmap)/중복 제거/세션 종료 시 사용량 반환/빈 이미지와 파일 삭제 경합 처리 확인
+# 사용: python test/check_image_store.py
+import gc
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import image_store  # noqa: E402
+from checks import check, finish  # noqa: E402
+from image_store import SessionImageStore, describe_memory_report, memory_report  # noqa: E402
+
+
+def main():
+    directory = tempfile.mkdtemp(prefix="image_store_")
+    blob = lambda size, fill: bytes([fill]) * size  # noqa: E731
+    results = []
+
+    store = SessionImageStore(session_limit=1000, global_limit=1500, directory=directory)
+    store.put("a.png", blob(600, 1))
+    store.put("b.png", blob(600, 2))   # 세션 상한 초과 → 디스크
+    store.put("c.png", blob(600, 1))   # a.png와 같은 내용
+    stats = store.stats()
+    results.append(check("세션 상한을 넘는 이미지는 디스크에 저장", stats["memory_bytes"] == 600 and stats["spilled_bytes"] == 600))
+    results.append(check("같은 내용은 한 번만 저장", stats["images"] == 3 and stats["distinct"] == 2))
+    results.append(check("디스크 이미지도 bytes처럼 읽힘", store["b.png"][:] == blob(600, 2) and len(store["b.png"]) == 600))
+    results.append(check("파일 이름은 내용 해시", os.path.exists(os.path.join(directory, store.digests()["b.png"][:2], store.digests()["b.png"]))))
+    results.append(check("사전처럼 사용", sorted(store) == ["a.png", "b.png", "c.png"] and store.get("x.png") is None))
+
+    other = SessionImageStore(session_limit=1000, global_limit=1500, directory=directory)
+    other.put("d.png", blob(600, 3))
+    other.put("e.png", blob(600, 4))   # 프로세스 전체 상한 초과 → 디스크
+    results.append(check("프로세스 전체 상한을 넘는 이미지는 디스크에 저장",
+                         image_store._global_memory_bytes == 1200 and other.stats()["spilled_bytes"] == 600))
+
+    report = memory_report()
+    print(f"     {describe_memory_report(report)}")
+    results.append(check("관리자 보고서에 모든 세션 포함", report["sessions"] >= 2 and report["memory_bytes"] == 1200))
+
+    del store
+    gc.collect()
+    results.append(check("세션이 사라지면 메모리 사용량 반환", image_store._global_memory_bytes == 600))
+    other.replace({"f.png": blob(100, 5)})
+    results.append(check("replace는 이전 이미지를 비움", list(other) == ["f.png"] and image_store._global_memory_bytes == 100))
+
+    # 프로세스 전체 사용량(100)이 이 세션의 상한(50)을 이미 넘어도 빈 이미지는 메모리에 둠 (빈 파일은 mmap할 수 없음)
+    small = SessionImageStore(session_limit=50, global_limit=50, directory=directory)
+    small.put("empty.png", b"")
+    results.append(check("빈 이미지는 메모리에 저장", small["empty.png"] == b"" and small.stats()["spilled_bytes"] == 0))
+
+    # 같은 내용의 파일을 재사용하는 사이(utime 직후) 다른 세션이 파일을 삭제하면 다시 기록
+    racing = SessionImageStore(session_limit=0, global_limit=0, directory=directory)
+    shared = blob(700, 6)
+    racing.put("g.png", shared)
+    store_path = os.path.join(directory, racing.digests()["g.png"][:2], racing.digests()["g.png"])
+    utime = os.utime
+
+    def utime_then_remove(path, *args, **kwargs):
+        utime(path, *args, **kwargs)
+        os.remove(path)
+
+    os.utime = utime_then_remove
+    try:
+        again = SessionImageStore(session_limit=0, global_limit=0, directory=directory)
+        again.put("h.png", shared)
+    finally:
+        os.utime = utime
+    results.append(check("재사용하려던 파일이 삭제되면 다시 기록", again["h.png"][:] == shared and os.path.exists(store_path)))
+
+    finish(results)
+
+
+if __name__ == "__main__":
+    main()
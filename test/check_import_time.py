@@ -0,0 +1,56 @@
+# 앱(src/app.py)과 CLI(src/main.py) 모듈의 import 시간 보고 및 회귀 검사
+# 페이지/사이드바를 그리는 단계에서 ML 스택(torch, transformers)과 docx/openai가 로드되지 않아야 합니다.
+# 실행: python test/check_import_time.py [최대 허용 초 (기본 2.0)]
+import json
+import os
+import subprocess
+import sys
+
+src_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+max_seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 2.0
+
+# import 시점에 로드되면 안 되는 무거운 패키지
+deferred_packages = ["torch", "transformers", "docx", "openai"]
+
+probe = """
+import json, sys, time
+sys.path.insert(0, {src_path!r})
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds, "loaded": [m for m in {deferred!r} if m in sys.modules]}}))
+"""
+
+failed = False
+for module in ["main", "app"]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe.format(src_path=src_path, module=module, deferred=deferred_packages)],
+        capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        print(f"[{module}] import 실패\n{result.stderr[-2000:]}")
+        failed = True
+        continue
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+
+    # -X importtime 출력에서 누적 시간이 긴 최상위 패키지 상위 5개
+    top_level = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = [part.strip() for part in line[len("import time:"):].split("|")]
+        if cumulative.isdigit() and not name.startswith(" ") and "." not in name:
+            top_level.append((int(cumulative), name))
+    top_level.sort(reverse=True)
+
+    print(f"[{module}] import {report['seconds']:.2f}초")
+    for cumulative, name in top_level[:5]:
+        print(f"  {name:<24} {cumulative / 1e6:.2f}초")
+    if report["loaded"]:
+        print(f"  실패: import 시점에 로드된 패키지 {', '.join(report['loaded'])}")
+        failed = True
+    if report["seconds"] > max_seconds:
+        print(f"  실패: 허용 시간 {max_seconds:.1f}초 초과")
+        failed = True
+
+sys.exit(1 if failed else 0)
@@ -0,0 +1,130 @@
+# test/check_jobs.py
+# 백그라운드 작업 풀/작업 테이블 확인: 진행 메시지와 부분 결과 조회, 결과/실패 기록, 종료된 프로세스가 남긴 작업 처리, 첨부 정리
+# 사용: python test/check_jobs.py
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from checks import check, finish  # noqa: E402
+from jobs import DONE, FAILED, FINISHED, QUEUED, RUNNING, JobQueue  # noqa: E402
+
+
+def wait(queue, job_id, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = queue.get(job_id)
+        if job['status'] in FINISHED:
+            return job
+        time.sleep(0.02)
+    return queue.get(job_id)
+
+
+def main():
+    path = os.path.join(tempfile.mkdtemp(prefix="jobs_"), "jobs.sqlite")
+    queue = JobQueue(path, max_workers=2)
+    results = []
+    release = threading.Event()
+
+    def sample_job(job, text):
+        job.stage("처리 중...")
+        job.progress("1단계 완료")
+        job.partial(text[:3], force=True)
+        job.part("English", "Hello")
+        job.attach("images", {"a.png": b"\x89PNG"})
+        release.wait(5)
+        job.progress("2단계 완료")
+        return {"post": text}
+
+    def failing_job(job):
+        job.progress("시작")
+        raise ValueError("잘못된 입력")
+
+    job_id = queue.submit(sample_job, "안녕하세요")
+    time.sleep(0.2)
+    running = queue.get(job_id)
+    results.append(check("실행 중인 작업의 단계/진행 메시지/부분 결과 조회",
+                         running['status'] == RUNNING and running['stage'] == "처리 중..."
+                         and running['progress'] == ["1단계 완료"] and running['partial'] == "안녕하"))
+    results.append(check("이름별 중간 결과는 끝나는 대로 조회", running['parts'] == {"English": "Hello"}))
+
+    # 다른 스레드(다른 세션의 스크립트 실행)에서도 같은 작업을 읽을 수 있음
+    seen = {}
+    reader = threading.Thread(target=lambda: seen.update(queue.get(job_id)))
+    reader.start()
+    reader.join()
+    results.append(check("다른 스레드에서 조회", seen.get('status') == RUNNING))
+
+    release.set()
+    job = wait(queue, job_id)
+    results.append(check("끝난 작업의 결과와 전체 진행 메시지",
+                         job['status'] == DONE and job['result'] == {"post": "안녕하세요"} and job['progress'] == ["1단계 완료", "2단계 완료"]))
+    results.append(check("첨부는 메모리에서 전달", queue.attachments(job_id) == {"images": {"a.png": b"\x89PNG"}}))
+    results.append(check("첨부를 꺼내면 작업 풀에서 삭제",
+                         queue.pop_attachments(job_id) == {"images": {"a.png": b"\x89PNG"}} and queue.attachments(job_id) == {}))
+
+    failed = wait(queue, queue.submit(failing_job))
+    results.append(check("예외는 실패로 기록", failed['status'] == FAILED and "잘못된 입력" in failed['error'] and failed['progress'] == ["시작"]))
+    results.append(check("없는 작업 ID는 None", queue.get("missing") is None))
+
+    # 같은 파일을 여는 다른 작업 풀(다른 세션/프로세스)이 생겨도, 실행 중인 프로세스의 작업은 그대로 둠
+    release.clear()
+    running_id = queue.submit(sample_job, "계속 실행될 작업")
+    time.sleep(0.2)
+    restarted = JobQueue(path, max_workers=1)
+    results.append(check("다른 작업 풀이 열려도 실행 중인 작업은 유지", restarted.get(running_id)['status'] == RUNNING))
+    results.append(check("다른 작업 풀에서도 끝난 작업 결과 조회", restarted.get(job_id)['result'] == {"post": "안녕하세요"}))
+    release.set()
+    results.append(check("유지된 작업은 정상 종료", wait(restarted, running_id)['status'] == DONE))
+
+    # 종료된 프로세스(같은 호스트)나 생존 신호가 끊긴 프로세스가 남긴 작업만 실패로 표시
+    exited = subprocess.Popen([sys.executable, "-c", "pass"])
+    exited.wait()
+    now = time.time()
+    conn = queue._connect()
+    for orphan_id, owner, heartbeat_at in (
+        ("dead", f"{socket.gethostname()}:{exited.pid}", now),
+        ("stale", "other-host:1", now - 3600),
+        ("alive", "other-host:1", now),
+    ):
+        conn.execute("INSERT INTO jobs (id, status, created_at, updated_at, owner, heartbeat_at) VALUES (?, ?, ?, ?, ?, ?)",
+                     (orphan_id, QUEUED, now, now, owner, heartbeat_at))
+    reaper = JobQueue(path, max_workers=1)
+    results.append(check("종료된 프로세스의 작업은 실패로 표시", reaper.get("dead")['status'] == FAILED))
+    results.append(check("생존 신호가 끊긴 작업은 실패로 표시", reaper.get("stale")['status'] == FAILED))
+    results.append(check("생존 신호가 있는 다른 호스트의 작업은 유지", reaper.get("alive")['status'] == QUEUED))
+
+    # 생존 신호는 주기적으로 기록되고, 끝난 작업의 첨부는 attachment_max_age초 뒤 정리
+    fast = JobQueue(path, max_workers=1, heartbeat_interval=0.05, attachment_max_age=0.3)
+    release.clear()
+    beating_id = fast.submit(sample_job, "생존 신호")
+    time.sleep(0.1)
+    first_beat = conn.execute("SELECT heartbeat_at FROM jobs WHERE id = ?", (beating_id,)).fetchone()[0]
+    time.sleep(0.2)
+    results.append(check("실행 중인 작업에 생존 신호 기록",
+                         conn.execute("SELECT heartbeat_at FROM jobs WHERE id = ?", (beating_id,)).fetchone()[0] > first_beat))
+    release.set()
+    wait(fast, beating_id)
+    results.append(check("끝난 작업의 첨부는 다시 접속한 세션을 위해 남김", "images" in fast.attachments(beating_id)))
+    time.sleep(0.5)
+    results.append(check("오래된 첨부는 정리", fast.attachments(beating_id) == {}))
+
+    # 대체된 작업은 실행 중이어도 첨부를 버리고, 이후에 남기는 첨부도 무시
+    release.clear()
+    replaced_id = fast.submit(sample_job, "대체될 작업")
+    fast.discard_attachments(replaced_id)
+    release.set()
+    wait(fast, replaced_id)
+    results.append(check("대체된 작업의 첨부는 남기지 않음", fast.attachments(replaced_id) == {}))
+
+    finish(results)
+
+
+if __name__ == "__main__":
+    main()
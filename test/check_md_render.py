@@ -0,0 +1,79 @@
+# test/check_md_render.py
+# 단일 패스 렌더러로 만든 Word 문서가 기존 구현(test/md_legacy.py)과 같은지 확인
+# 비교 대상: data/training_data.jsonl의 게시글 + 서식/이미지 태그 조합 예제 (문서 본문 XML 비교)
+# 사용: python test/check_md_render.py
+import json
+import os
+import sys
+from io import BytesIO
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TEST_DIR, '..', 'src'))
+sys.path.insert(0, TEST_DIR)
+
+from docx import Document  # noqa: E402
+from PIL import Image  # noqa: E402
+
+import md_legacy  # noqa: E402
+from md_render import render_docx  # noqa: E402
+
+TRAINING_DATA = os.path.join(TEST_DIR, '..', 'data', 'training_data.jsonl')
+
+
+def make_png(color):
+    buffer = BytesIO()
+    Image.new('RGB', (8, 8), color).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+IMAGES = {
+    'cat.png': make_png('red'),
+    'dog.jpg': make_png('blue'),
+    'photo.png': make_png('green'),
+    'broken.png': b'not an image',
+}
+
+SAMPLES = [
+    "# 제목\n## 소제목\n###### 작은 제목\n#붙은 헤딩",
+    "- 항목 **굵게**\n* 항목 *기울임*\n+ 항목 ~~취소~~\n1. 첫째 `코드`\n10. 열째\n> 인용 ***굵은 기울임***",
+    "---\n***\n  ---  \n```python\n```",
+    "본문 [링크](https://example.com) 와 ![설명](https://example.com/a) 그리고 ![대체]",
+    "{cat.png}\n사진 설명 {dog.jpg} 입니다.\n(photo.png)\n![alt](cat.png)\n![photo]\n![cat]",
+    "없는 이미지 {missing.png} 와 (missing.jpg) 그리고 ![nothing]",
+    "깨진 이미지 {broken.png} 다음 줄\n(broken.png) 과 broken.png 언급",
+    "한 줄에 여러 개 {cat.png} {cat.png} (dog.jpg) 텍스트",
+    "# 헤딩 안의 {cat.png} 이미지\n- 목록 안의 (missing.png)",
+    "**닫히지 않은 굵게\n*\n**\n`\n***a***b",
+    "",
+    "\n\n\n",
+]
+
+
+def load_corpus():
+    posts = list(SAMPLES)
+    with open(TRAINING_DATA, 'r', encoding='utf-8') as file:
+        for line in file:
+            if line.strip():
+                posts.append(json.loads(line)['completion'])
+    return posts
+
+
+def body_xml(docx_bytes):
+    return Document(docx_bytes).element.body.xml
+
+
+def main():
+    posts = load_corpus()
+    mismatches = 0
+    for index, post in enumerate(posts):
+        legacy = body_xml(md_legacy.save_post_to_word(post, IMAGES))
+        current = body_xml(render_docx(post, IMAGES))
+        if legacy != current:
+            mismatches += 1
+            print(f"불일치 #{index}: {post[:60]!r}")
+    print(f"게시글 {len(posts)}개 중 {len(posts) - mismatches}개 일치")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
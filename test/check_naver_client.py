@@ -0,0 +1,162 @@
+# test/check_naver_client.py
+# 로컬 스텁 서버로 네이버 검색 클라이언트의 연결 재사용, 재시도, 타임아웃, 결과 캐시 동작을 확인
+# 사용: python test/check_naver_client.py
+import os
+import sys
+import tempfile
+import time
+import urllib.parse
+import urllib.request
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from checks import check, finish  # noqa: E402
+from disk_cache import DiskCache  # noqa: E402
+from naver_client import NaverSearchClient, NaverSearchError  # noqa: E402
+from naver_stub_server import start_stub_server  # noqa: E402
+
+
+def urllib_search(base_url, keyword):
+    # 기존 방식: 요청마다 새 연결
+    request = urllib.request.Request(f"{base_url}/v1/search/blog?query={urllib.parse.quote(keyword)}&display=10&start=1&sort=sim")
+    request.add_header("X-Naver-Client-Id", "id")
+    request.add_header("X-Naver-Client-Secret", "secret")
+    return urllib.request.urlopen(request, timeout=10).read()
+
+
+def main():
+    results = []
+    requests_count = 50
+
+    # 1. keep-alive: 여러 번 요청해도 연결은 하나만 생성
+    server, state, base_url = start_stub_server()
+    client = NaverSearchClient("id", "secret", base_url)
+    start = time.perf_counter()
+    for i in range(requests_count):
+        result = client.search_blog(f"맥북 {i}", display=10)
+    pooled = time.perf_counter() - start
+    results.append(check("응답 형태", len(result["items"]) == 10 and "postdate" in result["items"][0]))
+    results.append(check("연결 재사용", client.metrics.connections_opened == 1,
+                         f"(요청 {requests_count}회, 새 연결 {client.metrics.connections_opened}개, 서버에서 본 포트 {len({p for _, _, p in state.requests})}개)"))
+    start = time.perf_counter()
+    for i in range(requests_count):
+        urllib_search(base_url, f"맥북 {i}")
+    fresh = time.perf_counter() - start
+    print(f"    요청 {requests_count}회: 연결 풀 {pooled * 1000:.0f}ms / 요청마다 새 연결(urllib) {fresh * 1000:.0f}ms")
+    print(f"    {client.metrics.describe()}")
+
+    # 서버가 keep-alive 연결을 끊어도 새 연결로 바로 다시 보냄
+    server.shutdown()
+    server.server_close()
+    server, state, base_url2 = start_stub_server(int(base_url.rsplit(":", 1)[1]))
+    try:
+        client.search_blog("재연결")
+        results.append(check("끊어진 연결 복구", True, f"(새 연결 {client.metrics.connections_opened}개)"))
+    except NaverSearchError as e:
+        results.append(check("끊어진 연결 복구", False, str(e)))
+    server.shutdown()
+
+    # 2. 429/503 재시도 후 성공
+    server, state, base_url = start_stub_server(fail_first=2, fail_status=429, retry_after=0)
+    client = NaverSearchClient("id", "secret", base_url, backoff=0.01)
+    result = client.search_blog("재시도")
+    results.append(check("429 재시도 후 성공", len(state.requests) == 3 and client.metrics.retries == 2,
+                         f"(요청 {len(state.requests)}회, 재시도 {client.metrics.retries}회)"))
+    server.shutdown()
+
+    server, state, base_url = start_stub_server(fail_first=10, fail_status=503)
+    client = NaverSearchClient("id", "secret", base_url, max_retries=2, backoff=0.01)
+    try:
+        client.search_blog("실패")
+        results.append(check("재시도 한도", False))
+    except NaverSearchError as e:
+        results.append(check("재시도 한도", e.status == 503 and len(state.requests) == 3, f"(요청 {len(state.requests)}회)"))
+    server.shutdown()
+
+    # JSON이 아닌 200 응답 (프록시/점검 안내 HTML): 재시도하고, 계속되면 NaverSearchError
+    server, state, base_url = start_stub_server(fail_first=1, fail_status=200, fail_html=True)
+    client = NaverSearchClient("id", "secret", base_url, backoff=0.01)
+    result = client.search_blog("점검 후 복구")
+    results.append(check("HTML 응답 재시도 후 성공", len(state.requests) == 2 and len(result["items"]) == 10,
+                         f"(요청 {len(state.requests)}회)"))
+    server.shutdown()
+
+    server, state, base_url = start_stub_server(fail_first=10, fail_status=200, fail_html=True)
+    client = NaverSearchClient("id", "secret", base_url, max_retries=1, backoff=0.01)
+    try:
+        client.search_blog("점검 중")
+        results.append(check("HTML 응답은 NaverSearchError", False))
+    except NaverSearchError as e:
+        results.append(check("HTML 응답은 NaverSearchError", e.status == 200 and len(state.requests) == 2, f"({e})"))
+    server.shutdown()
+
+    # 3. 재시도하지 않는 오류 (401)
+    server, state, base_url = start_stub_server()
+    client = NaverSearchClient("", "", base_url, backoff=0.01)
+    try:
+        client.search_blog("인증")
+        results.append(check("401은 재시도하지 않음", False))
+    except NaverSearchError as e:
+        results.append(check("401은 재시도하지 않음", e.status == 401 and len(state.requests) == 1))
+    server.shutdown()
+
+    # 4. 읽기 타임아웃: 느린 서버에서 무한 대기하지 않음
+    server, state, base_url = start_stub_server(delay=1.0)
+    client = NaverSearchClient("id", "secret", base_url, read_timeout=0.2, max_retries=1, backoff=0.01)
+    start = time.perf_counter()
+    try:
+        client.search_blog("느림")
+        results.append(check("읽기 타임아웃", False))
+    except NaverSearchError:
+        elapsed = time.perf_counter() - start
+        results.append(check("읽기 타임아웃", elapsed < 1.0, f"({elapsed:.2f}초 후 실패)"))
+    server.shutdown()
+
+    # 5. 연결 타임아웃/거부: 닫힌 포트
+    client = NaverSearchClient("id", "secret", "http://127.0.0.1:9", connect_timeout=0.5, max_retries=0)
+    try:
+        client.search_blog("연결 실패")
+        results.append(check("연결 실패", False))
+    except NaverSearchError:
+        results.append(check("연결 실패", True))
+
+    # 6. 검색 결과 캐시: 적중 시 API 호출 없음, TTL이 지나면 기존 결과를 바로 반환하고 백그라운드에서 갱신
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = os.path.join(tmp, "naver_search.sqlite")
+        server, state, base_url = start_stub_server(delay=0.2)
+        client = NaverSearchClient("id", "secret", base_url, cache=DiskCache(cache_path, ttl=60), cache_ttl=0.5)
+        first = client.search_blog("캐시")
+        start = time.perf_counter()
+        second = client.search_blog("캐시")
+        hit_seconds = time.perf_counter() - start
+        results.append(check("캐시 적중", first == second and len(state.requests) == 1, f"({hit_seconds * 1000:.1f}ms, API 요청 {len(state.requests)}회)"))
+        client.search_blog("캐시", start=11)
+        results.append(check("페이지별 캐시 키", len(state.requests) == 2))
+
+        # 다른 프로세스/재시작 후에도 같은 파일의 결과를 사용
+        other = NaverSearchClient("id", "secret", base_url, cache=DiskCache(cache_path, ttl=60), cache_ttl=0.5)
+        other.search_blog("캐시")
+        results.append(check("캐시 파일 공유", len(state.requests) == 2 and other.metrics.cache_hits == 1))
+
+        time.sleep(0.6)
+        start = time.perf_counter()
+        stale = client.search_blog("캐시")
+        stale_seconds = time.perf_counter() - start
+        results.append(check("만료된 결과 즉시 반환", stale == first and stale_seconds < 0.1, f"({stale_seconds * 1000:.1f}ms)"))
+        deadline = time.time() + 5
+        while client.metrics.refreshes == 0 and time.time() < deadline:
+            time.sleep(0.05)
+        fresh = client.search_blog("캐시")
+        results.append(check("백그라운드 갱신", client.metrics.refreshes == 1 and len(state.requests) == 3 and fresh["lastBuildDate"],
+                             f"(API 요청 {len(state.requests)}회)"))
+        print(f"    {client.metrics.describe()}")
+        client.search_blog("캐시", use_cache=False)
+        results.append(check("캐시 우회", len(state.requests) == 4))
+        server.shutdown()
+
+    finish(results)
+
+
+if __name__ == "__main__":
+    main()
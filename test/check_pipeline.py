@@ -0,0 +1,73 @@
+# test/check_pipeline.py
+# 단계 의존성 그래프 실행 확인: 의존 결과 전달, 독립 단계 동시 실행, 실패 시 예외 전달/남은 단계 취소, 순환/없는 의존 단계
+# 사용: python test/check_pipeline.py
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from checks import check, finish  # noqa: E402
+from pipeline import describe_timings, run_pipeline  # noqa: E402
+
+
+def main():
+    results = []
+
+    timings = {}
+    outputs = run_pipeline({
+        "images": (lambda: (time.sleep(0.2), "캡션")[1], []),
+        "keyword": (lambda: (time.sleep(0.2), "맥북")[1], []),
+        "references": (lambda keyword: f"{keyword} 참고자료", ["keyword"]),
+        "context": (lambda images, references: f"{images} + {references}", ["images", "references"]),
+    }, timings)
+    results.append(check("의존 단계 결과를 같은 이름의 인자로 전달", outputs["context"] == "캡션 + 맥북 참고자료"))
+    results.append(check("독립 단계는 동시에 실행", timings["keyword"][0] < timings["images"][1] and timings["context"][1] < 0.35,
+                         f"({describe_timings(timings)})"))
+    results.append(check("의존 단계가 끝난 뒤 시작", timings["references"][0] >= timings["keyword"][1]
+                         and timings["context"][0] >= max(timings["images"][1], timings["references"][1])))
+
+    started = []
+    release = threading.Event()
+
+    def failing():
+        raise RuntimeError("검색 실패")
+
+    def slow():
+        release.wait(2)
+        return "느린 단계"
+
+    try:
+        run_pipeline({
+            "slow": (slow, []),
+            "bad": (failing, []),
+            "after": (lambda bad: started.append("after"), ["bad"]),
+        })
+        results.append(check("실패한 단계의 예외를 그대로 발생", False))
+    except RuntimeError as e:
+        results.append(check("실패한 단계의 예외를 그대로 발생", str(e) == "검색 실패"))
+    finally:
+        release.set()
+    results.append(check("실패한 단계에 의존하는 단계는 실행하지 않음", started == []))
+
+    try:
+        run_pipeline({"a": (lambda b: b, ["b"]), "b": (lambda a: a, ["a"]), "c": (lambda: 1, [])})
+        results.append(check("순환 의존성 오류", False))
+    except ValueError as e:
+        results.append(check("순환 의존성 오류", "순환" in str(e) and "a" in str(e) and "b" in str(e), f"({e})"))
+
+    try:
+        run_pipeline({"a": (lambda missing: missing, ["missing"])})
+        results.append(check("없는 의존 단계 오류", False))
+    except ValueError as e:
+        results.append(check("없는 의존 단계 오류", "missing" in str(e)))
+
+    results.append(check("빈 파이프라인", run_pipeline({}) == {}))
+
+    finish(results)
+
+
+if __name__ == "__main__":
+    main()
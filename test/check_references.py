@@ -0,0 +1,66 @@
+# test/check_references.py
+# 참고자료 정리 확인: 텍스트 정규화, BM25 관련도 순 정렬, MinHash 유사 중복 제거, 토큰 예산, 최소 점수 옵션
+# 사용: python test/check_references.py
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from checks import check, finish  # noqa: E402
+from references import bm25_scores, estimated_similarity, minhash_signature, normalize_text, process_references  # noqa: E402
+from retrieval import BlogItem  # noqa: E402
+
+
+def item(title, description, index):
+    return BlogItem(title, f"https://blog.naver.com/stub/{index}", description, "20240101")
+
+
+def main():
+    results = []
+
+    results.append(check("정규화: 태그/엔티티/공백", normalize_text("<b>맥북</b> &quot;에어&quot;\n  후기") == '맥북 "에어" 후기'))
+
+    scores = bm25_scores("맥북 배터리", ["맥북의 배터리 사용 시간 측정", "맥북 키보드 후기", "제주도 여행 코스"])
+    results.append(check("BM25: 질문 단어가 많이 겹칠수록 높은 점수", scores[0] > scores[1] > scores[2] == 0, f"({[round(s, 2) for s in scores]})"))
+    results.append(check("BM25: 조사가 붙은 한글 단어도 매칭", bm25_scores("배터리", ["배터리가 오래 갑니다"])[0] > 0))
+
+    base = "M2 맥북 에어로 영상 편집과 문서 작업을 하며 배터리 사용 시간을 측정했습니다. 하루 종일 충전 없이 사용할 수 있었습니다."
+    near = base.replace("측정했습니다", "측정해 보았습니다")
+    other = "제주도 3박 4일 여행 코스: 성산일출봉, 우도, 협재 해수욕장을 다녀온 가족 여행 후기입니다."
+    same = estimated_similarity(minhash_signature(base), minhash_signature(near))
+    different = estimated_similarity(minhash_signature(base), minhash_signature(other))
+    results.append(check("MinHash: 거의 같은 글은 유사도가 높고 다른 글은 낮음", same >= 0.7 > different, f"({same:.2f} / {different:.2f})"))
+
+    items = [
+        item("제주도 여행", other, 0),
+        item("맥북 에어 배터리", base, 1),
+        item("맥북 에어 배터리", near, 2),
+        item("맥북 키보드", "맥북 키보드 타건감 후기입니다.", 3),
+        item("빈 설명", "", 4),
+    ]
+    stats = {}
+    selected = process_references(items, "맥북 배터리 사용 시간", count_tokens=len, stats=stats)
+    links = [entry.link[-1] for entry in selected]
+    results.append(check("관련도 순 정렬과 유사 중복 제거", links == ["1", "3", "0"], f"({links})"))
+    results.append(check("설명이 없는 항목 제외, 통계", stats["input"] == 5 and stats["duplicates"] == 1 and stats["selected"] == 3))
+    results.append(check("같은 입력에 같은 결과", process_references(items, "맥북 배터리 사용 시간", count_tokens=len) == selected))
+
+    budget = len(f"- {selected[0].title}: {selected[0].description}") + 5
+    stats = {}
+    limited = process_references(items, "맥북 배터리 사용 시간", token_budget=budget, count_tokens=len, stats=stats)
+    results.append(check("토큰 예산 안에서만 선택", [entry.link[-1] for entry in limited] == ["1"] and stats["tokens"] <= budget
+                         and stats["over_budget"] == 2))
+
+    results.append(check("기본값은 관련 없는 참고자료도 남김 (영문 질문 + 한글 결과)",
+                         len(process_references(items, "Which MacBook should I buy?", count_tokens=len)) == 3))
+    stats = {}
+    filtered = process_references(items, "맥북 배터리 사용 시간", min_score=0, count_tokens=len, stats=stats)
+    results.append(check("min_score=0이면 겹치는 단어가 없는 참고자료 제외",
+                         [entry.link[-1] for entry in filtered] == ["1", "3"] and stats["irrelevant"] == 1))
+
+    finish(results)
+
+
+if __name__ == "__main__":
+    main()
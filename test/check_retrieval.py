@@ -0,0 +1,73 @@
+# test/check_retrieval.py
+# 참고자료 수집 확인: 검색어 나누기, 키워드별 결과를 번갈아 합치기, 링크 중복 제거, 개수 예산, 일부 요청 실패
+# 사용: python test/check_retrieval.py
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from checks import check, finish  # noqa: E402
+from naver_client import NaverSearchError  # noqa: E402
+from retrieval import NO_REFERENCES, format_references, retrieve_references, split_keywords  # noqa: E402
+
+
+class FakeClient:
+    """네트워크 없이 search_blog 응답을 만드는 클라이언트 (shared 링크는 모든 키워드 결과에 포함)"""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def search_blog(self, query, display=10, start=1, sort="sim"):
+        with self.lock:
+            self.calls.append((query, display, start))
+        if (query, start) in self.failing:
+            raise NaverSearchError("stub failure", 503)
+        items = [
+            {"title": f"<b>{query}</b> {rank}", "link": f"https://blog/{query}/{rank}", "description": f"{query} 설명 {rank}", "postdate": ""}
+            for rank in range(start, start + display)
+        ]
+        if start == 1:
+            items[1] = {"title": "공통 글", "link": "https://blog/shared", "description": "여러 검색어에 나오는 글", "postdate": ""}
+        return {"items": items}
+
+
+def main():
+    results = []
+
+    results.append(check("쉼표/줄바꿈/번호 목록 나누기", split_keywords("1. 맥북 에어, 맥북 프로\n'아이패드'") == ["맥북 에어", "맥북 프로", "아이패드"]))
+    results.append(check("키워드가 하나면 더 넓은 검색어 추가",
+                         split_keywords("애플 맥북 M2 칩 성능", max_keywords=3) == ["애플 맥북 M2 칩 성능", "애플 맥북 M2 칩", "애플 맥북 M2"]))
+    results.append(check("중복 키워드 제외", split_keywords("맥북, 맥북, 아이패드") == ["맥북", "아이패드"]))
+
+    client = FakeClient()
+    stats = {}
+    items = retrieve_references(client, ["a", "b"], budget=6, page_size=3, max_pages=3, stats=stats)
+    results.append(check("키워드별 결과를 번갈아 합침",
+                         [item.link for item in items] == ["https://blog/a/1", "https://blog/b/1", "https://blog/shared",
+                                                           "https://blog/a/3", "https://blog/b/3", "https://blog/a/4"],
+                         f"({[item.link.rsplit('/', 2)[-2:] for item in items]})"))
+    results.append(check("필요한 페이지 수만 요청", stats["requests"] == 4 and len(client.calls) == 4, f"({stats})"))
+    results.append(check("강조 태그 제거", items[0].title == "a 1"))
+
+    items = retrieve_references(FakeClient(), ["a", "b"], budget=100, page_size=3, max_pages=2)
+    links = [item.link for item in items]
+    results.append(check("링크 중복 제거", len(links) == len(set(links)) == 11))
+
+    stats = {}
+    items = retrieve_references(FakeClient(failing={("a", 1)}), ["a", "b"], budget=6, page_size=3, max_pages=2, stats=stats)
+    results.append(check("일부 요청이 실패해도 나머지 결과 사용",
+                         stats["failed"] == 1 and len(items) == 6 and not any(item.link.startswith("https://blog/a/1") for item in items)))
+
+    items = retrieve_references(FakeClient(failing={("a", 1)}), ["a"], budget=3, page_size=3, max_pages=1)
+    results.append(check("모두 실패하면 빈 목록", items == [] and format_references(items) == NO_REFERENCES))
+    results.append(check("키워드가 없으면 요청하지 않음", retrieve_references(FakeClient(), []) == []))
+
+    finish(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# test/check_token_budget.py
+# 프롬프트 토큰 예산 확인: 구성 요소별 상한, 전체 예산 초과 시 자르는 순서, 문장 경계에서 자르기, 같은 입력에 같은 결과
+# 사용: python test/check_token_budget.py
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from checks import check, finish  # noqa: E402
+from token_budget import TRUNCATION_MARKER, count_tokens, fit_prompt, tokenizer_name, truncate_to_tokens  # noqa: E402
+
+
+def text(sentence, repeat):
+    return " ".join(f"{sentence} {index}번째 문장입니다." for index in range(repeat))
+
+
+def main():
+    results = []
+    print(f"     토크나이저: {tokenizer_name()}")
+
+    short = "짧은 질문입니다."
+    results.append(check("예산 안의 문자열은 그대로", truncate_to_tokens(short, 100) == short))
+
+    long_text = text("맥북 에어는 가볍고 배터리가 오래 갑니다.", 80)
+    truncated = truncate_to_tokens(long_text, 60)
+    results.append(check("상한 이하로 자르고 표시를 붙임",
+                         count_tokens(truncated) <= 60 and truncated.endswith(TRUNCATION_MARKER) and long_text.startswith(truncated[:-len(TRUNCATION_MARKER)]),
+                         f"({count_tokens(long_text)} → {count_tokens(truncated)}토큰)"))
+    results.append(check("문장 경계에서 자름", truncated[:-len(TRUNCATION_MARKER)].endswith(".")))
+    results.append(check("표시보다 작은 상한은 빈 문자열", truncate_to_tokens(long_text, 1) == ""))
+    results.append(check("같은 입력에 같은 결과", truncate_to_tokens(long_text, 60) == truncated))
+
+    components = {
+        "system": "당신은 글 작성 전문가입니다.",
+        "format": text("글 형식 설명", 40),
+        "question": "맥북 에어 M2 후기를 써 주세요.",
+        "references": text("참고자료 내용", 60),
+        "example_text": text("예시 텍스트", 60),
+        "images": "{a.png} {b.png}",
+    }
+    caps = {"references": 200, "example_text": 200}
+
+    report = {}
+    fitted = fit_prompt(components, caps=caps, total_budget=100000, report=report)
+    results.append(check("구성 요소별 상한 적용",
+                         count_tokens(fitted["references"]) <= 200 and count_tokens(fitted["example_text"]) <= 200
+                         and fitted["format"] == components["format"]))
+
+    sizes = {name: count_tokens(fitted[name]) for name in fitted}
+    # 예시 텍스트만 모두 잘라내면 맞는 예산
+    budget = sum(sizes.values()) - sizes["example_text"] + 5
+    report = {}
+    fitted = fit_prompt(components, caps=caps, total_budget=budget, report=report)
+    results.append(check("예산 초과 시 예시 텍스트부터 줄임",
+                         report["total"] <= budget and count_tokens(fitted["example_text"]) < sizes["example_text"]
+                         and count_tokens(fitted["references"]) == sizes["references"] and fitted["format"] == components["format"],
+                         f"(합계 {report['total']} / 예산 {budget})"))
+
+    # 예시 텍스트와 참고자료를 모두 비워도 넘치는 예산 → 글 형식까지 줄임
+    budget = sizes["system"] + sizes["question"] + sizes["images"] + sizes["format"] // 2
+    fitted = fit_prompt(components, caps=caps, total_budget=budget, report=report)
+    results.append(check("그다음 참고자료, 글 형식 순으로 줄임",
+                         fitted["example_text"] == "" and fitted["references"] == "" and 0 < count_tokens(fitted["format"]) < sizes["format"]
+                         and report["total"] <= budget))
+    results.append(check("자르는 대상이 아닌 요소는 그대로",
+                         fitted["system"] == components["system"] and fitted["question"] == components["question"]
+                         and fitted["images"] == components["images"]))
+    results.append(check("보고서의 원래 토큰 수",
+                         report["components"]["references"]["tokens_in"] == count_tokens(components["references"])))
+
+    finish(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,14 @@
+# test/checks.py
+# check_*.py 스크립트가 함께 쓰는 확인 결과 출력/종료 도우미
+import sys
+
+
+def check(name, condition, detail=""):
+    # 확인 결과 한 줄 출력 (OK/FAIL), condition을 그대로 반환
+    print(f"{'OK  ' if condition else 'FAIL'} {name}{f' {detail}' if detail else ''}")
+    return bool(condition)
+
+
+def finish(results):
+    # 하나라도 실패하면 종료 코드 1
+    sys.exit(0 if all(results) else 1)
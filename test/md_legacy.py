@@ -0,0 +1,196 @@
+# test/md_legacy.py
+# 단일 패스 렌더러(src/md_render.py) 도입 전의 save_post_to_word 구현 (벤치마크/동등성 확인용 비교 기준)
+import re
+from io import BytesIO
+
+
+def apply_md_formatting(paragraph, text):
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+    from docx.oxml import OxmlElement
+    from docx.oxml.ns import qn
+    from docx.shared import Pt
+
+    # 기존 내용 제거
+    p_element = paragraph._element
+    for child in p_element[:]:
+        p_element.remove(child)
+
+    # 헤딩 처리
+    heading_match = re.match(r'^(#{1,6})\s+(.*)', text)
+    if heading_match:
+        level = len(heading_match.group(1))
+        content = heading_match.group(2)
+        paragraph.style = f'Heading {level}'
+        # 중앙 정렬
+        paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        process_inline_formatting(paragraph, content)
+        return
+
+    # 리스트 처리
+    list_match = re.match(r'^(\*|\-|\+)\s+(.*)', text)
+    if list_match:
+        content = list_match.group(2)
+        paragraph.style = 'List Bullet'
+        process_inline_formatting(paragraph, content)
+        return
+
+    numbered_list_match = re.match(r'^(\d+)\.\s+(.*)', text)
+    if numbered_list_match:
+        content = numbered_list_match.group(2)
+        paragraph.style = 'List Number'
+        process_inline_formatting(paragraph, content)
+        return
+
+    # 블록 인용 처리
+    blockquote_match = re.match(r'^>\s+(.*)', text)
+    if blockquote_match:
+        content = blockquote_match.group(1)
+        paragraph.style = 'Quote'
+        process_inline_formatting(paragraph, content)
+        return
+
+    # 수평선 처리
+    if re.match(r'^(\*\*\*|---)$', text.strip()):
+        run = paragraph.add_run()
+        p = run._element
+        pPr = paragraph._element.get_or_add_pPr()
+        pBdr = OxmlElement('w:pBdr')
+        pPr.insert_element_before(pBdr, 'w:spacing')
+        bottom = OxmlElement('w:bottom')
+        bottom.set(qn('w:val'), 'single')
+        bottom.set(qn('w:sz'), '6')
+        bottom.set(qn('w:space'), '1')
+        bottom.set(qn('w:color'), 'auto')
+        pBdr.append(bottom)
+        return
+
+    # 코드 블록 처리
+    code_block_match = re.match(r'^```(.*)', text)
+    if code_block_match:
+        content = code_block_match.group(1)
+        run = paragraph.add_run(content)
+        run.font.name = 'Courier New'
+        run.font.size = Pt(10)
+        return
+
+    # 인라인 서식 처리
+    process_inline_formatting(paragraph, text)
+
+
+def process_inline_formatting(paragraph, text):
+    from docx.shared import Pt, RGBColor
+
+    # 인라인 마크다운 서식을 적용합니다.
+    # 패턴 정의
+    pattern = r'(\*\*\*.+?\*\*\*|\*\*.+?\*\*|\*.+?\*|`.+?`|~~.+?~~|\!\[.*?\]\(.*?\)|\!\[.*?\]|\[.+?\]\(.*?\))'
+    tokens = re.split(pattern, text)
+
+    for token in tokens:
+        if not token:
+            continue
+        if token.startswith('***') and token.endswith('***'):
+            # 굵게 및 기울임
+            run = paragraph.add_run(token[3:-3])
+            run.bold = True
+            run.italic = True
+        elif token.startswith('**') and token.endswith('**'):
+            # 굵게
+            run = paragraph.add_run(token[2:-2])
+            run.bold = True
+        elif token.startswith('*') and token.endswith('*'):
+            # 기울임
+            run = paragraph.add_run(token[1:-1])
+            run.italic = True
+        elif token.startswith('~~') and token.endswith('~~'):
+            # 취소선
+            run = paragraph.add_run(token[2:-2])
+            run.font.strike = True
+        elif token.startswith('`') and token.endswith('`'):
+            # 인라인 코드
+            run = paragraph.add_run(token[1:-1])
+            run.font.name = 'Courier New'
+            run.font.size = Pt(10)
+        elif token.startswith('![') and '](' in token and token.endswith(')'):
+            # 마크다운 이미지 태그 처리 (![alt](image.png))
+            alt_text = token[2:token.index('](')]
+            image_url = token[token.index('](')+2:-1]
+            # 텍스트로 대체
+            run = paragraph.add_run(f"[이미지: {alt_text}]")
+            run.font.color.rgb = RGBColor(0, 0, 255)
+            run.font.underline = True
+        elif token.startswith('![') and token.endswith(']'):
+            # 마크다운 이미지 태그 처리 (![alt])
+            alt_text = token[2:-1]
+            run = paragraph.add_run(f"[이미지: {alt_text}]")
+            run.font.color.rgb = RGBColor(0, 0, 255)
+            run.font.underline = True
+        elif token.startswith('[') and '](' in token and token.endswith(')'):
+            # 하이퍼링크
+            link_text = token[1:token.index(']')]
+            link_url = token[token.index('](')+2:-1]
+            run = paragraph.add_run(f'{link_text} ({link_url})')
+            run.font.color.rgb = RGBColor(0, 0, 255)
+            run.font.underline = True
+        else:
+            # 일반 텍스트
+            run = paragraph.add_run(token)
+
+
+def save_post_to_word(final_post, image_bytes_dict):
+    # python-docx는 Word 파일을 만들 때만 로드
+    from docx import Document
+    from docx.shared import Inches
+
+    doc = Document()
+
+    # 이미지 태그 패턴 정의
+    image_tag_patterns = [
+        r'\{(.+?\.(?:png|jpg|jpeg))\}',       # {image.png}
+        r'\((.+?\.(?:png|jpg|jpeg))\)',      # (image.png)
+        r'!\[.*?\]\((.+?\.(?:png|jpg|jpeg))\)',  # ![alt](image.png)
+        r'!\[(.*?)\]'                          # ![alt]
+    ]
+
+    for line in final_post.split('\n'):
+        original_line = line  # 디버깅용 원본 라인 저장
+
+        # 이미지 태그 처리
+        for pattern in image_tag_patterns:
+            matches = re.findall(pattern, line)
+            for image_name in matches:
+                if pattern == r'!\[(.*?)\]':
+                    # ![alt] 형식의 경우 이미지 이름을 alt 텍스트로 가정
+                    image_name = image_name + ".png"  # 확장자 추가 필요 시 조정
+
+                image_bytes = image_bytes_dict.get(image_name)
+                if image_bytes:
+                    try:
+                        # 이미지 바이트를 BytesIO로 변환
+                        image_stream = BytesIO(image_bytes)
+                        doc.add_picture(image_stream, width=Inches(5))
+                    except Exception as e:
+                        line = line.replace(image_name, f"[이미지 '{image_name}'를 삽입할 수 없습니다]")
+                else:
+                    line = line.replace(image_name, f"[이미지 '{image_name}'를 찾을 수 없습니다]")
+
+                # 이미지 태그 제거
+                if pattern == r'\{(.+?\.(?:png|jpg|jpeg))\}':
+                    line = re.sub(r'\{' + re.escape(image_name) + r'\}', '', line)
+                elif pattern == r'\((.+?\.(?:png|jpg|jpeg))\)':
+                    line = re.sub(r'\(' + re.escape(image_name) + r'\)', '', line)
+                elif pattern == r'!\[.*?\]\((.+?\.(?:png|jpg|jpeg))\)':
+                    line = re.sub(r'!\[.*?\]\(' + re.escape(image_name) + r'\)', '', line)
+                elif pattern == r'!\[(.*?)\]':
+                    line = re.sub(r'!\[' + re.escape(image_name[:-4]) + r'\]', '', line)
+
+        # 이미지 태그가 제거된 후의 텍스트 삽입
+        if line.strip():
+            paragraph = doc.add_paragraph()
+            apply_md_formatting(paragraph, line)
+
+    # BytesIO를 사용하여 메모리에 저장
+    output = BytesIO()
+    doc.save(output)
+    output.seek(0)
+    return output
+
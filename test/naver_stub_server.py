@@ -0,0 +1,131 @@
+# test/naver_stub_server.py
+# 네이버 블로그 검색 API(/v1/search/blog)의 JSON 형태를 흉내 내는 로컬 스텁 서버
+# 사용: python test/naver_stub_server.py --port 8766 [--delay 0.05] [--fail-first 2 --fail-status 503]
+# 앱/CLI 실행 시 NAVER_API_BASE_URL=http://127.0.0.1:8766 으로 지정
+import argparse
+import json
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubState:
+    """스텁 서버 동작 설정 (응답 지연, 처음 N개 요청 실패, 실패 응답을 HTML로 보낼지)과 요청 기록"""
+
+    def __init__(self, delay=0.0, fail_first=0, fail_status=503, retry_after=None, fail_html=False):
+        self.delay = delay
+        self.fail_first = fail_first
+        self.fail_status = fail_status
+        self.retry_after = retry_after
+        self.fail_html = fail_html
+        self.requests = []  # (경로, 쿼리 사전, 클라이언트 포트)
+        self.lock = threading.Lock()
+
+
+def make_items(query, display, start):
+    return [
+        {
+            "title": f"<b>{query}</b> 후기 {start + i}",
+            "link": f"https://blog.naver.com/stub/{urllib.parse.quote(query)}/{start + i}",
+            "description": f"<b>{query}</b>에 대한 {start + i}번째 블로그 글 요약입니다. 사용해 본 느낌과 장단점을 정리했습니다.",
+            "bloggername": f"stub{(start + i) % 7}",
+            "bloggerlink": "blog.naver.com/stub",
+            "postdate": f"2024{(start + i) % 12 + 1:02d}{(start + i) % 28 + 1:02d}",
+        }
+        for i in range(display)
+    ]
+
+
+def make_handler(state):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive 지원
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, status, payload, headers=None):
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            try:
+                self.end_headers()
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                # 클라이언트가 타임아웃으로 먼저 연결을 끊은 경우
+                self.close_connection = True
+
+        def _send_html(self, status, text):
+            # 프록시/점검 안내 페이지처럼 JSON이 아닌 응답
+            body = text.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            parsed = urllib.parse.urlsplit(self.path)
+            params = dict(urllib.parse.parse_qsl(parsed.query))
+            with state.lock:
+                state.requests.append((parsed.path, params, self.client_address[1]))
+                failing = len(state.requests) <= state.fail_first
+            if state.delay:
+                time.sleep(state.delay)
+
+            if parsed.path != "/v1/search/blog":
+                self._send_json(404, {"errorMessage": "Not Found", "errorCode": "404"})
+                return
+            if not self.headers.get("X-Naver-Client-Id") or not self.headers.get("X-Naver-Client-Secret"):
+                self._send_json(401, {"errorMessage": "Authentication failed", "errorCode": "024"})
+                return
+            if failing and state.fail_html:
+                self._send_html(state.fail_status, "<html><body>서비스 점검 중입니다.</body></html>")
+                return
+            if failing:
+                headers = {"Retry-After": str(state.retry_after)} if state.retry_after is not None else None
+                self._send_json(state.fail_status, {"errorMessage": "stub failure", "errorCode": "012"}, headers)
+                return
+
+            query = params.get("query", "")
+            display = int(params.get("display", 10))
+            start = int(params.get("start", 1))
+            self._send_json(200, {
+                "lastBuildDate": time.strftime("%a, %d %b %Y %H:%M:%S +0900"),
+                "total": 1000,
+                "start": start,
+                "display": display,
+                "items": make_items(query, display, start),
+            })
+
+    return Handler
+
+
+def start_stub_server(port=0, **options):
+    # 백그라운드 스레드에서 스텁 서버 시작, (서버, 상태, 기본 URL) 반환
+    state = StubState(**options)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="네이버 블로그 검색 API 스텁 서버")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--delay", type=float, default=0.0, help="응답 지연(초)")
+    parser.add_argument("--fail-first", type=int, default=0, help="처음 N개 요청을 실패 응답으로 처리")
+    parser.add_argument("--fail-status", type=int, default=503)
+    parser.add_argument("--fail-html", action="store_true", help="실패 응답을 JSON 대신 HTML로 보냄 (--fail-status 200과 함께 사용)")
+    args = parser.parse_args()
+    server, _, base_url = start_stub_server(args.port, delay=args.delay, fail_first=args.fail_first, fail_status=args.fail_status,
+                                            fail_html=args.fail_html)
+    print(f"스텁 서버 실행 중: {base_url}/v1/search/blog (Ctrl+C로 종료)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()